@@ -3,6 +3,7 @@ import importlib
 from typing import Any
 
 from .ast_helpers import get_id
+from .fused_walk import WalkHook
 
 
 get_id  # quiten pyflakes; this should when code is updated to use ast_helpers
@@ -141,16 +142,23 @@ class AttributeCallTransformer(ast.NodeTransformer):
         return node
 
 
-class ImportTransformer(ast.NodeTransformer):
+class ImportTransformer(WalkHook):
     """Adds imports to scope block"""
 
     def __init__(self) -> None:
         super().__init__()
         self._imported_names = {}
+        self._qualified_imports = {}
 
-    def visit_Import(self, node) -> str:
+    def enter_Import(self, node):
         for (name, asname), imp_name in zip(self._get_aliases(node.names), node.names):
             self._add_scope_imports(node, imp_name)
+            if asname is not None:
+                self._qualified_imports[asname] = name
+            else:
+                # import a.b binds a
+                head = name.split(".")[0]
+                self._qualified_imports[head] = head
             try:
                 imported_name = importlib.import_module(name)
             except ImportError:
@@ -159,9 +167,9 @@ class ImportTransformer(ast.NodeTransformer):
                 self._imported_names[asname] = imported_name
             else:
                 self._imported_names[name] = imported_name
-        return node
+        return False
 
-    def visit_ImportFrom(self, node) -> str:
+    def enter_ImportFrom(self, node):
         imported_name = node.module
         imported_module = None
         if node.module:
@@ -176,11 +184,13 @@ class ImportTransformer(ast.NodeTransformer):
         for (name, asname), imp_name in zip(self._get_aliases(node.names), node.names):
             self._add_scope_imports(node, imp_name)
             asname = asname if asname is not None else name
+            if node.module and not node.level:
+                self._qualified_imports[asname] = f"{node.module}.{name}"
             if imported_module:
                 self._imported_names[asname] = getattr(imported_module, name, None)
             else:
                 self._imported_names[asname] = (imported_name, name)
-        return node
+        return False
 
     def _get_aliases(self, names: list[ast.alias]):
         aliases = []
@@ -194,19 +204,17 @@ class ImportTransformer(ast.NodeTransformer):
         if hasattr(scope, "imports"):
             scope.imports.append(name)
 
-    def visit_Module(self, node):
+    def enter_Module(self, node):
         self._imported_names = {}
+        self._qualified_imports = {}
         node.imports = []
-        self.generic_visit(node)
+
+    def leave_Module(self, node):
         node.imported_names = self._imported_names
-        return node
+        node.qualified_imports = self._qualified_imports
 
-    def visit_If(self, node: ast.If) -> Any:
+    def enter_If(self, node: ast.If):
         node.imports = []
-        self.generic_visit(node)
-        return node
 
-    def visit_With(self, node: ast.With) -> Any:
+    def enter_With(self, node: ast.With):
         node.imports = []
-        self.generic_visit(node)
-        return node
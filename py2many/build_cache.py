@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .toposort_modules import get_dependencies, module_for_path
+
+CACHE_FILE = ".py2many_cache.json"
+CACHE_FORMAT = 1
+
+# Command line options that change the transpiled output
+CACHE_ARGS = [
+    "indent",
+    "comment_unsupported",
+    "extension",
+    "suffix",
+    "no_prologue",
+    "typpete",
+    "pytype",
+    "config",
+    "import_basedir",
+]
+
+
+def _py2many_version() -> str:
+    try:
+        return metadata.version("py2many")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _hashcontents(contents: str) -> str:
+    return hashlib.sha256(bytes(contents, "utf-8")).hexdigest()
+
+
+def _hashfile(path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class BuildCache:
+    """Remembers which modules of a directory were already transpiled.
+
+    Each module is keyed by its source, the keys of the modules it imports,
+    the target language, the output affecting flags and the py2many version.
+    A module is up-to-date if its key did not change and its output file
+    still has the contents written by the previous run.
+    """
+
+    def __init__(self, outdir: Path, settings, args):
+        self._path = Path(outdir) / CACHE_FILE
+        self._settings_key = self._hash_settings(settings, args)
+        self._entries: Dict[str, Dict[str, str]] = self._load()
+        self._keys: Dict[str, str] = {}
+
+    def _hash_settings(self, settings, args) -> str:
+        flags = {name: str(getattr(args, name, None)) for name in CACHE_ARGS}
+        config = getattr(args, "config", None)
+        if config:
+            flags["config_hash"] = _hashfile(config)
+        key = {
+            "format": CACHE_FORMAT,
+            "version": _py2many_version(),
+            "language": settings.transpiler.NAME,
+            "ext": settings.ext,
+            "formatter": settings.formatter,
+            "flags": flags,
+        }
+        return _hashcontents(json.dumps(key, sort_keys=True, default=str))
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if not self._path.is_file():
+            return {}
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("format") != CACHE_FORMAT:
+            return {}
+        return data.get("modules", {})
+
+    def save(self):
+        data = {"format": CACHE_FORMAT, "modules": self._entries}
+        tmp_path = self._path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._path)
+
+    def select(self, trees, sources: Dict[Path, str]) -> Tuple[List, Set[Path]]:
+        """Splits trees (in topological order) into the trees that have to
+        be transpiled and the filenames whose previous output is reused.
+
+        Up-to-date modules imported by a stale module are transpiled again,
+        as cross module inference needs their trees.
+        """
+        deps = get_dependencies(trees)
+        modules = {module_for_path(t.__file__): t for t in trees}
+        stale = set()
+        for mod_name, tree in modules.items():
+            dep_keys = sorted(
+                self._keys[str(modules[d].__file__)] for d in deps[mod_name]
+            )
+            filename = str(tree.__file__)
+            self._keys[filename] = _hashcontents(
+                "\n".join(
+                    [self._settings_key, _hashcontents(sources[tree.__file__])]
+                    + dep_keys
+                )
+            )
+            if not self._is_fresh(filename):
+                stale.add(mod_name)
+
+        needed = set()
+        pending = list(stale)
+        while pending:
+            mod_name = pending.pop()
+            if mod_name not in needed:
+                needed.add(mod_name)
+                pending.extend(deps[mod_name])
+
+        todo = [t for t in trees if module_for_path(t.__file__) in needed]
+        cached = {t.__file__ for t in trees if module_for_path(t.__file__) not in stale}
+        return todo, cached
+
+    def _is_fresh(self, filename: str) -> bool:
+        entry = self._entries.get(filename)
+        if entry is None or entry["key"] != self._keys[filename]:
+            return False
+        return _hashfile(entry["output"]) == entry["output_hash"]
+
+    def update(self, filename: Path, output_path: Path):
+        """Record the final (formatted) output of a transpiled module"""
+        filename = str(filename)
+        self._entries[filename] = {
+            "key": self._keys[filename],
+            "output": str(output_path),
+            "output_hash": _hashfile(output_path),
+        }
+
+    def invalidate(self, filename: Path):
+        self._entries.pop(str(filename), None)
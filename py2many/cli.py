@@ -1,36 +1,46 @@
 import argparse
 import ast
 import os
+import pickle
 import string
 
 import sys
 import tempfile
 
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from functools import partial
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.pool import RemoteTraceback
 from pathlib import Path, PosixPath, WindowsPath
 from subprocess import run
 from typing import List, Optional, Set, Tuple
-from .pytype_inference import pytype_annotate_and_merge
+from .pytype_inference import pytype_annotate_and_merge_many
 from .module_dependencies import analyse_module_dependencies
 from .input_configuration import parse_input_configurations, config_rewriters
 
 from .rewriters import LoopElseRewriter, UnitTestRewriter
 
-from .analysis import add_imports
+from .analysis import ImportTransformer
+from .build_cache import BuildCache
 
-from .context import add_assignment_context, add_variable_context, add_list_calls
+from .context import LHSAnnotationTransformer, add_variable_context, add_list_calls
 from .exceptions import AstErrorBase
+from .fused_walk import fused_walk
+from .helpers import IMPORT_INDEX
 from .inference import add_is_annotation, infer_types, infer_types_typpete
 from .language import LanguageSettings
+from .parse_cache import ParseCache
+from .profiling import PassProfiler, measure_pass
 from .transformers import (
-    add_annotation_flags,
-    correct_node_attributes,
+    AnnotationTransformer,
+    CorrectNodeAttributes,
+    NestingTransformer,
     detect_mutable_vars,
-    detect_nesting_levels,
 )
-from .registry import _get_all_settings, ALL_SETTINGS, FAKE_ARGS
-from .scope import add_scope_context
-from .toposort_modules import toposort
+from .registry import _get_all_settings, ALL_SETTINGS
+from .scope import add_scope_context, invalidate_scope_indexes
+from .toposort_modules import get_dependencies, module_for_path, toposort
 
 
 from py2many.rewriters import (
@@ -48,20 +58,39 @@ PY2MANY_DIR = Path(__file__).parent
 ROOT_DIR = PY2MANY_DIR.parent
 STDIN = "-"
 STDOUT = "-"
+# Module name of the sources read from stdin
+STDIN_FILENAME = "test.py"
+FRAMINGS = ["nul", "length"]
 CWD = Path.cwd()
 
 
-def core_transformers(tree, trees, args):
-    add_variable_context(tree, trees)
-    add_scope_context(tree)
-    add_assignment_context(tree)
-    add_list_calls(tree)
-    detect_mutable_vars(tree)
-    detect_nesting_levels(tree)
-    add_annotation_flags(tree)
-    add_imports(tree)
-    correct_node_attributes(tree)
-    add_is_annotation(tree)
+def add_node_context(tree):
+    """Analyses that only depend on the ancestors of a node, in a single walk"""
+    fused_walk(
+        tree,
+        [
+            LHSAnnotationTransformer(),
+            NestingTransformer(),
+            AnnotationTransformer(),
+            ImportTransformer(),
+            CorrectNodeAttributes(),
+        ],
+    )
+    return tree
+
+
+def core_transformers(tree, trees, args, profiler=None):
+    analyses = [
+        partial(add_variable_context, trees=trees),
+        add_scope_context,
+        add_list_calls,
+        detect_mutable_vars,
+        add_node_context,
+        add_is_annotation,
+    ]
+    for analysis in analyses:
+        with measure_pass(profiler, tree, analysis):
+            analysis(tree)
     return tree
 
 
@@ -72,10 +101,16 @@ def _transpile(
     args: Optional[argparse.Namespace] = None,
     _suppress_exceptions=Exception,
     basedir: PosixPath = None,
+    cache: Optional[BuildCache] = None,
+    parse_cache: Optional[ParseCache] = None,
 ):
     """
     Transpile a single python translation unit (a python script) into
     target language
+
+    When a cache is given, the output of modules that are up-to-date is
+    returned as None. A parse_cache shares the parsed trees with the runs
+    for other languages.
     """
     transpiler = settings.transpiler
     inference = settings.inference if settings.inference else infer_types
@@ -83,31 +118,11 @@ def _transpile(
     transformers = settings.transformers
     post_rewriters = settings.post_rewriters
     optimization_rewriters = settings.optimization_rewriters
-    tree_list = []
+    source_map = dict(zip(filenames, sources))
+    # Pick up changes to the source tree since the previous run
+    IMPORT_INDEX.clear()
 
-    if args.pytype:
-        # Pytype only parses code as string at the moment
-        inferred_sources = []
-        for filename, source in zip(filenames, sources):
-            inferred_sources.append(
-                pytype_annotate_and_merge(source, basedir, filename)
-            )
-        sources = inferred_sources
-
-    for filename, source in zip(filenames, sources):
-        tree = ast.parse(source, type_comments=True)
-        tree.__file__ = filename
-        tree.__basedir__ = basedir
-        if args.import_basedir:
-            tree.import_basedir = (
-                WindowsPath(args.import_basedir)
-                if sys.platform.startswith("win32")
-                else PosixPath(args.import_basedir)
-            )
-        tree_list.append(tree)
-    # Analyse module dependencies
-    trees = analyse_module_dependencies(tree_list)
-    trees = toposort(tree_list)
+    trees = _parse(filenames, sources, args, basedir, parse_cache)
     topo_filenames = [t.__file__ for t in trees]
     language = transpiler.NAME
     generic_rewriters = [
@@ -139,44 +154,248 @@ def _transpile(
     if args.config:
         config_handler = parse_input_configurations(args.config)
 
-    outputs = {}
-    successful = []
-    for filename, tree in zip(topo_filenames, trees):
-        try:
-            output = _transpile_one(
-                trees,
-                tree,
-                transpiler,
-                rewriters,
-                transformers,
-                post_rewriters,
-                optimization_rewriters,
-                inference,
-                config_handler,
-                args,
+    transpile_args = (
+        transpiler,
+        rewriters,
+        transformers,
+        post_rewriters,
+        optimization_rewriters,
+        inference,
+        config_handler,
+        args,
+    )
+    profiler = None
+    if getattr(args, "profile_passes", None):
+        profiler = PassProfiler(getattr(args, "profile_time_only", False))
+        transpile_args += (profiler,)
+    todo, cached = trees, set()
+    if cache is not None:
+        todo, cached = cache.select(trees, source_map)
+
+    jobs = getattr(args, "jobs", 1) or 1
+    if jobs > 1 and len(todo) > 1 and "fork" in get_all_start_methods():
+        outputs, successful = _transpile_parallel(
+            trees, todo, transpile_args, jobs, _suppress_exceptions, profiler
+        )
+    else:
+        outputs = {}
+        successful = []
+        for tree in todo:
+            _transpile_module(
+                trees, tree, transpile_args, outputs, successful, _suppress_exceptions
             )
-
-            successful.append(filename)
-            outputs[filename] = output
-        except Exception as e:
-            import traceback
-
-            formatted_lines = traceback.format_exc().splitlines()
-            if isinstance(e, AstErrorBase):
-                print(f"{filename}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}")
-            else:
-                print(f"{filename}: {formatted_lines[-1]}")
-            if not _suppress_exceptions or not isinstance(e, _suppress_exceptions):
-                raise
-            outputs[filename] = "FAILED"
-            # outputs[filename] = str(e)
+    for filename in cached:
+        outputs[filename] = None
+    successful.extend(cached)
 
     # return output in the same order as input
     output_list = [outputs[f] for f in filenames]
+    done = set(successful)
+    successful = [f for f in topo_filenames if f in done]
+
+    if profiler is not None:
+        profiler.close()
+        report_path = _profile_report_path(args, language)
+        profiler.write_report(report_path)
+        print(profiler.summary())
+        print(f"Pass profile written to {report_path}")
 
     return output_list, successful
 
 
+def _profile_report_path(args, language: str) -> Path:
+    """The --profile-passes report of language. With several --langs each
+    language gets its own report, named after the language"""
+    path = Path(args.profile_passes)
+    langs = getattr(args, "langs", None)
+    if langs and len(langs.split(",")) > 1:
+        return path.with_name(f"{path.stem}-{language}{path.suffix}")
+    return path
+
+
+def _parse(filenames, sources, args, basedir, parse_cache=None) -> Tuple:
+    """The language independent front half of _transpile. Returns the
+    trees of sources in topological order"""
+    key = None
+    if parse_cache is not None:
+        key = parse_cache.key(filenames, sources, basedir, args)
+        trees = parse_cache.get(key)
+        if trees is not None:
+            return trees
+
+    tree_list = []
+    if args.pytype:
+        # Pytype only parses code as string at the moment
+        jobs = getattr(args, "jobs", 1) or 1
+        sources = pytype_annotate_and_merge_many(sources, basedir, filenames, jobs)
+
+    for filename, source in zip(filenames, sources):
+        tree = ast.parse(source, type_comments=True)
+        tree.__file__ = filename
+        tree.__basedir__ = basedir
+        if args.import_basedir:
+            tree.import_basedir = (
+                WindowsPath(args.import_basedir)
+                if sys.platform.startswith("win32")
+                else PosixPath(args.import_basedir)
+            )
+        tree_list.append(tree)
+    # Analyse module dependencies
+    analyse_module_dependencies(tree_list)
+    trees = toposort(tree_list)
+    if parse_cache is not None:
+        parse_cache.put(key, trees)
+    return trees
+
+
+def _format_transpile_error(filename, e: Exception) -> str:
+    import traceback
+
+    formatted_lines = traceback.format_exc().splitlines()
+    if isinstance(e, AstErrorBase):
+        return f"{filename}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}"
+    return f"{filename}: {formatted_lines[-1]}"
+
+
+def _transpile_module(
+    trees, tree, transpile_args, outputs, successful, _suppress_exceptions
+):
+    """Transpile one module of trees, recording its output or failure"""
+    filename = tree.__file__
+    try:
+        outputs[filename] = _transpile_one(trees, tree, *transpile_args)
+        successful.append(filename)
+    except Exception as e:
+        print(_format_transpile_error(filename, e))
+        if not _suppress_exceptions or not isinstance(e, _suppress_exceptions):
+            raise
+        outputs[filename] = "FAILED"
+        # outputs[filename] = str(e)
+
+
+# State shared with forked workers of _transpile_parallel. Workers inherit
+# it on fork, so trees and transpilers never need to be pickled.
+_PARALLEL_STATE = None
+
+
+def _transpile_parallel(
+    trees, todo, transpile_args, jobs, _suppress_exceptions, profiler=None
+):
+    """Transpile todo (a subset of trees) using a pool of jobs forked
+    worker processes.
+
+    Cross module inference resolves imported names against the already
+    transpiled trees of the imported modules (see VariableTransformer).
+    Modules that are imported by other modules are therefore transpiled
+    first, in topological order and in this process. The remaining modules
+    do not affect each other and are distributed across the pool.
+    """
+    global _PARALLEL_STATE
+
+    deps = get_dependencies(trees)
+    imported = set().union(*deps.values())
+    todo = set(todo)
+    providers = [
+        t for t in trees if t in todo and module_for_path(t.__file__) in imported
+    ]
+    independent = [
+        i
+        for i, t in enumerate(trees)
+        if t in todo and module_for_path(t.__file__) not in imported
+    ]
+
+    outputs = {}
+    successful = []
+    for tree in providers:
+        _transpile_module(
+            trees, tree, transpile_args, outputs, successful, _suppress_exceptions
+        )
+    if not independent:
+        return outputs, successful
+
+    _PARALLEL_STATE = (trees, transpile_args, _suppress_exceptions, profiler)
+    try:
+        ctx = get_context("fork")
+        chunksize = max(1, len(independent) // (jobs * 4))
+        with ctx.Pool(min(jobs, len(independent))) as pool:
+            results = pool.imap(_transpile_worker, independent, chunksize)
+            for index, (output, error, records) in zip(independent, results):
+                filename = trees[index].__file__
+                if profiler is not None:
+                    profiler.records.extend(records)
+                if error is None:
+                    outputs[filename] = output
+                    successful.append(filename)
+                    continue
+                message, suppressed, exc_state, formatted_exc = error
+                print(message)
+                if not suppressed:
+                    exc = _rebuild_exception(exc_state, filename)
+                    raise exc from RemoteTraceback(formatted_exc)
+                outputs[filename] = "FAILED"
+    finally:
+        _PARALLEL_STATE = None
+    return outputs, successful
+
+
+def _transpile_worker(index):
+    """Runs in a forked worker. Returns (output, error, profile records)"""
+    trees, transpile_args, _suppress_exceptions, profiler = _PARALLEL_STATE
+    tree = trees[index]
+    records = profiler.records if profiler is not None else []
+    start = len(records)
+    try:
+        return _transpile_one(trees, tree, *transpile_args), None, records[start:]
+    except Exception as e:
+        import traceback
+
+        suppressed = bool(_suppress_exceptions) and isinstance(e, _suppress_exceptions)
+        message = _format_transpile_error(tree.__file__, e)
+        error = (message, suppressed, _exception_state(e), traceback.format_exc())
+        return None, error, records[start:]
+
+
+def _exception_state(e: Exception):
+    """The picklable parts of e, from which _rebuild_exception recreates it.
+
+    Exceptions such as AstErrorBase take arguments in __init__ that are not
+    in e.args, so the exception itself does not survive a pickle round trip.
+    Neither do args that hold such exceptions, which are replaced by the
+    message.
+    """
+    state = (type(e).__module__, type(e).__qualname__, e.args, vars(e))
+    try:
+        pickle.loads(pickle.dumps(state))
+    except Exception:
+        return (type(e).__module__, type(e).__qualname__, (str(e),), {})
+    return state
+
+
+def _rebuild_exception(exc_state, filename) -> Exception:
+    """Recreate an exception raised in a worker of _transpile_parallel,
+    with its original type and message"""
+    module, qualname, args, attrs = exc_state
+    try:
+        cls = sys.modules[module]
+        for name in qualname.split("."):
+            cls = getattr(cls, name)
+        e = cls.__new__(cls, *args)
+        e.args = args
+        e.__dict__.update(attrs)
+    except Exception:
+        e = RuntimeError(f"Transpiling {filename} failed: {qualname}: {args}")
+    return e
+
+
+def _rewrite(profiler, tree, rewriter):
+    """Runs rewriter on tree. Rewriters modify bodies in place, so the
+    cached scope indexes are dropped afterwards"""
+    with measure_pass(profiler, tree, rewriter):
+        tree = rewriter.visit(tree)
+    invalidate_scope_indexes(tree)
+    return tree
+
+
 def _transpile_one(
     trees,
     tree,
@@ -188,38 +407,46 @@ def _transpile_one(
     inference,
     config_handler,
     args,
+    profiler=None,
 ):
     # This is very basic and needs to be run before and after
     # rewrites. Revisit if running it twice becomes a perf issue
-    add_scope_context(tree)
+    with measure_pass(profiler, tree, add_scope_context):
+        add_scope_context(tree)
     # Configuration parser
     if config_handler:
-        config_rewriters(config_handler, tree)
+        with measure_pass(profiler, tree, config_rewriters):
+            config_rewriters(config_handler, tree)
     # Language specific rewriters
     for rewriter in rewriters:
-        tree = rewriter.visit(tree)
+        tree = _rewrite(profiler, tree, rewriter)
     # Language independent core transformers
-    tree = core_transformers(tree, trees, args)
+    tree = core_transformers(tree, trees, args, profiler)
     # Type inference
     if args and args.typpete:
-        infer_meta = infer_types_typpete(tree)
+        with measure_pass(profiler, tree, infer_types_typpete):
+            infer_meta = infer_types_typpete(tree)
     else:
-        infer_meta = inference(tree)
+        with measure_pass(profiler, tree, inference):
+            infer_meta = inference(tree)
     # Language specific transformers
     for tx in transformers:
-        tx(tree)
+        with measure_pass(profiler, tree, tx):
+            tx(tree)
+        invalidate_scope_indexes(tree)
     # Language specific rewriters that depend on previous steps
     for rewriter in post_rewriters:
-        tree = rewriter.visit(tree)
+        tree = _rewrite(profiler, tree, rewriter)
     # Language specific optimizations
     for opt_rewriter in optimization_rewriters:
-        tree = opt_rewriter.visit(tree)
+        tree = _rewrite(profiler, tree, opt_rewriter)
 
     # Rerun core transformers
-    tree = core_transformers(tree, trees, args)
+    tree = core_transformers(tree, trees, args, profiler)
     out = []
 
-    transpile_output = transpiler.visit(tree)
+    with measure_pass(profiler, tree, f"{type(transpiler).__name__}.visit"):
+        transpile_output = transpiler.visit(tree)
     headers = transpiler.headers(infer_meta)
     if headers:
         out.append(headers)
@@ -229,9 +456,26 @@ def _transpile_one(
     return "\n".join(out)
 
 
-@lru_cache(maxsize=100)
-def _process_one_data(source_data, filename, settings, args, basedir):
-    return _transpile([filename], [source_data], settings, args, outdir=basedir)[0][0]
+def _process_one_data(source_data, settings, args, env=None, parse_cache=None):
+    """Transpile and reformat source_data in memory.
+
+    Returns the output and whether transpiling and formatting succeeded.
+    """
+    filename = Path(STDIN_FILENAME)
+    outputs, successful = _transpile(
+        [filename],
+        [source_data],
+        settings,
+        args,
+        basedir=filename,
+        parse_cache=parse_cache,
+    )
+    output = outputs[0]
+    if not successful:
+        return output, False
+    if settings.formatter:
+        return _format_data(settings, output, env)
+    return output, True
 
 
 def _create_cmd(parts, filename, **kw):
@@ -272,114 +516,115 @@ def _parse_expected(outputs, settings, args):
             f"Could not parse expected files. {file_out} could not be found."
         )
 
-    def _compare_file_contents(file1_path, file2_path):
-        """Compares file contents for equality"""
-
-        # Read data from files
-        expected_data = None
-        curr_file_data = None
-        with open(file1_path, encoding="utf-8") as f1, open(
-            file2_path, encoding="utf-8"
-        ) as f2:
-            expected_data = f1.read()
-            curr_file_data = f2.read()
-
-        if expected_data == None or curr_file_data == None:
-            raise Exception(f"File {file1_path} does not have an expected result file")
-
-        # Check if files match
-        remove = string.whitespace
-        mapping = {ord(c): None for c in remove}
-        data: str = expected_data.translate(mapping)
-        contents: str = curr_file_data.translate(mapping)
-        return contents == data
-
-    def _relative_to_cwd(absolute_path):
-        return Path(os.path.relpath(absolute_path, CWD))
-
-    def _get_output_path(filename, ext, outdir):
-        if filename.name == STDIN:
-            return Path(STDOUT)
-        directory = outdir / filename.parent
-        if not directory.is_dir():
-            directory.mkdir(parents=True)
-        output_path = directory / (filename.stem + ext)
-        if ext == ".kt" and output_path.is_absolute():
-            # KtLint does not support absolute path in globs
-            output_path = _relative_to_cwd(output_path)
-        return output_path
-
-    def _process_one(
-        settings: LanguageSettings, filename: Path, outdir: str, args, env
-    ):
-        """Transpile and reformat.
-
-        Returns False if reformatter failed.
-        """
-        suffix = f".{args.suffix}" if args.suffix is not None else settings.ext
-        output_path = _get_output_path(
-            filename.relative_to(filename.parent), suffix, outdir
-        )
 
-        if filename.name == STDIN:
-            # special case for simple pipes
-            output = _process_one_data(
-                sys.stdin.read(), Path("test.py"), settings, args, filename
+def _compare_file_contents(file1_path, file2_path):
+    """Compares file contents for equality"""
+
+    # Read data from files
+    expected_data = None
+    curr_file_data = None
+    with open(file1_path, encoding="utf-8") as f1, open(
+        file2_path, encoding="utf-8"
+    ) as f2:
+        expected_data = f1.read()
+        curr_file_data = f2.read()
+
+    if expected_data == None or curr_file_data == None:
+        raise Exception(f"File {file1_path} does not have an expected result file")
+
+    # Check if files match
+    remove = string.whitespace
+    mapping = {ord(c): None for c in remove}
+    data: str = expected_data.translate(mapping)
+    contents: str = curr_file_data.translate(mapping)
+    return contents == data
+
+
+def _relative_to_cwd(absolute_path):
+    return Path(os.path.relpath(absolute_path, CWD))
+
+
+def _get_output_path(filename, ext, outdir):
+    if filename.name == STDIN:
+        return Path(STDOUT)
+    directory = outdir / filename.parent
+    if not directory.is_dir():
+        directory.mkdir(parents=True)
+    output_path = directory / (filename.stem + ext)
+    if ext == ".kt" and output_path.is_absolute():
+        # KtLint does not support absolute path in globs
+        output_path = _relative_to_cwd(output_path)
+    return output_path
+
+
+def _process_one(
+    settings: LanguageSettings, filename: Path, outdir: str, args, env, parse_cache=None
+):
+    """Transpile and reformat.
+
+    Returns False if reformatter failed.
+    """
+    suffix = f".{args.suffix}" if args.suffix is not None else settings.ext
+    output_path = _get_output_path(
+        filename.relative_to(filename.parent), suffix, outdir
+    )
+
+    if filename.name == STDIN:
+        # special case for simple pipes
+        source_data = sys.stdin.read()
+        # Keep the diagnostics out of the output
+        with redirect_stdout(sys.stderr):
+            output, ok = _process_one_data(
+                source_data, settings, args, env, parse_cache
             )
-            tmp_name = None
-            try:
-                with tempfile.NamedTemporaryFile(
-                    suffix=settings.ext, delete=False
-                ) as f:
-                    tmp_name = f.name
-                    f.write(output.encode("utf-8"))
-                if _format_one(settings, tmp_name, env):
-                    sys.stdout.write(open(tmp_name).read())
-                else:
-                    sys.stderr.write("Formatting failed")
-            finally:
-                if tmp_name is not None:
-                    os.remove(tmp_name)
-            return ({filename}, {filename})
-
-        if filename.resolve() == output_path.resolve() and not args.force:
-            print(f"Refusing to overwrite {filename}. Use --force to overwrite")
-            return False
+        sys.stdout.write(output)
+        return ok
 
-        print(f"{filename} ... {output_path}")
-        with open(filename, encoding="utf-8") as f:
-            source_data = f.read()
-        dunder_init = filename.stem == "__init__"
-        if dunder_init and not source_data:
-            print("Detected empty __init__; skipping")
-            return True
-        result = _transpile([filename], [source_data], settings, args, basedir=filename)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(result[0][0])
+    if filename.resolve() == output_path.resolve() and not args.force:
+        print(f"Refusing to overwrite {filename}. Use --force to overwrite")
+        return False
 
-        format_res = False
-        if settings.formatter:
-            print("Formatting file")
-            format_res = _format_one(settings, output_path, env)
+    print(f"{filename} ... {output_path}")
+    with open(filename, encoding="utf-8") as f:
+        source_data = f.read()
+    dunder_init = filename.stem == "__init__"
+    if dunder_init and not source_data:
+        print("Detected empty __init__; skipping")
+        return True
+    result = _transpile(
+        [filename],
+        [source_data],
+        settings,
+        args,
+        basedir=filename,
+        parse_cache=parse_cache,
+    )
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(result[0][0])
 
-        # Compare with expected
-        if hasattr(args, "expected") and args.expected is not None:
-            _parse_expected([(filename, output_path)], settings, args)
+    format_res = False
+    if settings.formatter:
+        print("Formatting file")
+        format_res = _format_one(settings, output_path, env)
 
-        return format_res
+    # Compare with expected
+    if hasattr(args, "expected") and args.expected is not None:
+        _parse_expected([(filename, output_path)], settings, args)
+
+    return format_res
 
 
 def _format_one(settings, output_path, env=None):
     try:
-        restore_cwd = False
+        # The working directory is passed to run() instead of using
+        # os.chdir, so that formatters can run concurrently
+        cwd = None
         if settings.ext == ".kt" and output_path.parts[0] == "..":
             # ktlint can not handle relative paths starting with ..
-            restore_cwd = CWD
-
-            os.chdir(output_path.parent)
+            cwd = output_path.parent
             output_path = output_path.name
         cmd = _create_cmd(settings.formatter, filename=output_path)
-        proc = run(cmd, env=env, capture_output=True)
+        proc = run(cmd, env=env, capture_output=True, cwd=cwd)
         if proc.returncode:
             # format.jl exit code is unreliable
             if settings.ext == ".jl":
@@ -393,19 +638,12 @@ def _format_one(settings, output_path, env=None):
             print(
                 f"Error: {cmd} (code: {proc.returncode}):\n{proc.stderr}{proc.stdout}"
             )
-            if restore_cwd:
-                os.chdir(restore_cwd)
             return False
         if settings.ext == ".kt":
             # ktlint formatter needs to be invoked twice before output is lint free
-            if run(cmd, env=env).returncode:
+            if run(cmd, env=env, cwd=cwd).returncode:
                 print(f"Error: Could not reformat: {cmd}")
-                if restore_cwd:
-                    os.chdir(restore_cwd)
                 return False
-
-        if restore_cwd:
-            os.chdir(restore_cwd)
     except Exception as e:
         print(f"Error: Could not format: {output_path}")
         print(f"Due to: {e.__class__.__name__} {e}")
@@ -414,16 +652,144 @@ def _format_one(settings, output_path, env=None):
     return True
 
 
+def _format_data(settings, output: str, env=None) -> Tuple[str, bool]:
+    """Formats output in memory if the formatter can read stdin, through a
+    temporary file otherwise. Returns the output and whether it was formatted
+    """
+    if settings.stdin_formatter:
+        cmd = settings.stdin_formatter
+        try:
+            proc = run(cmd, input=output.encode("utf-8"), env=env, capture_output=True)
+        except OSError as e:
+            print(f"Error: Could not format: {e.__class__.__name__} {e}")
+            return output, False
+        if proc.returncode:
+            print(f"Error: {cmd} (code: {proc.returncode}):\n{proc.stderr}")
+            return output, False
+        return proc.stdout.decode("utf-8"), True
+
+    fd, tmp_name = tempfile.mkstemp(suffix=settings.ext)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(output)
+        if not _format_one(settings, Path(tmp_name), env):
+            return output, False
+        with open(tmp_name, encoding="utf-8") as f:
+            return f.read(), True
+    finally:
+        os.remove(tmp_name)
+
+
+# Stay below the command line limit of every platform (32767 on Windows)
+MAX_FORMAT_CMD_LENGTH = 32000
+
+
+def _format_batches(settings, output_paths, jobs=1) -> List[List[Path]]:
+    """Split output_paths into batches that fit into one formatter call.
+    With several jobs, the files are spread over at least that many batches.
+    """
+    if _create_cmd(settings.formatter, filename="") != [*settings.formatter, ""]:
+        # The formatter takes a single {filename}
+        return [[p] for p in output_paths]
+    groups = {}
+    for output_path in output_paths:
+        key = None
+        if settings.ext == ".kt" and output_path.parts[0] == "..":
+            # Formatted from their parent directory, see _format_batch
+            key = output_path.parent
+        groups.setdefault(key, []).append(output_path)
+
+    base_length = sum(len(arg) + 1 for arg in settings.formatter)
+    max_files = max(1, -(-len(output_paths) // jobs))
+    batches = []
+    for key, paths in groups.items():
+        batch, length = [], base_length
+        for output_path in paths:
+            arg = str(output_path) if key is None else output_path.name
+            arg_length = len(arg) + 1
+            if batch and (
+                length + arg_length > MAX_FORMAT_CMD_LENGTH or len(batch) == max_files
+            ):
+                batches.append(batch)
+                batch, length = [], base_length
+            batch.append(output_path)
+            length += arg_length
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+def _format_batch(settings, batch, env=None):
+    """Format a batch of files with a single formatter invocation.
+
+    Returns False if the formatter reported an error for any of them.
+    """
+    cwd = None
+    filenames = [str(p) for p in batch]
+    if settings.ext == ".kt" and batch[0].parts[0] == "..":
+        # ktlint can not handle relative paths starting with ..
+        cwd = batch[0].parent
+        filenames = [p.name for p in batch]
+    cmd = [*settings.formatter, *filenames]
+    try:
+        if run(cmd, env=env, capture_output=True, cwd=cwd).returncode:
+            return False
+        if settings.ext == ".kt":
+            # ktlint formatter needs to be invoked twice before output is lint free
+            if run(cmd, env=env, capture_output=True, cwd=cwd).returncode:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def _format_many(settings, output_paths, env=None, jobs=1) -> Set[Path]:
+    """Format output_paths with as few formatter invocations as possible,
+    running up to jobs formatter processes at a time.
+
+    Returns the paths that could not be formatted. Batches that fail are
+    formatted again one file at a time to find out which files failed.
+    """
+
+    def format_batch(batch):
+        if len(batch) > 1 and _format_batch(settings, batch, env):
+            return set()
+        return {p for p in batch if not _format_one(settings, p, env)}
+
+    batches = _format_batches(settings, output_paths, jobs)
+    if jobs <= 1 or len(batches) <= 1:
+        return set().union(*map(format_batch, batches))
+
+    failed = set()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(format_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch_failed = future.result()
+            failed |= batch_failed
+            print(f"Formatted {len(futures[future]) - len(batch_failed)} file(s)")
+    return failed
+
+
 FileSet = Set[Path]
 
 
 def _process_many(
-    settings, basedir, filenames, outdir, args, env=None, _suppress_exceptions=Exception
+    settings,
+    basedir,
+    filenames,
+    outdir,
+    args,
+    env=None,
+    _suppress_exceptions=Exception,
+    parse_cache=None,
 ) -> Tuple[FileSet, FileSet]:
     """Transpile and reformat many files."""
 
     # Try to flush out as many errors as possible
     settings.transpiler.set_continue_on_unimplemented()
+    cache = None
+    if getattr(args, "cache", False):
+        cache = BuildCache(outdir, settings, args)
 
     source_data = []
     for filename in filenames:
@@ -437,12 +803,18 @@ def _process_many(
         args,
         _suppress_exceptions=_suppress_exceptions,
         basedir=basedir,
+        cache=cache,
+        parse_cache=parse_cache,
     )
 
     output_paths = [
         _get_output_path(filename, settings.ext, outdir) for filename in filenames
     ]
+    # Up-to-date outputs are neither rewritten nor reformatted
+    cached = {f for f, output in zip(filenames, outputs) if output is None}
     for filename, output, output_path in zip(filenames, outputs, output_paths):
+        if filename in cached:
+            continue
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(output)
 
@@ -451,14 +823,27 @@ def _process_many(
     if settings.formatter:
         if settings.ext == ".jl":
             # Julia Formatter can receive multiple files
-            _format_one(settings, outdir, env)
+            if len(cached) < len(filenames):
+                _format_one(settings, outdir, env)
         else:
-            # TODO: Optimize to a single invocation
-            for filename, output_path in zip(filenames, output_paths):
-                if filename in successful and not _format_one(
-                    settings, output_path, env
-                ):
-                    format_errors.add(Path(filename))
+            to_format = [
+                (filename, output_path)
+                for filename, output_path in zip(filenames, output_paths)
+                if filename in successful and filename not in cached
+            ]
+            jobs = getattr(args, "jobs", 1) or 1
+            failed = _format_many(settings, [p for _, p in to_format], env, jobs)
+            format_errors = {Path(f) for f, p in to_format if p in failed}
+
+    if cache is not None:
+        for filename, output_path in zip(filenames, output_paths):
+            if filename in cached:
+                continue
+            if filename in successful and filename not in format_errors:
+                cache.update(filename, output_path)
+            else:
+                cache.invalidate(filename)
+        cache.save()
 
     # Compare with expected
     if hasattr(args, "expected") and args.expected is not None:
@@ -467,8 +852,82 @@ def _process_many(
     return (successful, format_errors)
 
 
+def _read_frames(rfile, framing):
+    """Yields the documents of the binary stream rfile as soon as they are
+    complete. They are either separated by NUL bytes or preceded by a line
+    with their length in bytes."""
+    if framing == "length":
+        for header in iter(rfile.readline, b""):
+            if not header.strip():
+                continue
+            size = int(header)
+            data = rfile.read(size)
+            if len(data) < size:
+                raise ValueError(f"Expected {size} bytes, got {len(data)}")
+            yield data
+        return
+    pending = []
+    for chunk in iter(partial(rfile.read1, 65536), b""):
+        *done, rest = chunk.split(b"\0")
+        for data in done:
+            pending.append(data)
+            yield b"".join(pending)
+            pending = []
+        pending.append(rest)
+    if any(pending):
+        yield b"".join(pending)
+
+
+def _write_frame(wfile, data: bytes, framing):
+    if framing == "length":
+        wfile.write(b"%d\n" % len(data))
+        wfile.write(data)
+    else:
+        wfile.write(data + b"\0")
+    wfile.flush()
+
+
+def _process_stream(
+    all_settings, args, env=None, framing="nul", rfile=None, wfile=None
+) -> bool:
+    """Transpile and reformat every document read from rfile, writing the
+    outputs to wfile in the same framing. With several languages, each
+    document gets one output per language.
+
+    Returns False if any document failed.
+    """
+    rfile = rfile or sys.stdin.buffer
+    wfile = wfile or sys.stdout.buffer
+    ok = True
+    for data in _read_frames(rfile, framing):
+        source_data = data.decode("utf-8")
+        for settings in all_settings:
+            # Keep the diagnostics out of the outputs
+            with redirect_stdout(sys.stderr):
+                try:
+                    output, success = _process_one_data(
+                        source_data, settings, args, env
+                    )
+                except Exception as e:
+                    # Such as syntax errors, keep going with the next document
+                    print(_format_transpile_error(STDIN_FILENAME, e))
+                    output, success = "FAILED", False
+                finally:
+                    # Don't keep the module alive until the next document
+                    settings.transpiler.reset()
+            ok = ok and success
+            _write_frame(wfile, output.encode("utf-8"), framing)
+    return ok
+
+
 def _process_dir(
-    settings, source, outdir, args, env=None, _suppress_exceptions=Exception
+    settings,
+    source,
+    outdir,
+    args,
+    env=None,
+    _suppress_exceptions=Exception,
+    parse_cache=None,
 ):
     print(f"Transpiling whole directory to {outdir}:")
 
@@ -505,6 +964,7 @@ def _process_dir(
         args,
         env=env,
         _suppress_exceptions=_suppress_exceptions,
+        parse_cache=parse_cache,
     )
     failures = set(input_paths) - set(successful)
 
@@ -519,14 +979,20 @@ def _process_dir(
 
 def main(args=None, env=os.environ):
     parser = argparse.ArgumentParser()
-    LANGS = _get_all_settings(FAKE_ARGS)
-    for lang, settings in LANGS.items():
+    # Only the selected backend gets imported, see registry.LanguageEntry
+    for lang, entry in ALL_SETTINGS.items():
         parser.add_argument(
             f"--{lang}",
             type=bool,
             default=False,
-            help=f"Generate {settings.display_name} code",
+            help=f"Generate {entry.display_name} code",
         )
+    parser.add_argument(
+        "--langs",
+        default=None,
+        metavar="LANGS",
+        help="Comma separated languages to generate, parsing the sources once",
+    )
     parser.add_argument("--outdir", default=None, help="Output directory")
     parser.add_argument(
         "-i",
@@ -574,6 +1040,32 @@ def main(args=None, env=os.environ):
     parser.add_argument(
         "--project", default=True, help="Create a project when using directory mode"
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="Skip modules whose output in outdir is up-to-date (directory mode)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel transpile and format jobs in directory mode",
+    )
+    parser.add_argument(
+        "--profile-passes",
+        default=None,
+        metavar="REPORT",
+        help="Time every pass per module and write a .json or .csv report",
+    )
+    parser.add_argument(
+        "--profile-time-only",
+        action="store_true",
+        default=False,
+        help="Only record wall times with --profile-passes, without the memory "
+        "tracing and node counting that slow the passes down",
+    )
 
     # Configuration files.
     parser.add_argument(
@@ -587,6 +1079,25 @@ def main(args=None, env=os.environ):
         default=None,
         help="Directory containing expected results for comparison",
     )
+    parser.add_argument(
+        "--refresh-julia-symbols",
+        action="store_true",
+        default=False,
+        help="Rebuild the cached list of Julia Base functions",
+    )
+    parser.add_argument(
+        "--stream",
+        choices=FRAMINGS,
+        default=None,
+        help="Transpile a stream of NUL separated or length prefixed sources "
+        "from stdin to stdout",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="PATH",
+        help="With serve, listen on a unix socket instead of stdin/stdout",
+    )
     # Allows setting an import base directory for transpilation.
     # Helps if the intent is to transpile part of a library.
     parser.add_argument(
@@ -597,53 +1108,74 @@ def main(args=None, env=os.environ):
 
     args, rest = parser.parse_known_args(args=args)
 
+    if rest == ["serve"]:
+        from .server import serve
+
+        return serve(args, env)
+
     # Validation of the args
-    if args.extension and not args.rust:
+    if args.langs:
+        langs = args.langs.split(",")
+        unknown = [lang for lang in langs if lang not in ALL_SETTINGS]
+        if unknown:
+            print(f"Unknown languages: {', '.join(unknown)}")
+            return -1
+    else:
+        langs = [next((lang for lang in ALL_SETTINGS if getattr(args, lang)), "cpp")]
+    if args.extension and langs != ["rust"]:
         print("extension supported only with rust via pyo3")
         return -1
 
-    settings_func = ALL_SETTINGS["cpp"]
-    for lang, func in ALL_SETTINGS.items():
-        arg = getattr(args, lang)
-        if arg:
-            settings_func = func
-            break
-    settings = settings_func(args, env=env)
+    all_settings = [ALL_SETTINGS[lang](args, env=env) for lang in langs]
+    # The sources are parsed once for all the languages
+    parse_cache = ParseCache() if len(langs) > 1 else None
 
     if args.comment_unsupported:
-        print("Wrapping unimplemented in comments")
-        settings.transpiler._throw_on_unimplemented = False
+        print("Wrapping unimplemented in comments", file=sys.stderr)
+        for settings in all_settings:
+            settings.transpiler._throw_on_unimplemented = False
+
+    if args.stream:
+        return 0 if _process_stream(all_settings, args, env, args.stream) else 1
 
     for filename in rest:
         source = Path(filename)
-        if args.outdir is None:
-            outdir = source.parent
-        else:
-            outdir = Path(args.outdir)
-
-        if source.is_file() or source.name == STDIN:
-            print(f"Writing to: {outdir}", file=sys.stderr)
-            try:
-                rv = _process_one(settings, source, outdir, args, env)
-            except Exception as e:
-                import traceback
-
-                formatted_lines = traceback.format_exc().splitlines()
-                if isinstance(e, AstErrorBase):
-                    print(
-                        f"{source}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}",
-                        file=sys.stderr,
-                    )
-                else:
-                    print(f"{source}: {formatted_lines[-1]}", file=sys.stderr)
-                rv = False
-        else:
+        rv = 0
+        for lang, settings in zip(langs, all_settings):
             if args.outdir is None:
-                outdir = source.parent / f"{source.name}-py2many"
+                outdir = source.parent
+            else:
+                outdir = Path(args.outdir)
 
-            successful, format_errors, failures = _process_dir(
-                settings, source, outdir, args, env=env
-            )
-            rv = not (failures or format_errors)
-        rv = 0 if rv is True else 1
+            if source.is_file() or source.name == STDIN:
+                print(f"Writing to: {outdir}", file=sys.stderr)
+                try:
+                    lang_rv = _process_one(
+                        settings, source, outdir, args, env, parse_cache
+                    )
+                except Exception as e:
+                    import traceback
+
+                    formatted_lines = traceback.format_exc().splitlines()
+                    if isinstance(e, AstErrorBase):
+                        print(
+                            f"{source}:{e.lineno}:{e.col_offset}: "
+                            f"{formatted_lines[-1]}",
+                            file=sys.stderr,
+                        )
+                    else:
+                        print(f"{source}: {formatted_lines[-1]}", file=sys.stderr)
+                    lang_rv = False
+            else:
+                if args.outdir is None:
+                    outdir = source.parent / f"{source.name}-py2many"
+                if len(langs) > 1:
+                    # Keep the projects of the languages apart
+                    outdir = outdir / lang
+
+                successful, format_errors, failures = _process_dir(
+                    settings, source, outdir, args, env=env, parse_cache=parse_cache
+                )
+                lang_rv = not (failures or format_errors)
+            rv = max(rv, 0 if lang_rv is True else 1)
         return rv
@@ -1,9 +1,12 @@
 import ast
+import builtins
+import keyword
 import logging
 import math
 import os
 import random
 import sys
+import threading
 import time
 
 from pathlib import Path
@@ -101,14 +104,35 @@ _AUTO_INVOKED = "auto()"
 logger = logging.Logger("py2many")
 
 
-def class_for_typename(typename: str, default_type, locals=None) -> Union[str, object]:
-    if typename is None:
-        return None
-    if typename == "super" or typename.startswith("super()"):
-        # Cant eval super; causes RuntimeError
-        return None
+# Results of class_for_typename, including misses, keyed on the typename
+# and the identity of the imported names it was evaluated with
+_TYPENAME_CACHE: Dict[Tuple[str, Optional[int]], Tuple[Optional[dict], Any]] = {}
+_TYPENAME_CACHE_SIZE = 10000
+_MISS = object()
+
+
+def _eval_typename(typename: str, locals):
+    """eval(typename, globals(), locals), without eval for dotted names"""
+    parts = typename.split(".")
+    if not all(p.isidentifier() and not keyword.iskeyword(p) for p in parts):
+        return eval(typename, globals(), locals)
+    head = parts[0]
+    if locals and head in locals:
+        value = locals[head]
+    elif head in globals():
+        value = globals()[head]
+    elif hasattr(builtins, head):
+        value = getattr(builtins, head)
+    else:
+        raise NameError(f"name '{head}' is not defined")
+    for part in parts[1:]:
+        value = getattr(value, part)
+    return value
+
+
+def _class_for_typename(typename: str, locals):
     try:
-        typeclass = eval(typename, globals(), locals)
+        typeclass = _eval_typename(typename, locals)
         if hasattr(typeclass, "__self__") and not isinstance(
             typeclass.__self__, type(sys)
         ):
@@ -120,7 +144,41 @@ def class_for_typename(typename: str, default_type, locals=None) -> Union[str, o
         return typeclass
     except (NameError, SyntaxError, AttributeError, TypeError):
         logger.info(f"could not evaluate {typename}")
-        return default_type
+        return _MISS
+
+
+def class_for_typename(typename: str, default_type, locals=None) -> Union[str, object]:
+    if typename is None:
+        return None
+    if typename == "super" or typename.startswith("super()"):
+        # Cant eval super; causes RuntimeError
+        return None
+    if not locals:
+        locals = None
+    key = (typename, None if locals is None else id(locals))
+    cached = _TYPENAME_CACHE.get(key)
+    if cached is not None and cached[0] is locals:
+        typeclass = cached[1]
+    else:
+        typeclass = _class_for_typename(typename, locals)
+        if len(_TYPENAME_CACHE) >= _TYPENAME_CACHE_SIZE:
+            _TYPENAME_CACHE.clear()
+        # Keep locals referenced, so that its id is not reused
+        _TYPENAME_CACHE[key] = (locals, typeclass)
+    return default_type if typeclass is _MISS else typeclass
+
+
+def qualified_name(name: str, qualified_imports) -> Optional[str]:
+    """Fully qualified name of an imported name, found without importing it"""
+    if not name or not qualified_imports:
+        return None
+    head, sep, rest = name.partition(".")
+    if head in qualified_imports:
+        return f"{qualified_imports[head]}{sep}{rest}"
+    # Already qualified, as the types that plugins give to imported objects
+    if sep and any(q.partition(".")[0] == head for q in qualified_imports.values()):
+        return name
+    return None
 
 
 def c_symbol(node):
@@ -129,22 +187,65 @@ def c_symbol(node):
     return symbols[symbol_type]
 
 
+class ModuleContext(threading.local):
+    """
+    The state of the module a transpiler is working on. Every thread sees
+    its own context, so that one transpiler can work on many modules at once.
+    """
+
+
+class ModuleState:
+    """
+    A per-module attribute of a transpiler. Its value is kept in the
+    ModuleContext of the transpiler and starts as factory() for every module.
+    """
+
+    def __init__(self, factory=None):
+        self._factory = factory
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        values = obj._context.__dict__
+        try:
+            return values[self._name]
+        except KeyError:
+            value = self._factory() if self._factory else None
+            values[self._name] = value
+            return value
+
+    def __set__(self, obj, value):
+        obj._context.__dict__[self._name] = value
+
+
 class CLikeTranspiler(ast.NodeVisitor):
-    """Provides a base for C-like programming languages"""
+    """
+    Provides a base for C-like programming languages. The tables set up in
+    __init__ are shared by all modules, while the ModuleState attributes
+    are per-module.
+    """
 
     NAME: str
 
     builtin_constants = frozenset(["True", "False"])
 
+    _headers = ModuleState(set)
+    _usings = ModuleState(set)
+    _imported_names = ModuleState(dict)
+    _features = ModuleState(set)
+    _imports = ModuleState(list)
+    _basedir = ModuleState()
+    _filename = ModuleState()
+    _module = ModuleState()
+    _globals = ModuleState(set)
+    _qualified_imports = ModuleState(dict)
+
     def __init__(self):
+        self._context = ModuleContext()
         self._type_map = {}
-        self._headers = set([])
-        self._usings = set([])
-        self._imported_names: Dict[str, Any] = {}
-        self._features = set([])
-        self._imports = []
-        self._basedir = None
-        self._filename = None
         self._container_type_map = DEFAULT_CONTAINER_MAP
         self._default_type = _AUTO
         self._statement_separator = ";"
@@ -160,8 +261,6 @@ class CLikeTranspiler(ast.NodeVisitor):
         self._keywords = {}
         self._throw_on_unimplemented = True
         #
-        self._module = None
-        self._globals = set([])
         self._external_type_map = {}
         self._module_dispatch_table = {}
 
@@ -252,24 +351,13 @@ class CLikeTranspiler(ast.NodeVisitor):
             except Exception as e:
                 raise AstNotImplementedError(e, node) from e
 
-    def visit_Module(self, node) -> str:
-        # Reset state
-        self._usings.clear()
-        self._globals.clear()
-        self._headers.clear()
-        self._imported_names = getattr(node, "imported_names", {})
-        self._features.clear()
+    def reset(self):
+        """Forget the state left behind by the previously transpiled module"""
+        self._context.__dict__.clear()
 
-        # Get attributes
-        self._filename = getattr(node, "__file__", None)
-        if self._filename:
-            self._module = Path(self._filename).stem
-        # If there is an import_basedir, use that instead of basedir
-        self._basedir = getattr(
-            node, "import_basedir", getattr(node, "__basedir__", None)
-        )
-
-        self._imports = list(map(get_id, getattr(node, "imports", [])))
+    def visit_Module(self, node) -> str:
+        self.reset()
+        self._enter_module(node)
 
         # Visit non-function nodes
         body_dict: Dict[ast.AST, str] = OrderedDict()
@@ -285,6 +373,22 @@ class CLikeTranspiler(ast.NodeVisitor):
 
         return self.join_module_body(node, body_dict)
 
+    def _enter_module(self, node: ast.Module):
+        """Sets up the context of node"""
+        self._imported_names = getattr(node, "imported_names", {})
+        self._qualified_imports = getattr(node, "qualified_imports", {})
+
+        # Get attributes
+        self._filename = getattr(node, "__file__", None)
+        if self._filename:
+            self._module = Path(self._filename).stem
+        # If there is an import_basedir, use that instead of basedir
+        self._basedir = getattr(
+            node, "import_basedir", getattr(node, "__basedir__", None)
+        )
+
+        self._imports = list(map(get_id, getattr(node, "imports", [])))
+
     def join_module_body(self, node, body_dict: Dict[ast.AST, str]):
         """Join the module's body"""
         docstring = self._get_docstring(node)
@@ -729,6 +833,17 @@ class CLikeTranspiler(ast.NodeVisitor):
             return None
         return func
 
+    def _key_for_lookup(self, fname, table):
+        """The key of fname in a table keyed by python objects or by the
+        fully qualified names of objects that can't be imported here"""
+        func = self._func_for_lookup(fname)
+        if func is not None and func in table:
+            return func
+        name = qualified_name(fname, self._qualified_imports)
+        if name is not None and name in table:
+            return name
+        return None
+
     def _func_name_split(self, fname: str) -> Tuple[str, str]:
         if not fname:
             return None, None
@@ -753,8 +868,8 @@ class CLikeTranspiler(ast.NodeVisitor):
             except IndexError:
                 return None
 
-        func = self._func_for_lookup(fname)
-        if func is not None and func in self._func_dispatch_table:
+        func = self._key_for_lookup(fname, self._func_dispatch_table)
+        if func is not None:
             if func in self._func_usings_map:
                 self._usings.add(self._func_usings_map[func])
             ret, node.result_type = self._func_dispatch_table[func]
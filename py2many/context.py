@@ -4,6 +4,7 @@ from pathlib import PosixPath, WindowsPath
 from py2many.ast_helpers import get_id
 from py2many.helpers import get_import_module_name, is_dir
 from py2many.tracer import is_list_assignment
+from .fused_walk import WalkHook
 from .scope import ScopeMixin
 
 
@@ -260,37 +261,31 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         return node
 
 
-class LHSAnnotationTransformer(ast.NodeTransformer):
+class LHSAnnotationTransformer(WalkHook):
+    """Marks the nodes on the LHS of an assignment"""
+
     def __init__(self):
         super().__init__()
-        self._lhs = False
+        self._lhs = 0
+        self._targets = set()
 
-    def visit(self, node):
+    def enter(self, node):
+        if node in self._targets:
+            self._lhs += 1
         if self._lhs:
-            node.lhs = self._lhs
-        return super().visit(node)
+            node.lhs = True
+        return super().enter(node)
 
-    def visit_Assign(self, node):
-        for target in node.targets:
-            self._lhs = True
-            self.visit(target)
-            self._lhs = False
-        self.visit(node.value)
-        return node
+    def leave(self, node):
+        if node in self._targets:
+            self._targets.discard(node)
+            self._lhs -= 1
 
-    def visit_AnnAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.annotation)
-        if node.value is not None:
-            self.visit(node.value)
-        return node
+    def enter_Assign(self, node):
+        self._targets.update(node.targets)
 
-    def visit_AugAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.op)
-        self.visit(node.value)
-        return node
+    def enter_AnnAssign(self, node):
+        self._targets.add(node.target)
+
+    def enter_AugAssign(self, node):
+        self._targets.add(node.target)
@@ -1,9 +1,13 @@
+import ast
 from dataclasses import dataclass
+import importlib.util
 import os
-import imp
-from pydoc import ispath
+import sys
+import threading
 from types import ModuleType
 
+from py2many.ast_helpers import get_id
+
 MOD_DIR = f"external{os.sep}modules"
 
 # Alternative: ("plugins", [(_small_dispatch_map, "SMALL_DISPATCH_MAP"), ...]
@@ -33,32 +37,134 @@ LANG_MAP = {
     "v": "pyv",
 }
 
+# Modules that plugins import to do their work. They don't tell
+# which library a plugin is for.
+PLUGIN_SUPPORT_MODULES = set(
+    ["ast", "os", "re", "subprocess", "sys", "typing", "py2many", *LANG_MAP.values()]
+)
+
+
+def imported_libraries(node: ast.AST) -> set[str]:
+    """Top level names of the modules imported anywhere in node"""
+    libraries = set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.Import):
+            libraries.update(alias.name.split(".")[0] for alias in n.names)
+        elif isinstance(n, ast.ImportFrom) and n.module and not n.level:
+            libraries.add(n.module.split(".")[0])
+    return libraries
+
+
+class ExternalModules:
+    """
+    The external module plugins of a language. The libraries a plugin is for
+    are read from its file name and imports, or from its LIBRARIES list,
+    without running it. A plugin is imported the first time an input imports
+    one of its libraries, and its maps are merged into the tables of the
+    process. Plugins with LIBRARIES = None map builtins and are always
+    loaded.
+    """
+
+    def __init__(self, path: str):
+        self._pending = self._read_manifest(path)
+        self.tables = {}
+        self.generation = 0
+
+    @staticmethod
+    def _read_manifest(path: str) -> dict[str, set[str]]:
+        manifest = {}
+        for file in sorted(os.listdir(path)):
+            mod_path = os.path.join(path, file)
+            if not os.path.isfile(mod_path) or file == "__init__.py":
+                continue
+            with open(mod_path) as f:
+                tree = ast.parse(f.read(), mod_path)
+            libraries = {os.path.splitext(file)[0]}
+            for stmt in tree.body:
+                if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+                    libraries |= imported_libraries(stmt)
+                elif (
+                    isinstance(stmt, ast.Assign)
+                    and len(stmt.targets) == 1
+                    and get_id(stmt.targets[0]) == "LIBRARIES"
+                ):
+                    # Explicit manifest. None for plugins of builtins,
+                    # which are always loaded
+                    libraries = ast.literal_eval(stmt.value)
+                    break
+            manifest[mod_path] = (
+                None if libraries is None else set(libraries) - PLUGIN_SUPPORT_MODULES
+            )
+        return manifest
+
+    def load(self, libraries: set[str]):
+        """Imports the plugins for the given libraries that aren't loaded yet,
+        and the plugins that are always loaded"""
+        for mod_path, mod_libraries in list(self._pending.items()):
+            if mod_libraries is None or mod_libraries & libraries:
+                self._merge(self._load_plugin(mod_path))
+                del self._pending[mod_path]
+
+    @staticmethod
+    def _load_plugin(mod_path: str) -> ModuleType:
+        mod_name = os.path.split(mod_path)[1]
+        spec = importlib.util.spec_from_file_location(mod_name, mod_path)
+        ext_mod = importlib.util.module_from_spec(spec)
+        sys.modules[mod_name] = ext_mod
+        spec.loader.exec_module(ext_mod)
+        return ext_mod
+
+    def _merge(self, ext_mod: ModuleType):
+        for _, map_name in MOD_NAMES:
+            if map_name in ext_mod.__dict__:
+                obj = ext_mod.__dict__[map_name]
+                table = self.tables.setdefault(map_name, obj.__class__())
+                _update(table, obj)
+        self.generation += 1
+
+
+def _update(curr_val, obj):
+    # Update value in default containers
+    if isinstance(curr_val, dict):
+        curr_val |= obj
+    elif isinstance(curr_val, list):
+        curr_val.extend(obj)
+    elif isinstance(curr_val, set):
+        curr_val.update(obj)
+
+
+_EXTERNAL_MODULES: dict[str, ExternalModules] = {}
+# Transpilers may visit modules from several threads at once
+_LOAD_LOCK = threading.Lock()
+
 
 @dataclass
 class ExternalBase:
     """Base class to add external modules"""
 
     def import_external_modules(self, lang):
-        """Updates all the dispatch maps to account for external modules"""
-        external_mods: list[tuple[str, str]] = self._get_external_modules(lang)
-        if external_mods:
-            for mod_path in external_mods:
-                split_name: tuple[str, str] = os.path.split(mod_path)
-                mod_name = split_name[1]
-                ext_mod: ModuleType = imp.load_source(mod_name, mod_path)
-                for attr_name, map_name in MOD_NAMES:
-                    if attr_name in self.__dict__ and map_name in ext_mod.__dict__:
-                        obj = ext_mod.__dict__[map_name]
-                        curr_val = getattr(self, attr_name, None)
-                        # Update value in default containers
-                        if isinstance(curr_val, dict):
-                            curr_val |= obj
-                        elif isinstance(curr_val, list):
-                            curr_val.extend(obj)
-                        elif isinstance(curr_val, set):
-                            curr_val.update(obj)
-
-    def _get_external_modules(self, lang) -> list[tuple[str, str]]:
+        """Sets up the plugins of lang. They are loaded by load_external_modules"""
+        self._external_modules = self._get_external_modules(lang)
+        self._external_generation = 0
+
+    def load_external_modules(self, node: ast.Module):
+        """Updates all the dispatch maps to account for the external modules
+        imported by node"""
+        external_modules = self._external_modules
+        if external_modules is None:
+            return
+        libraries = imported_libraries(node)
+        with _LOAD_LOCK:
+            external_modules.load(libraries)
+            if self._external_generation == external_modules.generation:
+                return
+            for attr_name, map_name in MOD_NAMES:
+                if attr_name in self.__dict__ and map_name in external_modules.tables:
+                    table = external_modules.tables[map_name]
+                    _update(getattr(self, attr_name, None), table)
+            self._external_generation = external_modules.generation
+
+    def _get_external_modules(self, lang) -> ExternalModules:
         p_lang = lang
         if lang in LANG_MAP:
             p_lang = LANG_MAP[lang]
@@ -66,10 +172,8 @@ class ExternalBase:
             raise Exception(f"Language not supported: {lang}")
         # Get files
         path = f"{os.getcwd()}{os.sep}{p_lang}{os.sep}{MOD_DIR}"
-        if not os.path.isdir(path):
-            return None
-        return [
-            f"{path}{os.sep}{file}"
-            for file in os.listdir(path)
-            if os.path.isfile(os.path.join(path, file)) and file != "__init__.py"
-        ]
+        if path not in _EXTERNAL_MODULES:
+            if not os.path.isdir(path):
+                return None
+            _EXTERNAL_MODULES[path] = ExternalModules(path)
+        return _EXTERNAL_MODULES[path]
@@ -0,0 +1,39 @@
+import ast
+
+
+class WalkHook:
+    """
+    An analysis that runs as part of a fused_walk.
+
+    enter_<NodeClass>(node) is called before the children of a node are
+    walked and leave_<NodeClass>(node) after. When enter returns False the
+    children of the node are skipped for this hook only.
+    """
+
+    def enter(self, node):
+        method = getattr(self, "enter_" + node.__class__.__name__, None)
+        if method is not None:
+            return method(node)
+
+    def leave(self, node):
+        method = getattr(self, "leave_" + node.__class__.__name__, None)
+        if method is not None:
+            method(node)
+
+    def visit(self, node):
+        """Run this hook on its own"""
+        fused_walk(node, [self])
+        return node
+
+
+def fused_walk(node, hooks):
+    """
+    Walk the tree once, calling the hooks in order on each node. The nodes
+    are visited in the same order as by ast.NodeVisitor.generic_visit.
+    """
+    active = [hook for hook in hooks if hook.enter(node) is not False]
+    if active:
+        for child in ast.iter_child_nodes(node):
+            fused_walk(child, active)
+    for hook in hooks:
+        hook.leave(node)
@@ -5,12 +5,89 @@ from pathlib import PosixPath, WindowsPath
 from py2many.ast_helpers import get_id
 
 
+class ImportIndex:
+    """
+    In-memory index of the source tree used to resolve imports. Directories
+    are scanned once, the first time a lookup needs them, and import paths
+    are resolved once per (import name, basedir, working directory).
+    """
+
+    def __init__(self):
+        self._listings = {}
+        self._import_paths = {}
+
+    def clear(self):
+        """Forget everything, so that changes on disk are picked up"""
+        self._listings.clear()
+        self._import_paths.clear()
+
+    def _listing(self, directory):
+        if not os.path.isabs(directory):
+            directory = os.path.join(os.getcwd(), directory)
+        listing = self._listings.get(directory)
+        if listing is None:
+            files, dirs = set(), set()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            dirs.add(entry.name)
+                        elif entry.is_file():
+                            files.add(entry.name)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+            except OSError:
+                # Entries of unreadable directories can still be stat'ed
+                listing = None
+            else:
+                listing = (files, dirs, _casefold(files), _casefold(dirs))
+            self._listings[directory] = listing
+        return listing
+
+    def _lookup(self, path, kind):
+        directory, name = os.path.split(path)
+        if name in ("", ".", ".."):
+            listing = None
+        else:
+            listing = self._listing(directory)
+        check = os.path.isdir if kind else os.path.isfile
+        if listing is None:
+            return check(path)
+        if name in listing[kind]:
+            return True
+        # On case insensitive file systems (macOS, Windows) the name may
+        # differ in case from the listed one, and the file system decides
+        return name.casefold() in listing[kind + 2] and check(path)
+
+    def is_file(self, path):
+        return self._lookup(path, 0)
+
+    def is_dir(self, path):
+        return self._lookup(path, 1)
+
+    def import_path(self, import_name: str, basedir) -> str:
+        key = (import_name, basedir.as_posix(), os.getcwd())
+        path = self._import_paths.get(key)
+        if path is None:
+            path = self._import_paths[key] = _parse_import_path(
+                import_name, basedir, key[2]
+            )
+        return path
+
+
+def _casefold(names):
+    return {name.casefold() for name in names}
+
+
+IMPORT_INDEX = ImportIndex()
+
+
 def is_file(path: str, basedir, extension="py"):
     """Takes a dot separated file path"""
     if not path or not basedir:
         return False
     maybe_path = parse_import_path(path, basedir)
-    return os.path.isfile(f"{maybe_path}.{extension}")
+    return IMPORT_INDEX.is_file(f"{maybe_path}.{extension}")
 
 
 def is_dir(path: str, basedir):
@@ -18,14 +95,18 @@ def is_dir(path: str, basedir):
     if not path or not basedir:
         return False
     maybe_path = parse_import_path(path, basedir)
-    return os.path.isdir(maybe_path)
+    return IMPORT_INDEX.is_dir(maybe_path)
 
 
 def parse_import_path(import_name: str, basedir) -> str:
     """Small wrapper around parse_path function"""
-    cwd = os.getcwd().split(os.sep)
+    return IMPORT_INDEX.import_path(import_name, basedir)
+
+
+def _parse_import_path(import_name: str, basedir, cwd: str) -> str:
+    cwd = cwd.split(os.sep)
     base_dir = basedir.as_posix().split("/")
-    if os.path.isfile(basedir.as_posix()):
+    if IMPORT_INDEX.is_file(basedir.as_posix()):
         base_dir = base_dir[:-1]
     path = import_name.split(".")
     # In case there are empty list positions,
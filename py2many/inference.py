@@ -290,6 +290,7 @@ class InferTypesTransformer(ast.NodeTransformer):
     def visit_Module(self, node: ast.Module) -> Any:
         self._imported_names = node.imported_names
         self._clike._imported_names = self._imported_names
+        self._clike._qualified_imports = getattr(node, "qualified_imports", {})
         self.generic_visit(node)
         return node
 
@@ -787,7 +788,8 @@ class InferTypesTransformer(ast.NodeTransformer):
             ):
                 node.annotation = ast.Name(id=fname)
 
-            if (func := self._clike._func_for_lookup(fname)) in self.FUNC_TYPE_MAP:
+            func = self._clike._key_for_lookup(fname, self.FUNC_TYPE_MAP)
+            if func is not None:
                 ann = self.FUNC_TYPE_MAP[func](self, node, node.args, node.keywords)
                 if ann:
                     self._annotate(node, ann)
@@ -801,9 +803,8 @@ class InferTypesTransformer(ast.NodeTransformer):
                     ann = parse_ann(getattr(node.func, "annotation", None))
                     func_name = unparse(ann) if ann else None
                 # Try to match to table entries
-                if (
-                    func := self._clike._func_for_lookup(func_name)
-                ) in self.FUNC_TYPE_MAP:
+                func = self._clike._key_for_lookup(func_name, self.FUNC_TYPE_MAP)
+                if func is not None:
                     ann = self.FUNC_TYPE_MAP[func](self, node, node.args, node.keywords)
                     if ann:
                         self._annotate(node, ann)
@@ -23,6 +23,8 @@ class LanguageSettings:
     create_project: Optional[List[str]] = None
     # Rust likes source files to live in {project}/src for example
     project_subdir: Optional[str] = None
+    # Formatter that reads the code from stdin and writes it to stdout
+    stdin_formatter: Optional[List[str]] = None
 
     def __hash__(self):
         f = tuple(self.formatter) if self.formatter is not None else ()
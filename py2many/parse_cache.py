@@ -0,0 +1,57 @@
+import ast
+import io
+import json
+import pickle
+
+from typing import Dict, Optional
+
+from .build_cache import _hashcontents
+
+# Command line options that change the parsed trees
+PARSE_ARGS = ["pytype", "import_basedir"]
+
+
+class _TreePickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        # ast.parse shares one instance of Load, Add, Eq, ... between all
+        # the trees, so passes that annotate them leave unrelated state behind
+        if isinstance(obj, ast.AST) and not obj._fields:
+            return type(obj), ()
+        return NotImplemented
+
+
+class ParseCache:
+    """Parsed and analysed modules, keyed by their contents.
+
+    Transpiling the same sources to several languages parses them and
+    orders them by their imports only once. The trees are stored pickled
+    and every lookup returns a fresh copy, as the passes of each language
+    rewrite the trees in place. Unpickling takes about as long as parsing
+    and half as long as copy.deepcopy.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, bytes] = {}
+
+    @staticmethod
+    def key(filenames, sources, basedir, args) -> str:
+        key = {
+            "filenames": [str(f) for f in filenames],
+            "sources": [_hashcontents(source) for source in sources],
+            "basedir": str(basedir),
+            "flags": {name: str(getattr(args, name, None)) for name in PARSE_ARGS},
+        }
+        return _hashcontents(json.dumps(key, sort_keys=True))
+
+    def get(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        return None if entry is None else pickle.loads(entry)
+
+    def put(self, key: str, trees: tuple) -> None:
+        f = io.BytesIO()
+        try:
+            _TreePickler(f, pickle.HIGHEST_PROTOCOL).dump(trees)
+            self._entries[key] = f.getvalue()
+        except RecursionError:
+            # Too deeply nested to pickle, the trees are parsed again instead
+            pass
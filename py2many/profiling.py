@@ -0,0 +1,142 @@
+import ast
+import csv
+import json
+import time
+import tracemalloc
+
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List
+
+
+def pass_name(p) -> str:
+    """Name of a rewriter, transformer or inference function"""
+    func = getattr(p, "func", p)  # functools.partial
+    if isinstance(func, ast.NodeVisitor):
+        return type(func).__name__
+    return getattr(func, "__name__", type(func).__name__)
+
+
+def measure_pass(profiler, tree, p):
+    """Context manager measuring pass p on tree, if profiling is enabled"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.measure(tree, p if isinstance(p, str) else pass_name(p))
+
+
+class PassProfiler:
+    """
+    Records the wall time, the peak memory growth and the number of nodes
+    visited of every pass run on every module. Visited nodes are the nodes
+    passed to ast.NodeVisitor.visit or yielded by ast.iter_child_nodes,
+    which ast.walk uses, while the pass runs. As memory tracing and node counting slow the passes down, they
+    are skipped with time_only, which only records wall times.
+    Call close() when done, to stop the tracing and counting it started.
+    """
+
+    FIELDS = ["module", "index", "pass", "seconds", "peak_memory_kb", "visited_nodes"]
+
+    def __init__(self, time_only: bool = False):
+        self.records: List[Dict[str, Any]] = []
+        self.time_only = time_only
+        self._index: Dict[str, int] = {}
+        self._visited_nodes = 0
+        self._started_tracing = False
+        self._originals = None
+        if not time_only:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            self._count_visits()
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self._originals is not None:
+            ast.NodeVisitor.visit, ast.iter_child_nodes = self._originals
+            self._originals = None
+
+    def _count_visits(self):
+        visit, iter_child_nodes = ast.NodeVisitor.visit, ast.iter_child_nodes
+        self._originals = visit, iter_child_nodes
+
+        def counted_visit(visitor, node):
+            self._visited_nodes += 1
+            return visit(visitor, node)
+
+        def counted_iter_child_nodes(node):
+            for n in iter_child_nodes(node):
+                self._visited_nodes += 1
+                yield n
+
+        ast.NodeVisitor.visit = counted_visit
+        ast.iter_child_nodes = counted_iter_child_nodes
+
+    @contextmanager
+    def measure(self, tree, name: str):
+        module = str(getattr(tree, "__file__", None))
+        index = self._index.get(module, 0)
+        self._index[module] = index + 1
+        if not self.time_only:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            visited_before = self._visited_nodes
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_memory_kb = visited_nodes = None
+            if not self.time_only:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_memory_kb = (peak - before) / 1024
+                visited_nodes = self._visited_nodes - visited_before
+            self.records.append(
+                {
+                    "module": module,
+                    "index": index,
+                    "pass": name,
+                    "seconds": seconds,
+                    "peak_memory_kb": peak_memory_kb,
+                    "visited_nodes": visited_nodes,
+                }
+            )
+
+    def write_report(self, path):
+        """Write the records as csv or, for any other extension, as json"""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if str(path).endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+            else:
+                json.dump(self.records, f, indent=1)
+
+    def summary(self) -> str:
+        """Table of the passes sorted by their total time"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record["pass"], {"seconds": 0, "runs": 0, "memory": 0, "nodes": 0}
+            )
+            total["seconds"] += record["seconds"]
+            total["runs"] += 1
+            if not self.time_only:
+                total["memory"] = max(total["memory"], record["peak_memory_kb"])
+                total["nodes"] += record["visited_nodes"]
+        header = f"{'pass':<45} {'runs':>6} {'total s':>9} {'mean ms':>9}"
+        if not self.time_only:
+            header += f" {'peak KiB':>10} {'visited':>10}"
+        lines = [header, "-" * len(header)]
+        for name, total in sorted(
+            totals.items(), key=lambda item: item[1]["seconds"], reverse=True
+        ):
+            mean_ms = total["seconds"] * 1000 / total["runs"]
+            line = (
+                f"{name:<45} {total['runs']:>6} {total['seconds']:>9.3f} "
+                f"{mean_ms:>9.2f}"
+            )
+            if not self.time_only:
+                line += f" {total['memory']:>10.1f} {int(total['nodes']):>10}"
+            lines.append(line)
+        return "\n".join(lines)
@@ -1,6 +1,11 @@
 import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
 from pathlib import PosixPath
 import hashlib
+from typing import Dict, List
 
 try:
     from pytype import analyze, errors, config, load_pytd
@@ -12,13 +17,15 @@ except ModuleNotFoundError:
     import logging
 
     log_errors = logging.Logger("py2many")
-
-    def pytype_annotate_and_merge(source, basedir, filename):
-        return source
+    analyze = None
 
 
 from py2many.helpers import parse_path
 
+STORE_FILE = "pytype.sqlite3"
+# Lets several source trees or CI jobs share one store
+STORE_ENV = "PY2MANY_PYTYPE_STORE"
+
 
 # Args class taken from pytd_utils
 class Args:
@@ -35,7 +42,93 @@ class Args:
         return exts[int(self.as_comments)] + ".py"
 
 
+def _pytype_version() -> str:
+    try:
+        return metadata.version("pytype")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class PyiStore:
+    """The .pyi files inferred by pytype, keyed by the hash of the source
+    and the versions of pytype and python. It is an SQLite database, so
+    concurrent runs for other languages or in other CI jobs can share it.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=60)
+        if self._conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            # Readers don't block the writer
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pyi (hash TEXT, version TEXT, "
+                "pyi TEXT NOT NULL, PRIMARY KEY (hash, version)) WITHOUT ROWID"
+            )
+        python_version = ".".join(map(str, sys.version_info[:2]))
+        self._version = f"{_pytype_version()}-{python_version}"
+
+    def get(self, hashes) -> Dict[str, str]:
+        pyis = {}
+        for hash in set(hashes):
+            row = self._conn.execute(
+                "SELECT pyi FROM pyi WHERE hash = ? AND version = ?",
+                (hash, self._version),
+            ).fetchone()
+            if row is not None:
+                pyis[hash] = row[0]
+        return pyis
+
+    def put(self, pyis: Dict[str, str]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pyi VALUES (?, ?, ?)",
+                [(hash, self._version, pyi) for hash, pyi in pyis.items()],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
 def pytype_annotate_and_merge(src: str, basedir: PosixPath, filename: PosixPath):
+    return pytype_annotate_and_merge_many([src], basedir, [filename])[0]
+
+
+def pytype_annotate_and_merge_many(
+    sources: List[str], basedir: PosixPath, filenames: List[PosixPath], jobs=1
+) -> List[str]:
+    """Annotates sources with the types inferred by pytype. Modules that
+    are not in the store yet are inferred by a pool of jobs processes"""
+    if analyze is None:
+        return list(sources)
+    store = PyiStore(os.environ.get(STORE_ENV) or _default_store(basedir))
+    hashes = [_hashcontents(src) for src in sources]
+    try:
+        pyis = store.get(hashes)
+        todo = {hash: src for hash, src in zip(hashes, sources) if hash not in pyis}
+        if len(todo) < len(sources):
+            print(f"Types already up-to-date: {len(sources) - len(todo)} module(s)")
+        if todo:
+            print(f"Infering Types: {len(todo)} module(s)")
+            if jobs > 1 and len(todo) > 1:
+                with ProcessPoolExecutor(min(jobs, len(todo))) as executor:
+                    inferred = executor.map(_infer_types, todo.values())
+                    inferred = dict(zip(todo, inferred))
+            else:
+                inferred = {hash: _infer_types(src) for hash, src in todo.items()}
+            store.put(inferred)
+            pyis.update(inferred)
+    finally:
+        store.close()
+    # Set as_comments to 0
+    args = Args(as_comments=0)
+    return [
+        merge_pyi.annotate_string(args, src, pyis[hash])
+        for src, hash in zip(sources, hashes)
+    ]
+
+
+def _default_store(basedir: PosixPath) -> str:
     pre_parsed_base_dir = (
         f"{os.getcwd()}{os.sep}{basedir}"
         if os.path.isdir(f"{os.getcwd()}{os.sep}{basedir}")
@@ -43,29 +136,10 @@ def pytype_annotate_and_merge(src: str, basedir: PosixPath, filename: PosixPath)
     )
     base_dir = parse_path(pre_parsed_base_dir.split(os.sep), os.sep)
     pyi_dir = f"{base_dir}_pyi"
-    pyi_file = f"{pyi_dir}{os.sep}{filename.stem}.pyi"
-    file_path = f"{base_dir}{os.sep}{filename}"
-    pyi_log_file = f"{pyi_dir}{os.sep}.log"
-    log_data: dict[str, str] = _read_log_file_contents(pyi_log_file)
-    hash = _hashcontents(src)
-    if file_path in log_data and hash == log_data[file_path]:
-        # If a file already exists and is up-to-date,
-        # use that instead of infering the types again
-        print("Types already up-to-date")
-        with open(pyi_file, "r") as f:
-            pyi_src = f.read()
-    else:
-        # Otherwise, infer the types and create the .pyi file
-        print("Infering Types")
-        pyi_src = _infer_types(src)
-        _write_to_pyi_file(pyi_dir, pyi_file, pyi_src)
-        _append_to_log_file(pyi_log_file, (file_path, hash))
+    os.makedirs(pyi_dir, exist_ok=True)
     # Create .gitignore to ignore .pyi data
     _create_gitignore(pyi_dir)
-    # Set as_comments to 0
-    args = Args(as_comments=0)
-    annotated_src = merge_pyi.annotate_string(args, src, pyi_src)
-    return annotated_src
+    return f"{pyi_dir}{os.sep}{STORE_FILE}"
 
 
 def _infer_types(src):
@@ -77,43 +151,11 @@ def _infer_types(src):
     return pytd_utils.Print(typed_ast)
 
 
-def _write_to_pyi_file(pyi_dir: str, pyi_file: str, pyi_src: str):
-    if not os.path.isdir(pyi_dir):
-        os.mkdir(pyi_dir)
-    with open(pyi_file, "w") as f:
-        f.write(pyi_src)
-
-
 def _hashcontents(contents: str):
     hash_object = hashlib.sha256(bytes(contents, "utf-8"))
     return hash_object.hexdigest()
 
 
-def _read_log_file_contents(pyi_log_file):
-    """Reads stored contents containing
-    data about inferred python modules"""
-    log_data = {}
-    if os.path.isfile(pyi_log_file):
-        with open(pyi_log_file, "r") as log:
-            try:
-                line = log.readline()
-                while line:
-                    mod_name, hash = line.split("-")
-                    log_data[mod_name] = hash.strip()
-                    line = log.readline()
-            except:
-                raise Exception("Wrong format for pytype log data")
-    return log_data
-
-
-def _append_to_log_file(pyi_log_file, data: tuple[str, str]):
-    """Writes data of inferred python modules"""
-    mod_name, hash = data
-    with open(pyi_log_file, "a") as log:
-        log.write(f"{mod_name}-{hash}\n")
-        # log.writelines([f"{mod_name}-{hash}\n" for mod_name, hash in log_data.items()])
-
-
 def _create_gitignore(pyi_dir):
     """Create a .gitignore similarly to how pytype does it"""
     pyi_gitignore = f"{pyi_dir}{os.sep}.gitignore"
@@ -1,31 +1,22 @@
+import importlib
+import importlib.util
 import os
 import pathlib
 
+from dataclasses import dataclass
 from unittest.mock import Mock
 
 from .language import LanguageSettings
 
-from .python_transformer import PythonTranspiler, RestoreMainRewriter
-
-from .rewriters import InferredAnnAssignRewriter
-
-from pycpp import settings as cpp_settings
-from pydart import settings as dart_settings
-from pygo import settings as go_settings
-from pyjl import settings as julia_settings
-from pykt import settings as kotlin_settings
-from pynim import settings as nim_settings
-from pyrs import settings as rust_settings
-from pysmt import settings as smt_settings
-from pyv import settings as vlang_settings
-
-
 PY2MANY_DIR = pathlib.Path(__file__).parent
 ROOT_DIR = PY2MANY_DIR.parent
 FAKE_ARGS = Mock(indent=4)
 
 
 def python_settings(args, env=os.environ):
+    from .python_transformer import PythonTranspiler, RestoreMainRewriter
+    from .rewriters import InferredAnnAssignRewriter
+
     return LanguageSettings(
         PythonTranspiler(),
         ".py",
@@ -36,19 +27,39 @@ def python_settings(args, env=os.environ):
     )
 
 
+@dataclass(frozen=True)
+class LanguageEntry:
+    """
+    Static metadata about a backend. The backend (transpiler, plugins and
+    settings) is only imported when its settings are requested.
+    """
+
+    display_name: str
+    module: str
+    settings_func: str = "settings"
+
+    def __call__(self, args, env=os.environ) -> LanguageSettings:
+        module = importlib.import_module(self.module)
+        return getattr(module, self.settings_func)(args, env=env)
+
+
 ALL_SETTINGS = {
-    "python": python_settings,
-    "cpp": cpp_settings,
-    "rust": rust_settings,
-    "julia": julia_settings,
-    "kotlin": kotlin_settings,
-    "nim": nim_settings,
-    "dart": dart_settings,
-    "go": go_settings,
-    "vlang": vlang_settings,
-    "smt": smt_settings,
+    "python": LanguageEntry("Python", __name__, "python_settings"),
+    "cpp": LanguageEntry("C++", "pycpp"),
+    "rust": LanguageEntry("Rust", "pyrs"),
+    "julia": LanguageEntry("Julia", "pyjl"),
+    "kotlin": LanguageEntry("Kotlin", "pykt"),
+    "nim": LanguageEntry("Nim", "pynim"),
+    "dart": LanguageEntry("Dart", "pydart"),
+    "go": LanguageEntry("Go", "pygo"),
+    "vlang": LanguageEntry("V", "pyv"),
+    "smt": LanguageEntry("SMT", "pysmt"),
 }
 
+# The Python backend is only registered when its transpiler is present
+if importlib.util.find_spec(f"{__package__}.python_transformer") is None:
+    del ALL_SETTINGS["python"]
+
 
 def _get_all_settings(args, env=os.environ):
     return dict((key, func(args, env=env)) for key, func in ALL_SETTINGS.items())
@@ -11,7 +11,7 @@ from py2many.inference import get_inferred_type
 
 from typing import Any, cast, Optional
 
-from py2many.scope import ScopeList
+from py2many.scope import ScopeList, invalidate_scope_indexes
 from py2many.tracer import (
     find_node_by_name_and_type,
     find_node_by_type,
@@ -85,6 +85,12 @@ class ComplexDestructuringRewriter(ast.NodeTransformer):
             return f"tmp{self._temp}"
         return f"__tmp{self._temp}"
 
+    def visit_Module(self, node):
+        # Temporaries are numbered per module
+        self._temp = 0
+        self.generic_visit(node)
+        return node
+
     def visit_Assign(self, node):
         if self._disable:
             return node
@@ -144,6 +150,7 @@ def camel_case(name):
 def rename(scope, old_name, new_name):
     tx = RenameTransformer(old_name, new_name)
     tx.visit(scope)
+    invalidate_scope_indexes(scope)
 
 
 class PythonMainRewriter(ast.NodeTransformer):
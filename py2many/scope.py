@@ -46,31 +46,82 @@ class ScopeMixin(object):
         return len([s for s in scopes if isinstance(node, s)]) > 0
 
 
+# Attributes of a scope holding definitions, in lookup order
+SCOPE_DEFINITION_ATTRS = ["vars", "body_vars", "orelse_vars", "body"]
+
+
+def cached_scope_index(scope, key, attrs, build, rebuild=False):
+    """Returns build(lists) for the lists stored in the attrs of scope.
+
+    The result is cached on the scope and rebuilt when one of the lists was
+    replaced or changed length. Passes that modify a body in place
+    otherwise must call invalidate_scope_indexes, as is done after every
+    rewriter and by add_scope_context.
+    """
+    lists = [getattr(scope, attr, None) for attr in attrs]
+    indexes = scope.__dict__.setdefault("_scope_indexes", {})
+    cached = indexes.get(key)
+    if not rebuild and cached is not None:
+        sources, index = cached
+        if all(
+            lst is source and (lst is None or len(lst) == size)
+            for lst, (source, size) in zip(lists, sources)
+        ):
+            return index
+    index = build(lists)
+    sources = [(lst, None if lst is None else len(lst)) for lst in lists]
+    indexes[key] = (sources, index)
+    return index
+
+
+def invalidate_scope_indexes(node):
+    """Drop the cached indexes of the scopes in the subtree of node"""
+    for n in ast.walk(node):
+        n.__dict__.pop("_scope_indexes", None)
+
+
+def _build_name_index(lists):
+    """Maps each name defined in lists to its first definition"""
+    index = {}
+    for lst in lists:
+        for var in lst or ():
+            id = get_id(var)
+            if id:
+                index.setdefault(id, var)
+    return index
+
+
+def _name_index(scope, rebuild=False):
+    return cached_scope_index(
+        scope, "names", SCOPE_DEFINITION_ATTRS, _build_name_index, rebuild
+    )
+
+
 class ScopeList(list):
     """
     Wraps around list of scopes and provides find method for finding
     the definition of a variable
+
+    ScopeLists attached to nodes are shared between all the nodes of a
+    scope and must not be modified.
     """
 
-    def find(self, lookup):
-        """Find definition of variable lookup."""
+    _parent = None
 
-        def find_definition(scope, var_attr="vars"):
-            for var in getattr(scope, var_attr):
-                id = get_id(var)
-                if id and id == lookup:
-                    return var
+    def child(self, scope) -> "ScopeList":
+        """Returns a new ScopeList with scope appended, linked to self"""
+        scopes = ScopeList(self)
+        scopes.append(scope)
+        scopes._parent = self
+        return scopes
 
+    def find(self, lookup):
+        """Find definition of variable lookup."""
         for scope in reversed(self):
-            defn = None
-            if not defn and hasattr(scope, "vars"):
-                defn = find_definition(scope, "vars")
-            if not defn and hasattr(scope, "body_vars"):
-                defn = find_definition(scope, "body_vars")
-            if not defn and hasattr(scope, "orelse_vars"):
-                defn = find_definition(scope, "orelse_vars")
-            if not defn and hasattr(scope, "body"):
-                defn = find_definition(scope, "body")
+            defn = _name_index(scope).get(lookup)
+            if defn is not None and get_id(defn) != lookup:
+                # Renamed in place after the index was built
+                defn = _name_index(scope, rebuild=True).get(lookup)
             if defn:
                 return defn
 
@@ -83,6 +134,8 @@ class ScopeList(list):
 
     @property
     def parent_scopes(self):
+        if self._parent is not None:
+            return self._parent
         scopes = list(self)
         scopes.pop()
         return ScopeList(scopes)
@@ -99,12 +152,26 @@ class ScopeTransformer(ast.NodeTransformer, ScopeMixin):
         super().__init__()
         self._scope_header = False
         self._named_expr = False
+        # One ScopeList per nesting level, shared by the nodes of that level
+        self._scope_lists = [ScopeList()]
+
+    @contextmanager
+    def enter_scope(self, node):
+        if self._is_scopable_node(node):
+            self.scopes.append(node)
+            self._scope_lists.append(self._scope_lists[-1].child(node))
+            yield
+            self._scope_lists.pop()
+            self.scopes.pop()
+        else:
+            yield
 
     def visit(self, node):
+        node.__dict__.pop("_scope_indexes", None)
         with self.enter_scope(node):
-            node.scopes = ScopeList(self.scopes)
+            node.scopes = self._scope_lists[-1]
             if self._scope_header and not self._named_expr and len(node.scopes) > 1:
-                node.scopes = ScopeList(self.scopes[:-1])
+                node.scopes = node.scopes.parent_scopes
             return super().visit(node)
 
     def visit_If(self, node: ast.If):
@@ -0,0 +1,185 @@
+"""
+py2many serve: a long running process that keeps the backends warm.
+
+Requests and responses are JSON-RPC 2.0 objects, one per line, exchanged
+over stdin/stdout or over the connections to a unix socket. For example
+
+    {"jsonrpc": "2.0", "id": 1, "method": "transpile",
+     "params": {"lang": "rust", "source": "print(1)"}}
+
+is answered with
+
+    {"jsonrpc": "2.0", "id": 1, "result": {"output": "...", "formatted": false}}
+"""
+
+import argparse
+import inspect
+import json
+import os
+import socketserver
+import sys
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cli import _format_data, _format_transpile_error, _transpile
+from .language import LanguageSettings
+from .registry import ALL_SETTINGS
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+TRANSPILE_ERROR = -32000
+
+METHODS = {"transpile", "shutdown"}
+
+DEFAULT_FILENAME = "test.py"
+
+
+class RequestError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class TranspileServer:
+    """
+    Answers transpile requests, reusing the settings and transpilers of
+    every language that was asked for before.
+    """
+
+    def __init__(self, args: argparse.Namespace, env=os.environ):
+        self._args = args
+        self._env = env
+        self._settings: Dict[str, LanguageSettings] = {}
+        self.running = True
+
+    def settings(self, lang: str) -> LanguageSettings:
+        if lang not in self._settings:
+            if lang not in ALL_SETTINGS:
+                raise RequestError(INVALID_PARAMS, f"Unknown language: {lang}")
+            settings = ALL_SETTINGS[lang](self._args, env=self._env)
+            if self._args.comment_unsupported:
+                settings.transpiler._throw_on_unimplemented = False
+            self._settings[lang] = settings
+        return self._settings[lang]
+
+    def transpile(
+        self, lang: str, source: str, filename: str = DEFAULT_FILENAME, format=False
+    ) -> Dict[str, Any]:
+        settings = self.settings(lang)
+        filename = Path(filename)
+        try:
+            outputs, _ = _transpile(
+                [filename],
+                [source],
+                settings,
+                self._args,
+                _suppress_exceptions=None,
+                basedir=filename,
+            )
+        except Exception as e:
+            raise RequestError(TRANSPILE_ERROR, _format_transpile_error(filename, e))
+        finally:
+            # Don't keep the module alive until the next request
+            settings.transpiler.reset()
+        output = outputs[0]
+        formatted = False
+        if format and settings.formatter:
+            output, formatted = _format_data(settings, output, self._env)
+        return {"output": output, "formatted": formatted}
+
+    def shutdown(self) -> None:
+        self.running = False
+
+    def handle(self, line: str) -> Optional[Dict[str, Any]]:
+        """Answers one request. Returns None for notifications"""
+        request_id = None
+        notification = False
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                raise RequestError(PARSE_ERROR, str(e))
+            if not isinstance(request, dict) or "method" not in request:
+                raise RequestError(INVALID_REQUEST, "Not a JSON-RPC request")
+            request_id = request.get("id")
+            notification = "id" not in request
+            result = self._call(request["method"], request.get("params", {}))
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except Exception as e:
+            if isinstance(e, RequestError):
+                error = {"code": e.code, "message": e.message}
+            else:
+                error = {"code": INTERNAL_ERROR, "message": f"{type(e).__name__}: {e}"}
+            response = {"jsonrpc": "2.0", "id": request_id, "error": error}
+        return None if notification else response
+
+    def _call(self, method: str, params):
+        if method not in METHODS:
+            raise RequestError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        func = getattr(self, method)
+        if not isinstance(params, dict):
+            raise RequestError(INVALID_PARAMS, "params must be an object")
+        try:
+            inspect.signature(func).bind(**params)
+        except TypeError as e:
+            raise RequestError(INVALID_PARAMS, str(e))
+        return func(**params)
+
+    def serve(self, rfile, wfile) -> None:
+        """Answers the requests read from rfile until shutdown or EOF"""
+        for line in rfile:
+            if not line.strip():
+                continue
+            # Keep diagnostics of the transpilers out of the responses
+            with redirect_stdout(sys.stderr):
+                response = self.handle(line)
+            if response is not None:
+                wfile.write(json.dumps(response) + "\n")
+                wfile.flush()
+            if not self.running:
+                break
+
+
+def _serve_unix_socket(server: TranspileServer, path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            rfile = (line.decode("utf-8") for line in self.rfile)
+            wfile = _TextWriter(self.wfile)
+            server.serve(rfile, wfile)
+
+    if os.path.exists(path):
+        os.remove(path)
+    # Requests are answered one at a time, the rewriters are not reentrant
+    with socketserver.UnixStreamServer(path, Handler) as unix_server:
+        try:
+            while server.running:
+                unix_server.handle_request()
+        finally:
+            os.remove(path)
+
+
+class _TextWriter:
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, text: str) -> None:
+        self._wfile.write(text.encode("utf-8"))
+
+    def flush(self) -> None:
+        self._wfile.flush()
+
+
+def serve(args: argparse.Namespace, env=os.environ) -> int:
+    server = TranspileServer(args, env)
+    if args.socket:
+        print(f"Listening on {args.socket}", file=sys.stderr)
+        _serve_unix_socket(server, args.socket)
+    else:
+        server.serve(sys.stdin, sys.stdout)
+    return 0
@@ -5,6 +5,7 @@ import ast
 from py2many.analysis import get_id
 from py2many.clike import CLikeTranspiler
 from py2many.exceptions import AstNotImplementedError
+from py2many.scope import cached_scope_index
 
 from typing import Optional
 
@@ -14,19 +15,44 @@ def decltype(node):
     pass
 
 
-# is it slow? is it correct?
+def _build_definition_index(lists):
+    """ClassDefs by name, FunctionDefs by first argument and imports by name
+    of a scope"""
+    body, imports = lists
+    classes = {}
+    functions = {}
+    for entry in body or ():
+        if isinstance(entry, ast.ClassDef):
+            classes.setdefault(entry.name, entry)
+        elif isinstance(entry, ast.FunctionDef) and len(entry.args.args):
+            first_arg = get_id(entry.args.args[0])
+            functions.setdefault(first_arg, []).append(entry)
+    imported = {}
+    for entry in imports or ():
+        imported.setdefault(entry.name, entry)
+    return classes, functions, imported
+
+
+def _definition_index(scope, rebuild=False):
+    return cached_scope_index(
+        scope, "definitions", ["body", "imports"], _build_definition_index, rebuild
+    )
+
+
 def _lookup_class_or_module(name, scopes) -> Optional[ast.ClassDef]:
     for scope in scopes:
         if isinstance(scope, ast.ClassDef) and scope.name == name:
             return scope
-        for entry in scope.body:
-            if isinstance(entry, ast.ClassDef):
-                if entry.name == name:
-                    return entry
-        if hasattr(scope, "imports"):
-            for entry in scope.imports:
-                if entry.name == name:
-                    return entry
+        classes, _, imported = _definition_index(scope)
+        entry = classes.get(name)
+        if entry is not None and entry.name != name:
+            # Renamed in place after the index was built
+            classes, _, imported = _definition_index(scope, rebuild=True)
+            entry = classes.get(name)
+        if entry is None:
+            entry = imported.get(name)
+        if entry is not None:
+            return entry
     return None
 
 
@@ -46,12 +72,12 @@ def is_enum(name, scopes):
 
 def is_self_arg(name, scopes):
     for scope in scopes:
-        for entry in scope.body:
-            if isinstance(entry, ast.FunctionDef):
-                if len(entry.args.args):
-                    first_arg = entry.args.args[0]
-                    if get_id(first_arg) == name and hasattr(entry, "self_type"):
-                        return True
+        _, functions, _ = _definition_index(scope)
+        for entry in functions.get(name, ()):
+            if hasattr(entry, "self_type") and len(entry.args.args):
+                first_arg = entry.args.args[0]
+                if get_id(first_arg) == name:
+                    return True
     return False
 
 
@@ -231,20 +257,51 @@ def matches_name(node, name):
     )
 
 
+def _value_type_func(entry, name):
+    if isinstance(entry, ast.Assign):
+        if (
+            name in list(map(get_id, entry.targets))
+            and hasattr(entry, "value")
+            and isinstance(entry.value, ast.Call)
+            and hasattr(entry.value, "func")
+        ):
+            return entry.value.func
+    if isinstance(entry, ast.AnnAssign) or isinstance(entry, ast.AugAssign):
+        if name == get_id(entry.target) and hasattr(entry.value, "func"):
+            return entry.value.func
+    return None
+
+
+def _build_assignment_index(lists):
+    """Maps names to the first assignment of the body that assigns them"""
+    (body,) = lists
+    index = {}
+    for entry in body or ():
+        if isinstance(entry, ast.Assign):
+            for target in entry.targets:
+                index.setdefault(get_id(target), entry)
+        elif isinstance(entry, (ast.AnnAssign, ast.AugAssign)):
+            index.setdefault(get_id(entry.target), entry)
+    return index
+
+
 def _lookup_value_type_name(name, scopes):
     for scope in scopes:
+        index = cached_scope_index(
+            scope, "assignments", ["body"], _build_assignment_index
+        )
+        entry = index.get(name)
+        if entry is None:
+            continue
+        func = _value_type_func(entry, name)
+        if func is not None:
+            return func
+        # Either the first assignment is not a call or the entry was
+        # modified in place since the index was built
         for entry in scope.body:
-            if isinstance(entry, ast.Assign):
-                if (
-                    name in list(map(get_id, entry.targets))
-                    and hasattr(entry, "value")
-                    and isinstance(entry.value, ast.Call)
-                    and hasattr(entry.value, "func")
-                ):
-                    return entry.value.func
-            if isinstance(entry, ast.AnnAssign) or isinstance(entry, ast.AugAssign):
-                if name == get_id(entry.target) and hasattr(entry.value, "func"):
-                    return entry.value.func
+            func = _value_type_func(entry, name)
+            if func is not None:
+                return func
     return None
 
 
@@ -1,6 +1,7 @@
 import ast
 
 from py2many.ast_helpers import get_id
+from .fused_walk import WalkHook
 from .scope import ScopeList
 
 
@@ -20,61 +21,44 @@ def correct_node_attributes(node):
     return CorrectNodeAttributes().visit(node)
 
 
-class AnnotationTransformer(ast.NodeTransformer):
+class AnnotationTransformer(WalkHook):
     """
     Adds a flag for every type annotation and nested types so they can be differentiated from array
     """
 
-    def __init__(self):
-        self.handling_annotation = False
-
-    def visit_arg(self, node):
-        if node.annotation:
-            self.handling_annotation = True
-            self.visit(node.annotation)
-            self.handling_annotation = False
-        return node
-
-    def visit_FunctionDef(self, node):
-        if node.returns:
-            self.handling_annotation = True
-            self.visit(node.returns)
-            self.handling_annotation = False
-        self.generic_visit(node)
-        return node
+    # without Tuple Dict[x,y] will be translated to HashMap<(x,y)>
+    ANNOTATION_NODES = {"Tuple", "List", "Name", "Subscript", "Attribute"}
 
-    def _visit_record_handling_annotation(self, node) -> ast.AST:
-        if self.handling_annotation:
+    def __init__(self):
+        self.handling_annotation = 0
+        self._annotations = set()
+
+    def enter(self, node):
+        if node in self._annotations:
+            self.handling_annotation += 1
+        is_annotation_node = node.__class__.__name__ in self.ANNOTATION_NODES
+        if self.handling_annotation and is_annotation_node:
             node.is_annotation = True
-        self.generic_visit(node)
-        return node
+        return super().enter(node)
 
-    # without this Dict[x,y] will be translated to HashMap<(x,y)>
-    def visit_Tuple(self, node: ast.Tuple) -> ast.Tuple:
-        return self._visit_record_handling_annotation(node)
+    def leave(self, node):
+        if node in self._annotations:
+            self._annotations.discard(node)
+            self.handling_annotation -= 1
 
-    def visit_List(self, node: ast.List) -> ast.List:
-        return self._visit_record_handling_annotation(node)
-
-    def visit_Name(self, node: ast.Name) -> ast.Name:
-        return self._visit_record_handling_annotation(node)
-
-    def visit_Subscript(self, node: ast.Subscript) -> ast.Subscript:
-        return self._visit_record_handling_annotation(node)
+    def enter_arg(self, node):
+        if node.annotation:
+            self._annotations.add(node.annotation)
 
-    def visit_Attribute(self, node: ast.Attribute) -> ast.Attribute:
-        return self._visit_record_handling_annotation(node)
+    def enter_FunctionDef(self, node):
+        if node.returns:
+            self._annotations.add(node.returns)
 
-    def visit_AnnAssign(self, node: ast.AnnAssign):
-        self.handling_annotation = True
-        # self.visit(node.target)
-        self.visit(node.annotation)  # Added
-        self.handling_annotation = False
-        self.generic_visit(node)
-        return node
+    def enter_AnnAssign(self, node: ast.AnnAssign):
+        self._annotations.add(node.annotation)
 
 
-class NestingTransformer(ast.NodeTransformer):
+class NestingTransformer(WalkHook):
     """
     Some languages are white space sensitive. This transformer
     annotates relevant nodes with the nesting level
@@ -83,32 +67,45 @@ class NestingTransformer(ast.NodeTransformer):
     def __init__(self):
         self.level = 0
 
-    def _visit_level(self, node) -> ast.AST:
+    def _enter_level(self, node):
         node.level = self.level
         self.level += 1
-        self.generic_visit(node)
+
+    def _leave_level(self, node):
         self.level -= 1
-        return node
 
-    def visit_FunctionDef(self, node):
-        return self._visit_level(node)
+    def enter_FunctionDef(self, node):
+        self._enter_level(node)
 
-    def visit_ClassDef(self, node):
-        return self._visit_level(node)
+    def leave_FunctionDef(self, node):
+        self._leave_level(node)
 
-    def visit_If(self, node):
-        return self._visit_level(node)
+    def enter_ClassDef(self, node):
+        self._enter_level(node)
 
-    def visit_While(self, node):
-        return self._visit_level(node)
+    def leave_ClassDef(self, node):
+        self._leave_level(node)
 
-    def visit_For(self, node):
-        return self._visit_level(node)
+    def enter_If(self, node):
+        self._enter_level(node)
 
-    def visit_Assign(self, node):
+    def leave_If(self, node):
+        self._leave_level(node)
+
+    def enter_While(self, node):
+        self._enter_level(node)
+
+    def leave_While(self, node):
+        self._leave_level(node)
+
+    def enter_For(self, node):
+        self._enter_level(node)
+
+    def leave_For(self, node):
+        self._leave_level(node)
+
+    def enter_Assign(self, node):
         node.level = self.level
-        self.generic_visit(node)
-        return node
 
 
 class MutabilityTransformer(ast.NodeTransformer):
@@ -198,15 +195,23 @@ class MutabilityTransformer(ast.NodeTransformer):
         return node
 
 
-class CorrectNodeAttributes(ast.NodeTransformer):
+class CorrectNodeAttributes(WalkHook):
     """Avoid that newly created nodes are missing any attributes"""
 
-    def __init__(self) -> None:
-        super().__init__()
-
-    def visit(self, node: ast.AST):
-        node = self.generic_visit(node)
+    def leave(self, node: ast.AST):
         if not hasattr(node, "scopes"):
             node.scopes = ScopeList()
-        ast.fix_missing_locations(node)
-        return node
+        # Same as ast.fix_missing_locations(node), as the children of node
+        # were already fixed
+        attributes = node._attributes
+        if "lineno" in attributes and not hasattr(node, "lineno"):
+            node.lineno = 1
+        if "end_lineno" in attributes and getattr(node, "end_lineno", None) is None:
+            node.end_lineno = 1
+        if "col_offset" in attributes and not hasattr(node, "col_offset"):
+            node.col_offset = 0
+        if (
+            "end_col_offset" in attributes
+            and getattr(node, "end_col_offset", None) is None
+        ):
+            node.end_col_offset = 0
@@ -49,16 +49,17 @@ def settings(args, env=os.environ):
         cxx_flags += ["-stdlib=libc++"]
 
     if clang_format_style:
-        clang_format_cmd = ["clang-format", f"-style={clang_format_style}", "-i"]
+        clang_format_cmd = ["clang-format", f"-style={clang_format_style}"]
     else:
-        clang_format_cmd = ["clang-format", "-i"]
+        clang_format_cmd = ["clang-format"]
 
     return LanguageSettings(
         CppTranspiler(args.extension, args.no_prologue),
         ".cpp",
         "C++",
-        clang_format_cmd,
+        [*clang_format_cmd, "-i"],
         None,
         [CppListComparisonRewriter()],
         linter=[cxx, *cxx_flags],
+        stdin_formatter=clang_format_cmd,
     )
@@ -16,7 +16,7 @@ from .plugins import (
 
 from py2many.analysis import add_imports, is_global, is_void_function, get_id
 from py2many.ast_helpers import create_ast_block
-from py2many.clike import _AUTO_INVOKED, class_for_typename
+from py2many.clike import _AUTO_INVOKED, ModuleState, class_for_typename
 from py2many.context import add_variable_context, add_list_calls
 from py2many.declaration_extractor import DeclarationExtractor
 from py2many.exceptions import AstNotImplementedError
@@ -88,6 +88,12 @@ class CppListComparisonRewriter(ast.NodeTransformer):
         self._temp += 1
         return f"__tmp{self._temp}"
 
+    def visit_Module(self, node):
+        # Temporaries are numbered per module
+        self._temp = 0
+        self.generic_visit(node)
+        return node
+
     def visit_Compare(self, node):
         left = self.visit(node.left)
         ops = [self.visit(op) for op in node.ops]
@@ -117,11 +123,11 @@ class CppTranspiler(CLikeTranspiler):
         "Optional": "std::optional",
     }
 
+    # TODO: include only when needed
+    _headers = ModuleState(list)
+
     def __init__(self, extension: bool = False, no_prologue: bool = False):
         super().__init__()
-        # TODO: include only when needed
-        self._headers = []
-        self._usings = set([])
         self.use_catch_test_cases = False
         self._container_type_map = self.CONTAINER_TYPES
         self._extension = extension
@@ -15,7 +15,7 @@ from .plugins import (
 )
 
 from py2many.analysis import get_id, is_mutable, is_void_function
-from py2many.clike import class_for_typename
+from py2many.clike import ModuleState, class_for_typename
 from py2many.declaration_extractor import DeclarationExtractor
 from py2many.inference import get_inferred_type
 from py2many.tracer import is_list, defined_before, is_class_or_module, is_self_arg
@@ -45,11 +45,13 @@ class DartTranspiler(CLikeTranspiler):
         "Optional": "Nothing",
     }
 
+    # Temporaries are numbered per module
+    _temp = ModuleState(int)
+
     def __init__(self):
         super().__init__()
         self._container_type_map = self.CONTAINER_TYPE_MAP
         self._default_type = "var"
-        self._temp = 0
         self._dispatch_map = DISPATCH_MAP
         self._small_dispatch_map = SMALL_DISPATCH_MAP
         self._small_usings_map = SMALL_USINGS_MAP
@@ -41,4 +41,5 @@ def settings(args, env=os.environ):
         linter=(
             ["revive", "--config", str(revive_config)] if revive_config else ["revive"]
         ),
+        stdin_formatter=["gofmt"],
     )
@@ -1,9 +1,12 @@
+import builtins
+import hashlib
 import os
 
 from distutils import spawn
 from functools import lru_cache
 from pathlib import Path
 from subprocess import run
+from typing import Optional, Set
 
 from py2many.language import LanguageSettings
 
@@ -38,15 +41,23 @@ from .optimizations import (
     PerformanceOptimizations,
 )
 
-from .transpiler import JuliaMethodCallRewriter, JuliaTranspiler
+from .transpiler import JuliaTranspiler
 from .transformers import find_ordered_collections, parse_decorators
 from .analysis import (
     analyse_variable_scope,
+    bounds_check_analysis,
     detect_broadcast,
     detect_ctypes_callbacks,
+    detect_parallel_maps,
+    detect_simd_loops,
+    detect_views,
     loop_range_optimization_analysis,
 )
 
+JULIA_BASE_FUNCS_SNAPSHOT = (
+    Path(__file__).parent / "setup_files" / "julia_base_funcs.txt"
+)
+
 
 def _find_julia_base_funcs():
     """Finds Julia base functions"""
@@ -54,7 +65,7 @@ def _find_julia_base_funcs():
         [
             "julia",
             "-e",
-            "println([n for n in names(Base, all=true) if isdefined(Base, n) && isa(getfield(Base, n), Function)])",
+            "foreach(println, [n for n in names(Base, all=true) if isdefined(Base, n) && isa(getfield(Base, n), Function)])",
         ],
         capture_output=True,
     )
@@ -63,6 +74,59 @@ def _find_julia_base_funcs():
     return b""
 
 
+def _julia_cache_key() -> Optional[str]:
+    """Identifies the installed julia binary by its path and modification
+    time, so that checking the cache never has to start Julia"""
+    julia = spawn.find_executable("julia")
+    if not julia:
+        return None
+    julia = os.path.realpath(julia)
+    try:
+        mtime = os.stat(julia).st_mtime_ns
+    except OSError:
+        return None
+    return hashlib.sha256(f"{julia}:{mtime}".encode("utf-8")).hexdigest()[:16]
+
+
+def _julia_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(cache_home) / "py2many"
+
+
+def _read_func_list(path: Path) -> Set[str]:
+    with open(path, encoding="utf-8") as f:
+        return set(
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        )
+
+
+def _julia_base_funcs(refresh=False) -> Set[str]:
+    """Returns the Julia base functions of the installed Julia binary.
+    The list is cached per binary, and the bundled snapshot is used until
+    the list is rebuilt with refresh (which runs julia) or if julia is
+    not installed"""
+    key = _julia_cache_key()
+    if key is None:
+        return _read_func_list(JULIA_BASE_FUNCS_SNAPSHOT)
+    cache_file = _julia_cache_dir() / f"julia_base_funcs-{key}.txt"
+    if not refresh:
+        if cache_file.is_file():
+            return _read_func_list(cache_file)
+        return _read_func_list(JULIA_BASE_FUNCS_SNAPSHOT)
+    output = _find_julia_base_funcs().decode(encoding="utf-8")
+    if not output:
+        return _read_func_list(JULIA_BASE_FUNCS_SNAPSHOT)
+    func_list = set(output.split())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            f.write("# Julia base functions\n")
+            f.write("\n".join(sorted(func_list)))
+    except OSError:
+        pass
+    return func_list
+
+
 @lru_cache()
 def _julia_formatter_path():
     proc = run(
@@ -76,14 +140,9 @@ def _julia_formatter_path():
 def settings(args, env=os.environ):
     format_jl = spawn.find_executable("format.jl")
 
-    # Parse Julia base functions
-    # (TODO: Improve time it takes to import all functions)
-    output = _find_julia_base_funcs().decode(encoding="utf-8")
-    output = output.split(", ")
-    jl_func_list: set[str] = set()
-    for func in output:
-        # Remove ":", as elements are Symbols
-        jl_func_list.add(func[1:])
+    # Julia base functions (cached per julia binary)
+    refresh = getattr(args, "refresh_julia_symbols", False) is True
+    jl_func_list: set[str] = _julia_base_funcs(refresh)
     # Remove all Python builtin functions
     jl_func_list.difference_update(set(dir(builtins)))
 
@@ -98,6 +157,10 @@ def settings(args, env=os.environ):
             parse_decorators,
             analyse_variable_scope,
             loop_range_optimization_analysis,
+            bounds_check_analysis,
+            detect_simd_loops,
+            detect_views,
+            detect_parallel_maps,
             find_ordered_collections,
             detect_broadcast,
             detect_ctypes_callbacks,
@@ -1,15 +1,23 @@
 import ast
+import builtins
 import logging
 import re
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Optional
 
 from py2many.ast_helpers import get_id
+from py2many.clike import qualified_name
 from py2many.helpers import get_ann_repr
 from pyjl.global_vars import (
+    ELIDE_BOUNDS_CHECKS,
+    FASTMATH,
     FIX_SCOPE_BOUNDS,
     FLAG_DEFAULTS,
     LOOP_SCOPE_WARNING,
     OPTIMIZE_LOOP_RANGES,
+    SIMD_LOOPS,
+    USE_THREADS,
+    USE_VIEWS,
 )
 
 logger = logging.Logger("pyjl")
@@ -25,6 +33,26 @@ def loop_range_optimization_analysis(node, extension=False):
     visitor.visit(node)
 
 
+def bounds_check_analysis(node, extension=False):
+    visitor = JuliaBoundsCheckAnalysis()
+    visitor.visit(node)
+
+
+def detect_simd_loops(node, extension=False):
+    visitor = JuliaSimdLoopAnalysis()
+    visitor.visit(node)
+
+
+def detect_views(node, extension=False):
+    visitor = JuliaViewAnalysis()
+    visitor.visit(node)
+
+
+def detect_parallel_maps(node, extension=False):
+    visitor = JuliaParallelMapAnalysis()
+    visitor.visit(node)
+
+
 def detect_broadcast(node, extension=False):
     visitor = JuliaBroadcastTransformer()
     visitor.visit(node)
@@ -35,6 +63,11 @@ def detect_ctypes_callbacks(node, extension=False):
     visitor.visit(node)
 
 
+def is_store(node):
+    # Nodes created by the transformers may have no context
+    return isinstance(getattr(node, "ctx", None), (ast.Store, ast.Del))
+
+
 def get_target(target):
     if id := get_id(target):
         return {id}
@@ -303,6 +336,1143 @@ class JuliaLoopRangesOptimizationAnalysis(ast.NodeTransformer):
         return node
 
 
+# Parents (and their fields) under which a use of a container can't alias it
+NON_ALIASING_USES = {
+    (ast.Subscript, "value"),
+    (ast.Attribute, "value"),
+    (ast.For, "iter"),
+    (ast.comprehension, "iter"),
+    (ast.Compare, "left"),
+    (ast.Compare, "comparators"),
+}
+# Builtins that neither modify nor keep the containers passed to them
+NON_ALIASING_CALLS = {"len", "list", "tuple", "sorted", "sum", "min", "max"}
+
+
+def is_aliased(name: str, scope) -> bool:
+    """Whether the container name is used in scope in a way that can alias
+    it, such as being bound to another name, stored in another container
+    or passed to a call"""
+    return any(
+        isinstance(child, ast.Name)
+        and not isinstance(getattr(child, "ctx", None), (ast.Store, ast.Del))
+        and get_id(child) == name
+        and (type(parent), field) not in NON_ALIASING_USES
+        and not (
+            isinstance(parent, ast.Call)
+            and field == "args"
+            and get_id(parent.func) in NON_ALIASING_CALLS
+        )
+        for parent in ast.walk(scope)
+        for field, value in ast.iter_fields(parent)
+        for child in (value if isinstance(value, list) else [value])
+    )
+
+
+# Types whose methods can't call the functions of the module
+BUILTIN_TYPES = re.compile(
+    r"^(list|List|dict|Dict|set|Set|tuple|Tuple|str|bytes|bytearray|int|float)\b"
+)
+
+
+def is_known_call(node: ast.Call, container: str) -> bool:
+    """Whether node calls a builtin, a method of container or of a builtin
+    container or a function of an imported module, without passing it a
+    function. Such calls can't run the functions of the module"""
+    if any(
+        isinstance(arg, ast.Lambda)
+        or isinstance(arg, ast.Name)
+        and isinstance(node.scopes.find(get_id(arg)), ast.FunctionDef)
+        for arg in node.args + [kw.value for kw in node.keywords]
+    ):
+        return False
+    func = node.func
+    if isinstance(func, ast.Name):
+        return node.scopes.find(func.id) is None and (
+            func.id in dir(builtins) or node.scopes.find_import(func.id)
+        )
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        receiver = get_id(func.value)
+        if receiver == container:
+            return True
+        definition = node.scopes.find(receiver)
+        if definition is None:
+            return node.scopes.find_import(receiver) is not None
+        ann_repr = get_ann_repr(getattr(definition, "annotation", None))
+        return bool(ann_repr and BUILTIN_TYPES.match(ann_repr))
+    return False
+
+
+def arg_names(node: ast.FunctionDef) -> list[str]:
+    args = node.args
+    all_args = args.posonlyargs + args.args + args.kwonlyargs
+    all_args += [a for a in (args.vararg, args.kwarg) if a]
+    return [arg.arg for arg in all_args]
+
+
+@dataclass
+class LoopRange:
+    """The values taken by the target of a loop over range"""
+
+    loop: ast.For
+    # Lower bound of the values
+    lower: int
+    # The values are smaller than the length of a container minus offset.
+    # The length is either ("len", container) or ("name", variable)
+    length: Optional[tuple[str, str]]
+    offset: int
+
+
+class JuliaBoundsCheckAnalysis(ast.NodeTransformer):
+    """Marks the subscripts whose index is proven to be in range with
+    in_bounds, so that the transpiler can emit @inbounds for them.
+
+    The index has to be the target of a loop over range(start, stop, step),
+    plus or minus a constant, where start is not negative, step is positive
+    and stop is len(x) of the container x that is indexed, or n when x was
+    created by [v] * n. Neither the container nor the loop target may be
+    rebound in the loop, the container may not shrink and the loop may not
+    yield. The container may not be aliased either: it can only be
+    indexed, compared, iterated over, have its methods called or be passed
+    to builtins such as len and list that neither change nor keep it, so
+    that no other name or callee can shrink it. As the callers can alias
+    the containers passed as arguments, loops over those may only call
+    builtins, methods of builtin types and functions of imported modules."""
+
+    CONTAINER_TYPES = re.compile(r"^list|^List|^tuple|^Tuple|^bytearray")
+    # Methods that don't shrink a list
+    NON_SHRINKING_METHODS = {
+        "append",
+        "extend",
+        "insert",
+        "count",
+        "index",
+        "copy",
+        "sort",
+        "reverse",
+    }
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._module = None
+        self._scope = None
+        self._loop_ranges: dict[str, LoopRange] = {}
+        # Containers created by [v] * n, mapped to n
+        self._sized_by: dict[str, str] = {}
+        self._stores: dict[str, int] = {}
+        self._nonlocals: set[str] = set()
+        self._stable: dict[tuple[ast.For, str], bool] = {}
+        self._aliased: dict[tuple[ast.AST, str], bool] = {}
+
+    def visit_Module(self, node: ast.Module) -> Any:
+        if getattr(node, ELIDE_BOUNDS_CHECKS, FLAG_DEFAULTS[ELIDE_BOUNDS_CHECKS]):
+            self._module = node
+            self._stable = {}
+            self._aliased = {}
+            self._visit_scope(node)
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> Any:
+        state = (
+            self._scope,
+            self._loop_ranges,
+            self._sized_by,
+            self._stores,
+            self._nonlocals,
+        )
+        self._visit_scope(node)
+        (
+            self._scope,
+            self._loop_ranges,
+            self._sized_by,
+            self._stores,
+            self._nonlocals,
+        ) = state
+        return node
+
+    def visit_Lambda(self, node: ast.Lambda) -> Any:
+        # The loop targets can change before the lambda is called
+        loop_ranges = self._loop_ranges
+        self._loop_ranges = {}
+        self.generic_visit(node)
+        self._loop_ranges = loop_ranges
+        return node
+
+    def _visit_scope(self, node):
+        self._scope = node
+        self._loop_ranges = {}
+        self._stores = self._count_stores(node)
+        self._nonlocals = set()
+        for n in ast.walk(node):
+            if isinstance(n, (ast.Global, ast.Nonlocal)):
+                self._nonlocals.update(n.names)
+        self._sized_by = {}
+        for n in ast.walk(node):
+            if (
+                isinstance(n, ast.Assign)
+                and len(n.targets) == 1
+                and isinstance(n.targets[0], ast.Name)
+                and (length := self._repeated_list_length(n.value))
+            ):
+                container = get_id(n.targets[0])
+                if (
+                    self._stores.get(container) == 1
+                    and self._stores.get(length) == 1
+                    and not {container, length} & self._nonlocals
+                    and not self._may_shrink(container, [node])
+                    and not self._is_aliased(container, node)
+                ):
+                    self._sized_by[container] = length
+        self.generic_visit(node)
+
+    def visit_For(self, node: ast.For) -> Any:
+        self.visit(node.iter)
+        target = get_id(node.target) if isinstance(node.target, ast.Name) else None
+        loop_ranges = self._loop_ranges
+        self._loop_ranges = dict(loop_ranges)
+        if target:
+            self._loop_ranges.pop(target, None)
+            if not self._is_rebound(target, node.body):
+                if loop_range := self._loop_range(node):
+                    self._loop_ranges[target] = loop_range
+        for n in node.body:
+            self.visit(n)
+        self._loop_ranges = loop_ranges
+        for n in node.orelse:
+            self.visit(n)
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> Any:
+        self.generic_visit(node)
+        container = get_id(node.value) if isinstance(node.value, ast.Name) else None
+        index, offset = self._index(node.slice)
+        loop_range = self._loop_ranges.get(index)
+        if (
+            container
+            and loop_range
+            and loop_range.length
+            and loop_range.lower + offset >= 0
+            and offset <= loop_range.offset
+        ):
+            kind, name = loop_range.length
+            node.in_bounds = (
+                kind == "len"
+                and name == container
+                and self._is_container(node.value)
+                or kind == "name"
+                and self._sized_by.get(container) == name
+            ) and self._is_stable(container, loop_range.loop)
+        return node
+
+    def _loop_range(self, node: ast.For) -> Optional[LoopRange]:
+        it = node.iter
+        if not (
+            isinstance(it, ast.Call)
+            and get_id(it.func) == "range"
+            and not it.keywords
+            and 1 <= len(it.args) <= 3
+        ):
+            return None
+        if len(it.args) == 1:
+            lower, stop = 0, it.args[0]
+        else:
+            lower, stop = self._lower_bound(it.args[0]), it.args[1]
+        if lower is None:
+            return None
+        if len(it.args) == 3:
+            step = self._lower_bound(it.args[2])
+            if step is None or step < 1:
+                return None
+        length, offset = self._length(stop)
+        return LoopRange(node, lower, length, offset)
+
+    def _lower_bound(self, node) -> Optional[int]:
+        if isinstance(node, ast.Constant) and type(node.value) == int:
+            return node.value
+        if isinstance(node, ast.Name) and get_id(node) in self._loop_ranges:
+            return self._loop_ranges[get_id(node)].lower
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mult)):
+            left = self._lower_bound(node.left)
+            right = self._lower_bound(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, ast.Add):
+                return left + right
+            if left >= 0 and right >= 0:
+                return left * right
+        return None
+
+    def _length(self, node) -> tuple[Optional[tuple[str, str]], int]:
+        """Splits the stop value of a range into a length and an offset"""
+        if (
+            isinstance(node, ast.Call)
+            and get_id(node.func) == "len"
+            and len(node.args) == 1
+            and isinstance(node.args[0], ast.Name)
+        ):
+            return ("len", get_id(node.args[0])), 0
+        if isinstance(node, ast.Name):
+            return ("name", get_id(node)), 0
+        if (
+            isinstance(node, ast.BinOp)
+            and isinstance(node.op, ast.Sub)
+            and isinstance(node.right, ast.Constant)
+            and type(node.right.value) == int
+            and node.right.value >= 0
+        ):
+            length, offset = self._length(node.left)
+            return length, offset + node.right.value
+        return None, 0
+
+    def _index(self, node) -> tuple[Optional[str], int]:
+        """Splits an index into a variable and a constant offset"""
+        if isinstance(node, ast.Name):
+            return get_id(node), 0
+        if (
+            isinstance(node, ast.BinOp)
+            and isinstance(node.op, (ast.Add, ast.Sub))
+            and isinstance(node.left, ast.Name)
+            and isinstance(node.right, ast.Constant)
+            and type(node.right.value) == int
+        ):
+            offset = node.right.value
+            if isinstance(node.op, ast.Sub):
+                offset = -offset
+            return get_id(node.left), offset
+        return None, 0
+
+    @staticmethod
+    def _repeated_list_length(node) -> Optional[str]:
+        """Returns n for [v] * n"""
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+            for lst, n in ((node.left, node.right), (node.right, node.left)):
+                if isinstance(lst, ast.List) and len(lst.elts) == 1:
+                    return get_id(n) if isinstance(n, ast.Name) else None
+        return None
+
+    def _is_container(self, node: ast.Name) -> bool:
+        ann = getattr(node, "annotation", None)
+        if ann is None:
+            ann = getattr(node.scopes.find(get_id(node)), "annotation", None)
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and self.CONTAINER_TYPES.match(ann_repr))
+
+    def _is_stable(self, container: str, loop: ast.For) -> bool:
+        """Whether container keeps its value and doesn't shrink in loop"""
+        key = (loop, container)
+        if key not in self._stable:
+            body = list(loop.body)
+            scope = self._scope
+            is_function = isinstance(scope, ast.FunctionDef)
+            is_arg = is_function and container in arg_names(scope)
+            if (
+                not is_function
+                or container not in self._stores
+                or container in self._nonlocals
+                or is_arg
+            ):
+                # Globals, parameters and variables of enclosing functions
+                # can be changed by the functions called from the loop
+                scope = self._module
+            body.extend(
+                n
+                for n in ast.walk(scope)
+                if isinstance(n, (ast.FunctionDef, ast.Lambda)) and n is not scope
+            )
+            # Yielding runs the caller in the middle of the loop
+            yields = any(
+                isinstance(n, (ast.Yield, ast.YieldFrom, ast.Await))
+                for stmt in loop.body
+                for n in ast.walk(stmt)
+            )
+            # The list bound to a parameter can have other names in the
+            # callers, which any function called from the loop can shrink
+            calls = is_arg and any(
+                isinstance(n, ast.Call) and not is_known_call(n, container)
+                for stmt in loop.body
+                for n in ast.walk(stmt)
+            )
+            self._stable[key] = not (
+                yields
+                or calls
+                or self._is_rebound(container, body)
+                or self._may_shrink(container, body)
+                or self._is_aliased(container, scope)
+            )
+        return self._stable[key]
+
+    def _is_aliased(self, name: str, scope) -> bool:
+        key = (scope, name)
+        if key not in self._aliased:
+            self._aliased[key] = is_aliased(name, scope)
+        return self._aliased[key]
+
+    @staticmethod
+    def _count_stores(node) -> dict[str, int]:
+        names = []
+        if isinstance(node, ast.FunctionDef):
+            names.extend(arg_names(node))
+        for n in ast.walk(node):
+            if isinstance(n, ast.Name) and is_store(n):
+                names.append(get_id(n))
+        stores = {}
+        for name in names:
+            stores[name] = stores.get(name, 0) + 1
+        return stores
+
+    @staticmethod
+    def _is_rebound(name: str, body: list) -> bool:
+        return any(
+            isinstance(n, ast.Name)
+            and is_store(n)
+            and get_id(n) == name
+            or isinstance(n, (ast.Global, ast.Nonlocal))
+            and name in n.names
+            for stmt in body
+            for n in ast.walk(stmt)
+        )
+
+    def _may_shrink(self, name: str, body: list) -> bool:
+        for stmt in body:
+            for n in ast.walk(stmt):
+                if (
+                    isinstance(n, ast.Subscript)
+                    and get_id(n.value) == name
+                    and is_store(n)
+                    and (isinstance(n.ctx, ast.Del) or isinstance(n.slice, ast.Slice))
+                ):
+                    return True
+                if (
+                    isinstance(n, ast.Call)
+                    and isinstance(n.func, ast.Attribute)
+                    and get_id(n.func.value) == name
+                    and n.func.attr not in self.NON_SHRINKING_METHODS
+                ):
+                    return True
+        return False
+
+
+class JuliaSimdLoopAnalysis(ast.NodeTransformer):
+    """Marks the innermost loops that can be vectorized with simd. With the
+    fastmath flag, they are also marked with fastmath.
+
+    The loops can iterate over a range, a list, or zip or enumerate of
+    lists. As simd loops have to index what they iterate over, the loops
+    over zip and enumerate are marked with simd_index, the name of an index
+    variable that the transpiler iterates over instead, and their targets
+    are assigned the elements at that index.
+
+    The body has to be straight-line code whose only loop-carried
+    dependencies are scalar reductions: an int or float variable that is
+    only updated by +=, -=, *=, or t = min(t, e) or t = max(t, e). It is
+    numeric when it is annotated so or initialised with an int or float
+    literal. Other variables have to be assigned before they are read,
+    lists can only be written at the index of the loop (the target of a
+    range, or the index of enumerate) and the only calls allowed are the
+    ones in PURE_FUNCTIONS and the functions of the math module."""
+
+    PURE_FUNCTIONS = {"abs", "min", "max", "float", "int", "pow", "round", "len"}
+    REDUCTION_OPS = (ast.Add, ast.Sub, ast.Mult)
+    NUMERIC_TYPES = re.compile(r"^int|^float")
+    CONTAINER_TYPES = re.compile(r"^list|^List")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._fastmath = False
+
+    def visit_Module(self, node: ast.Module) -> Any:
+        if getattr(node, SIMD_LOOPS, FLAG_DEFAULTS[SIMD_LOOPS]):
+            self._fastmath = getattr(node, FASTMATH, FLAG_DEFAULTS[FASTMATH])
+            self.generic_visit(node)
+        return node
+
+    def visit_For(self, node: ast.For) -> Any:
+        self.generic_visit(node)
+        loop_vars = self._loop_vars(node)
+        if loop_vars and not node.orelse:
+            names, index = loop_vars
+            if self._is_vectorizable(node, names, index):
+                node.simd = True
+                node.fastmath = self._fastmath
+                if self._is_indexed(node.iter):
+                    node.simd_index = index or self._index_name(node)
+        return node
+
+    def _loop_vars(self, node: ast.For) -> Optional[tuple[set[str], Optional[str]]]:
+        """Returns the names of the loop targets and the one that indexes
+        the lists, or None if the loop can't be a simd loop"""
+        target, it = node.target, node.iter
+        if isinstance(target, ast.Tuple) and all(
+            isinstance(e, ast.Name) for e in target.elts
+        ):
+            names = [get_id(e) for e in target.elts]
+        elif isinstance(target, ast.Name):
+            names = [get_id(target)]
+        else:
+            return None
+        if len(set(names)) != len(names):
+            return None
+        if isinstance(it, ast.Name):
+            if len(names) == 1 and self._is_list(it):
+                return set(names), None
+            return None
+        if not isinstance(it, ast.Call) or it.keywords:
+            return None
+        func = get_id(it.func)
+        if func == "range" and isinstance(target, ast.Name):
+            return set(names), names[0]
+        if (
+            func == "zip"
+            and isinstance(target, ast.Tuple)
+            and len(it.args) == len(names)
+            and all(self._is_list(a) for a in it.args)
+        ):
+            return set(names), None
+        if (
+            func == "enumerate"
+            and isinstance(target, ast.Tuple)
+            and len(names) == 2
+            and len(it.args) == 1
+            and self._is_list(it.args[0])
+        ):
+            return set(names), names[0]
+        return None
+
+    @staticmethod
+    def _is_indexed(node) -> bool:
+        """Whether the elements of the iterable are read by index"""
+        return isinstance(node, ast.Call) and get_id(node.func) in {"zip", "enumerate"}
+
+    def _is_list(self, node) -> bool:
+        if not isinstance(node, ast.Name):
+            return False
+        ann = getattr(node, "annotation", None)
+        if ann is None:
+            ann = getattr(node.scopes.find(get_id(node)), "annotation", None)
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and self.CONTAINER_TYPES.match(ann_repr))
+
+    @staticmethod
+    def _index_name(node: ast.For) -> str:
+        """A name that isn't used in the function of the loop"""
+        scope = next(
+            sc
+            for sc in reversed(node.scopes)
+            if isinstance(sc, (ast.FunctionDef, ast.Module))
+        )
+        used = {get_id(n) for n in ast.walk(scope) if isinstance(n, ast.Name)}
+        used |= {n.arg for n in ast.walk(scope) if isinstance(n, ast.arg)}
+        index, i = "i", 0
+        while index in used:
+            i += 1
+            index = f"i{i}"
+        return index
+
+    def _is_vectorizable(
+        self, node: ast.For, loop_vars: set[str], target: Optional[str]
+    ) -> bool:
+        stmts = []
+        for stmt in node.body:
+            if not isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                return False
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            if not stmt.value or len(targets) != 1 or get_id(targets[0]) in loop_vars:
+                return False
+            stmts.append((targets[0], stmt))
+
+        # Variables that are assigned in every iteration
+        assigned = {
+            get_id(stmt_target)
+            for stmt_target, stmt in stmts
+            if isinstance(stmt_target, ast.Name)
+            and not isinstance(stmt, ast.AugAssign)
+            and not self._reduction(stmt)
+        }
+        if self._is_used_outside(node, assigned):
+            return False
+        reductions: dict[str, Any] = {}
+        # Lists written at the index of the loop target
+        written = set()
+        for stmt_target, stmt in stmts:
+            if isinstance(stmt_target, ast.Subscript):
+                if not (
+                    target
+                    and isinstance(stmt_target.value, ast.Name)
+                    and isinstance(stmt_target.slice, ast.Name)
+                    and get_id(stmt_target.slice) == target
+                ):
+                    return False
+                written.add(get_id(stmt_target.value))
+            elif not isinstance(stmt_target, ast.Name):
+                return False
+            elif get_id(stmt_target) not in assigned:
+                reduction = self._reduction(stmt)
+                if not reduction or not self._is_numeric(node, reduction[0]):
+                    return False
+                name, op, _ = reduction
+                if reductions.setdefault(name, op) != op:
+                    return False
+
+        defined = set()
+        for stmt_target, stmt in stmts:
+            value = stmt.value
+            name = get_id(stmt_target)
+            if name in reductions:
+                value = self._reduction(stmt)[2]
+            elif isinstance(stmt, ast.AugAssign) and name in assigned:
+                # Updates a variable assigned before
+                if name not in defined:
+                    return False
+            for n in ast.walk(value):
+                if isinstance(n, ast.Name):
+                    n_id = get_id(n)
+                    if n_id in reductions or n_id in assigned - defined:
+                        return False
+                elif isinstance(n, ast.Subscript) and get_id(n.value) in written:
+                    if get_id(n.slice) != target:
+                        return False
+                elif isinstance(n, ast.Call) and not self._is_pure(n):
+                    return False
+                elif isinstance(n, (ast.Lambda, ast.comprehension, ast.NamedExpr)):
+                    return False
+            if name in assigned:
+                defined.add(name)
+        return True
+
+    @staticmethod
+    def _is_used_outside(node: ast.For, names: set[str]) -> bool:
+        """Whether the variables are used outside the loop. Their value after
+        the loop is the one of the last iteration that ran"""
+        scope = next(
+            sc
+            for sc in reversed(node.scopes)
+            if isinstance(sc, (ast.FunctionDef, ast.Module))
+        )
+        inside = {id(n) for n in ast.walk(node)}
+        return any(
+            isinstance(n, ast.Name) and get_id(n) in names and id(n) not in inside
+            for n in ast.walk(scope)
+        )
+
+    def _reduction(self, stmt):
+        """Returns the variable, the operator and the operand of a reduction"""
+        if (
+            isinstance(stmt, ast.AugAssign)
+            and isinstance(stmt.target, ast.Name)
+            and isinstance(stmt.op, self.REDUCTION_OPS)
+        ):
+            op = ast.Add if isinstance(stmt.op, ast.Sub) else type(stmt.op)
+            return get_id(stmt.target), op, stmt.value
+        if (
+            isinstance(stmt, ast.Assign)
+            and isinstance(stmt.targets[0], ast.Name)
+            and isinstance(stmt.value, ast.Call)
+            and get_id(stmt.value.func) in {"min", "max"}
+            and len(stmt.value.args) == 2
+            and not stmt.value.keywords
+        ):
+            name = get_id(stmt.targets[0])
+            args = stmt.value.args
+            for acc, operand in (args, args[::-1]):
+                if isinstance(acc, ast.Name) and get_id(acc) == name:
+                    return name, get_id(stmt.value.func), operand
+        return None
+
+    def _is_pure(self, node: ast.Call) -> bool:
+        if isinstance(node.func, ast.Attribute):
+            return get_id(node.func.value) == "math"
+        return get_id(node.func) in self.PURE_FUNCTIONS
+
+    def _is_numeric(self, node: ast.For, name: str) -> bool:
+        # The definition before the loop
+        definition = node.scopes.parent_scopes.find(name)
+        ann = getattr(definition, "annotation", None)
+        assigned_from = getattr(definition, "assigned_from", None)
+        if ann is None and assigned_from is not None:
+            ann = getattr(assigned_from, "annotation", None)
+            value = getattr(assigned_from, "value", None)
+            if isinstance(value, ast.Constant) and type(value.value) in {int, float}:
+                return True
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and self.NUMERIC_TYPES.match(ann_repr))
+
+
+class JuliaViewAnalysis(ast.NodeTransformer):
+    """Marks the slices of lists that can be views instead of copies with
+    view. A slice is only read when it is an operand, is indexed, is passed
+    to one of READ_ONLY_FUNCTIONS, is assigned to a slice (Julia copies
+    views of the array it assigns to) or is iterated over by a loop.
+    The sliced list may not be changed while the view is used, which is
+    the loop for the slices that are iterated over and the statement
+    otherwise. Nor may it be aliased (see is_aliased). For parameters and
+    lists that are not local to the function, calls to functions of the
+    module, or to other unknown functions, are assumed to change them.
+    Slices that are stored, returned or passed to other functions are
+    copied."""
+
+    CONTAINER_TYPES = re.compile(r"^list|^List|^bytearray|^bytes")
+    READ_ONLY_FUNCTIONS = {"len", "sum", "min", "max", "any", "all", "sorted", "list"}
+    # Methods that don't change a list
+    READ_ONLY_METHODS = {"count", "index", "copy"}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parents: dict[ast.AST, ast.AST] = {}
+        self._aliased: dict[tuple[ast.AST, str], bool] = {}
+
+    def visit_Module(self, node: ast.Module) -> Any:
+        if getattr(node, USE_VIEWS, FLAG_DEFAULTS[USE_VIEWS]):
+            self._parents = {
+                child: parent
+                for parent in ast.walk(node)
+                for child in ast.iter_child_nodes(parent)
+            }
+            self._aliased = {}
+            self.generic_visit(node)
+            self._parents = {}
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> Any:
+        self.generic_visit(node)
+        if (
+            isinstance(node.slice, ast.Slice)
+            and isinstance(getattr(node, "ctx", None), ast.Load)
+            and isinstance(node.value, ast.Name)
+            and self._is_container(node.value)
+        ):
+            uses = self._uses(node)
+            if uses is not None:
+                container = get_id(node.value)
+                scope = self._scope(container, node)
+                key = (scope, container)
+                if key not in self._aliased:
+                    self._aliased[key] = is_aliased(container, scope)
+                # Functions called from its own function can only change a
+                # local list that is passed to them. The list bound to a
+                # parameter can have other names in the callers
+                calls = (
+                    scope is not self._function(node)
+                    or isinstance(scope, ast.Module)
+                    or container in arg_names(scope)
+                )
+                node.view = not (
+                    self._aliased[key]
+                    or any(self._may_change(container, n, calls) for n in uses)
+                )
+        return node
+
+    def _function(self, node) -> ast.AST:
+        """The function that node is in, or the module"""
+        while not isinstance(node, (ast.FunctionDef, ast.Module)):
+            node = self._parents[node]
+        return node
+
+    def _scope(self, container: str, node) -> ast.AST:
+        """The function that container is local to, or the module"""
+        node = self._function(node)
+        if isinstance(node, ast.Module):
+            return node
+        names = set(arg_names(node))
+        for n in ast.walk(node):
+            if isinstance(n, (ast.Global, ast.Nonlocal)) and container in n.names:
+                break
+            if isinstance(n, ast.Name) and is_store(n):
+                names.add(get_id(n))
+        else:
+            if container in names:
+                return node
+        return self._scope(container, self._parents[node])
+
+    def _uses(self, node: ast.Subscript) -> Optional[list[ast.AST]]:
+        """Returns the nodes that run while the view is used, or None if
+        the slice is not only read"""
+        parent = self._parents.get(node)
+        if isinstance(parent, ast.For) and parent.iter is node:
+            return parent.body
+        if isinstance(parent, ast.comprehension) and parent.iter is node:
+            comp = self._parents.get(parent)
+            if isinstance(comp, ast.GeneratorExp):
+                # Generators run when they are consumed
+                comp = self._parents.get(comp)
+                if not self._is_read_only_call(comp):
+                    return None
+            return [comp]
+        if isinstance(parent, ast.Assign):
+            if len(parent.targets) == 1 and self._is_slice(parent.targets[0]):
+                return []
+            return None
+        if isinstance(parent, ast.Tuple):
+            assign = self._parents.get(parent)
+            if not (
+                isinstance(assign, ast.Assign)
+                and assign.value is parent
+                and len(assign.targets) == 1
+                and isinstance(assign.targets[0], ast.Tuple)
+                and len(assign.targets[0].elts) == len(parent.elts)
+            ):
+                return None
+            # The targets before the slice are assigned before it is copied
+            targets = assign.targets[0].elts[: parent.elts.index(node) + 1]
+            container = get_id(node.value)
+            if not self._is_slice(targets[-1]) or any(
+                get_id(getattr(t, "value", t)) == container for t in targets[:-1]
+            ):
+                return None
+            return [parent]
+        if not (
+            isinstance(parent, (ast.BinOp, ast.Compare))
+            or isinstance(parent, ast.Subscript)
+            and parent.value is node
+            or self._is_read_only_call(parent)
+            and node in parent.args
+        ):
+            return None
+        # The view is used until the expression of the statement is evaluated
+        expr = parent
+        while not isinstance(self._parents[expr], ast.stmt):
+            expr = self._parents[expr]
+        return [expr]
+
+    def _is_read_only_call(self, node) -> bool:
+        return (
+            isinstance(node, ast.Call) and get_id(node.func) in self.READ_ONLY_FUNCTIONS
+        )
+
+    def _may_change(self, container: str, node, calls: bool) -> bool:
+        """Whether node may change container. With calls, any call of a
+        function that isn't known not to change it may change it"""
+        for n in ast.walk(node):
+            if (
+                isinstance(n, ast.Subscript)
+                and get_id(n.value) == container
+                and is_store(n)
+            ):
+                return True
+            if isinstance(n, ast.AugAssign) and get_id(n.target) == container:
+                return True
+            if isinstance(n, ast.Call):
+                if (
+                    isinstance(n.func, ast.Attribute)
+                    and get_id(n.func.value) == container
+                    and n.func.attr not in self.READ_ONLY_METHODS
+                ):
+                    return True
+                if not self._is_read_only_call(n) and any(
+                    get_id(arg) == container for arg in n.args
+                ):
+                    return True
+                if calls and not is_known_call(n, container):
+                    return True
+        return False
+
+    @staticmethod
+    def _is_slice(node) -> bool:
+        return isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice)
+
+    def _is_container(self, node: ast.Name) -> bool:
+        ann = getattr(node, "annotation", None)
+        if ann is None:
+            ann = getattr(node.scopes.find(get_id(node)), "annotation", None)
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and self.CONTAINER_TYPES.match(ann_repr))
+
+
+class JuliaParallelMapAnalysis(ast.NodeTransformer):
+    """Marks the maps of multiprocessing pools that can run on threads
+    instead of worker processes with threads. These are the maps of pure
+    functions, as threads share the memory that processes copy. Pools are
+    marked with threads when all their uses are such maps, and none of them
+    has an initializer.
+
+    A function is pure when it has no global or nonlocal declarations and
+    only changes the objects it creates: the values of local names that
+    are always assigned new objects, which are literals, comprehensions,
+    slices, operations and the results of calls other than the methods of
+    arguments or globals. It may only call builtins other than
+    IMPURE_FUNCTIONS, the functions of PURE_MODULES and functions of the
+    module that are pure. The methods it calls may not be impure methods of
+    the classes of the module. Methods of arguments and globals other than
+    MUTATING_METHODS may only be called when they are annotated with a
+    builtin type."""
+
+    POOL_TYPES = {"multiprocessing.Pool", "multiprocessing.pool.Pool"}
+    POOL_MAPS = {"map", "starmap", "imap", "imap_unordered"}
+    IMPURE_FUNCTIONS = {
+        "print",
+        "input",
+        "open",
+        "exec",
+        "eval",
+        "setattr",
+        "delattr",
+        "globals",
+        "vars",
+        "exit",
+        "quit",
+        "breakpoint",
+        "__import__",
+        # Advance the iterators passed to them
+        "next",
+        "anext",
+        "iter",
+        "aiter",
+    }
+    PURE_MODULES = {"math", "cmath", "operator", "itertools", "functools"}
+    # Methods that change the object they are called on
+    MUTATING_METHODS = {
+        "append",
+        "extend",
+        "insert",
+        "pop",
+        "remove",
+        "clear",
+        "sort",
+        "reverse",
+        "update",
+        "add",
+        "discard",
+        "setdefault",
+        "popitem",
+        "write",
+        "writelines",
+    }
+    IMMUTABLE_TYPES = re.compile(r"^int|^float|^complex|^bool|^str|^bytes|^tuple")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._qualified_imports = {}
+        self._parents: dict[ast.AST, ast.AST] = {}
+        self._pure: dict[ast.AST, bool] = {}
+        # The methods of the classes of the module, by name
+        self._methods: dict[str, list[ast.FunctionDef]] = {}
+
+    def visit_Module(self, node: ast.Module) -> Any:
+        self._qualified_imports = getattr(node, "qualified_imports", {})
+        use_threads = getattr(node, USE_THREADS, FLAG_DEFAULTS[USE_THREADS])
+        self._parents = {
+            child: parent
+            for parent in ast.walk(node)
+            for child in ast.iter_child_nodes(parent)
+        }
+        self._methods = {}
+        for n in ast.walk(node):
+            if isinstance(n, ast.ClassDef):
+                for m in n.body:
+                    if isinstance(m, ast.FunctionDef):
+                        self._methods.setdefault(m.name, []).append(m)
+        pools = [
+            n for n in ast.walk(node) if isinstance(n, ast.Call) and self._is_pool(n)
+        ]
+        # Uses of the names the pools are bound to, and of unbound pools
+        pool_names = set(filter(None, map(self._pool_name, pools)))
+        uses = [
+            n
+            for n in ast.walk(node)
+            if (isinstance(n, ast.Name) and n.id in pool_names and not is_store(n))
+            or (n in pools and self._pool_name(n) is None)
+        ]
+        # Initializers set up the globals of each worker process
+        use_threads = use_threads and not any(
+            len(pool.args) > 1 or any(k.arg == "initializer" for k in pool.keywords)
+            for pool in pools
+        )
+        threads = bool(uses)
+        for use in uses:
+            call = self._map_call(use)
+            if call is None:
+                threads = False
+                continue
+            call.threads = use_threads and self._is_pure(call.args[0], node)
+            if not hasattr(use, "annotation"):
+                # Pools bound in other scopes, the map is dispatched on its type
+                use.annotation = ast.Attribute(
+                    value=ast.Name(id="multiprocessing"), attr="Pool"
+                )
+            threads = threads and call.threads
+        for pool in pools:
+            pool.threads = threads
+        self._parents = {}
+        self._pure = {}
+        self._methods = {}
+        return node
+
+    def _is_pool(self, node: ast.Call) -> bool:
+        name = qualified_name(get_id(node.func), self._qualified_imports)
+        return name in self.POOL_TYPES
+
+    def _pool_name(self, node: ast.Call) -> Optional[str]:
+        parent = self._parents.get(node)
+        if isinstance(parent, ast.withitem) and parent.optional_vars is not None:
+            return get_id(parent.optional_vars)
+        if isinstance(parent, ast.Assign) and len(parent.targets) == 1:
+            return get_id(parent.targets[0])
+        return None
+
+    def _map_call(self, node) -> Optional[ast.Call]:
+        """Returns the call if node is the pool of a map"""
+        attr = self._parents.get(node)
+        call = self._parents.get(attr)
+        if (
+            isinstance(attr, ast.Attribute)
+            and attr.attr in self.POOL_MAPS
+            and isinstance(call, ast.Call)
+            and call.func is attr
+            and call.args
+        ):
+            return call
+        return None
+
+    def _is_pure(self, func, module: ast.Module) -> bool:
+        if isinstance(func, ast.Name):
+            func = func.scopes.find(func.id)
+        if not isinstance(func, (ast.FunctionDef, ast.Lambda)):
+            return False
+        if func not in self._pure:
+            # Recursive calls don't change the result
+            self._pure[func] = True
+            self._pure[func] = self._is_pure_body(func, module)
+        return self._pure[func]
+
+    def _is_pure_body(self, func, module: ast.Module) -> bool:
+        fresh = self._fresh_names(func)
+        for n in ast.walk(func):
+            if isinstance(n, (ast.Global, ast.Nonlocal)):
+                return False
+            if isinstance(n, (ast.Subscript, ast.Attribute)) and is_store(n):
+                if self._base_name(n) not in fresh:
+                    return False
+            if isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name):
+                # Lists are extended in place
+                if n.target.id not in fresh and not self._is_immutable(n.target):
+                    return False
+            if isinstance(n, ast.Call) and not self._is_pure_call(n, fresh, module):
+                return False
+        return True
+
+    def _is_pure_call(self, node: ast.Call, fresh: set[str], module) -> bool:
+        if isinstance(node.func, ast.Attribute):
+            return self._is_pure_method_call(node.func, fresh, module)
+        if not isinstance(node.func, ast.Name):
+            return False
+        definition = node.scopes.find(node.func.id)
+        if isinstance(definition, ast.FunctionDef):
+            return self._is_pure(definition, module)
+        if definition is not None:
+            return False
+        if module_name := self._module_name(node.func):
+            return module_name in self.PURE_MODULES
+        return (
+            node.func.id in dir(builtins) and node.func.id not in self.IMPURE_FUNCTIONS
+        )
+
+    def _is_pure_method_call(
+        self, func: ast.Attribute, fresh: set[str], module
+    ) -> bool:
+        if module_name := self._module_name(func.value):
+            return module_name in self.PURE_MODULES
+        # The receiver can be an instance of any class that has the method
+        if not all(self._is_pure(m, module) for m in self._methods.get(func.attr, [])):
+            return False
+        if self._is_fresh(func.value, fresh):
+            return True
+        # Arguments and globals may only be read
+        receiver = func.value
+        if func.attr in self.MUTATING_METHODS or not isinstance(receiver, ast.Name):
+            return False
+        ann = getattr(receiver.scopes.find(receiver.id), "annotation", None)
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and BUILTIN_TYPES.match(ann_repr))
+
+    def _fresh_names(self, func) -> set[str]:
+        """Local names that are always assigned new objects"""
+        values: dict[str, list] = {}
+        for n in ast.walk(func):
+            if isinstance(n, ast.Assign):
+                for t in n.targets:
+                    self._add_values(t, n.value, values)
+            elif isinstance(n, (ast.AnnAssign, ast.AugAssign)) and n.value:
+                self._add_values(n.target, n.value, values)
+            elif isinstance(n, (ast.For, ast.comprehension)):
+                # The elements of new objects are new objects
+                self._add_values(n.target, n.iter, values, elements=True)
+        args = func.args.args + func.args.kwonlyargs + func.args.posonlyargs
+        fresh = set(values) - {a.arg for a in args}
+        changed = True
+        while changed:
+            changed = False
+            for name in list(fresh):
+                if not all(self._is_fresh(v, fresh) for v in values[name]):
+                    fresh.remove(name)
+                    changed = True
+        return fresh
+
+    @staticmethod
+    def _add_values(target, value, values, elements=False):
+        if isinstance(target, ast.Name):
+            values.setdefault(target.id, []).append(value)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            same_length = (
+                not elements
+                and isinstance(value, (ast.Tuple, ast.List))
+                and len(value.elts) == len(target.elts)
+            )
+            for i, t in enumerate(target.elts):
+                JuliaParallelMapAnalysis._add_values(
+                    t, value.elts[i] if same_length else value, values, elements
+                )
+
+    def _is_fresh(self, node, fresh: set[str]) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in fresh
+        if isinstance(node, ast.Subscript):
+            return isinstance(node.slice, ast.Slice)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            return (
+                node.func.attr == "copy"
+                or self._base_name(node.func) in fresh
+                or self._module_name(node.func.value) is not None
+            )
+        return isinstance(
+            node,
+            (
+                ast.Constant,
+                ast.List,
+                ast.Tuple,
+                ast.Dict,
+                ast.Set,
+                ast.ListComp,
+                ast.DictComp,
+                ast.SetComp,
+                ast.GeneratorExp,
+                ast.BinOp,
+                ast.UnaryOp,
+                ast.BoolOp,
+                ast.Compare,
+                ast.Call,
+                ast.JoinedStr,
+            ),
+        )
+
+    def _module_name(self, node) -> Optional[str]:
+        """The top level module that node refers to, if it is imported"""
+        node_id = get_id(node)
+        if not node_id or (hasattr(node, "scopes") and node.scopes.find(node_id)):
+            return None
+        name = qualified_name(node_id, self._qualified_imports)
+        return name.split(".")[0] if name else None
+
+    @staticmethod
+    def _base_name(node) -> Optional[str]:
+        while isinstance(node, (ast.Subscript, ast.Attribute)):
+            node = node.value
+        return get_id(node)
+
+    def _is_immutable(self, node: ast.Name) -> bool:
+        ann = getattr(node.scopes.find(node.id), "annotation", None)
+        ann_repr = get_ann_repr(ann)
+        return bool(ann_repr and self.IMMUTABLE_TYPES.match(ann_repr))
+
+
 class JuliaBroadcastTransformer(ast.NodeTransformer):
     def __init__(self) -> None:
         super().__init__()
@@ -8,7 +8,12 @@ from typing import List, Optional, Tuple, Union
 from py2many.ast_helpers import get_id
 import logging
 
-from py2many.clike import CLikeTranspiler as CommonCLikeTranspiler, class_for_typename
+from py2many.clike import (
+    CLikeTranspiler as CommonCLikeTranspiler,
+    ModuleState,
+    class_for_typename,
+    qualified_name,
+)
 from py2many.external_modules import ExternalBase
 from py2many.helpers import get_ann_repr
 from py2many.tracer import find_node_by_name_and_type, find_node_by_type
@@ -180,6 +185,12 @@ def jl_symbol(node):
 
 
 class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
+    _generics = ModuleState(list)  # List containing generic types
+    _use_modules = ModuleState()
+    _flags = ModuleState()
+    _allow_annotations_on_globals = ModuleState(bool)
+    _pycall_imports = ModuleState(set)
+
     def __init__(self):
         super().__init__()
         self._type_map = JULIA_TYPE_MAP
@@ -199,15 +210,10 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
         self._attr_dispatch_table = ATTR_DISPATCH_TABLE
         #
         self._reserved_typevars = RESERVED_TYPEVARS
-        self._generics = []  # List containing generic types
-        self._use_modules = None
         self._external_type_map = {}
-        self._flags = None
         self._module_dispatch_table = MODULE_DISPATCH_TABLE
         self._special_names_dispatch_table = JULIA_SPECIAL_NAME_TABLE
-        self._allow_annotations_on_globals = False
-        self._pycall_imports = set()
-        # Get external module features
+        # Get external module features, loaded on demand in visit_Module
         self.import_external_modules(self.NAME)
 
     def usings(self):
@@ -227,6 +233,11 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
             return super().visit(node)
 
     def visit_Module(self, node: ast.Module) -> str:
+        self.load_external_modules(node)
+        return super().visit_Module(node)
+
+    def _enter_module(self, node: ast.Module):
+        super()._enter_module(node)
         self._use_modules = getattr(node, USE_MODULES, FLAG_DEFAULTS[USE_MODULES])
         self._flags = [
             f"# - {flag}" for flag in GLOBAL_FLAGS if getattr(node, flag, False)
@@ -236,7 +247,6 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
             ALLOW_ANNOTATIONS_ON_GLOBALS,
             FLAG_DEFAULTS[ALLOW_ANNOTATIONS_ON_GLOBALS],
         )
-        return super().visit_Module(node)
 
     def visit_arg(self, node):
         # if node.arg == "self":
@@ -298,6 +308,9 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
     ######################################################
 
     def _map_type(self, typename: str, lifetime=LifeTime.UNKNOWN) -> str:
+        name = qualified_name(typename, self._qualified_imports)
+        if name is not None and name in self._external_type_map:
+            return self._external_type_map[name](self)
         typeclass = self._func_for_lookup(typename)
         if typeclass is None and typename != "None":
             return typename
@@ -500,8 +513,8 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
             except IndexError:
                 return None
 
-        func = self._func_for_lookup(fname)
-        if func is not None and func in self._func_dispatch_table:
+        func = self._key_for_lookup(fname, self._func_dispatch_table)
+        if func is not None:
             if func in self._func_usings_map:
                 self._usings.add(self._func_usings_map[func])
             ret, node.result_type = self._func_dispatch_table[func]
@@ -521,8 +534,10 @@ class CLikeTranspiler(CommonCLikeTranspiler, JuliaNodeVisitor, ExternalBase):
         return None
 
     def _get_dispatch_func(self, node, class_name, fname, vargs, kwargs):
-        py_type = self._func_for_lookup(f"{class_name}.{fname}")
-        if py_type in self._func_dispatch_table:
+        py_type = self._key_for_lookup(
+            f"{class_name}.{fname}", self._func_dispatch_table
+        )
+        if py_type is not None:
             ret, node.result_type = self._func_dispatch_table[py_type]
             try:
                 return ret(self, node, vargs, kwargs)
@@ -28,6 +28,9 @@ class JuliaExternalModulePlugins:
         return "Base.windowserror()"
 
 
+# Maps builtin exceptions, which are used without importing anything
+LIBRARIES = None
+
 FuncType = Union[Callable, str]
 
 GENERIC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
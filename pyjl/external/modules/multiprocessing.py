@@ -1,17 +1,25 @@
 from typing import Callable, Dict, Tuple, Union
-import multiprocessing
 
 
 class JuliaExternalModulePlugins:
-    def visit_starmap(t_self, node, vargs):
+    def visit_starmap(t_self, node, vargs, kwargs):
+        if getattr(node, "threads", False):
+            # Tasks share memory, which saves copying the arguments
+            return (
+                f"fetch.([Threads.@spawn {vargs[1]}(args...) for args in {vargs[2]}])"
+            )
         JuliaExternalModulePlugins._generic_distributed_visit(t_self)
-        return f"pmap({vargs[1]}, {vargs[2]})"
+        return f"pmap(args -> {vargs[1]}(args...), {vargs[2]})"
 
-    def visit_Pool(t_self, node, vargs):
+    def visit_Pool(t_self, node, vargs, kwargs):
+        if getattr(node, "threads", False):
+            return "nothing"
         JuliaExternalModulePlugins._generic_distributed_visit(t_self)
         return "default_worker_pool()"
 
-    def visit_map(t_self, node, vargs):
+    def visit_map(t_self, node, vargs, kwargs):
+        if getattr(node, "threads", False):
+            return f"fetch.([Threads.@spawn {vargs[1]}(arg) for arg in {vargs[2]}])"
         JuliaExternalModulePlugins._generic_distributed_visit(t_self)
         return f"pmap({vargs[1]}, {vargs[2]})"
 
@@ -22,13 +30,20 @@ class JuliaExternalModulePlugins:
 FuncType = Union[Callable, str]
 
 FUNC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
-    multiprocessing.cpu_count: (
+    "multiprocessing.cpu_count": (
         lambda self, node, vargs, kwargs: f"length(Sys.cpu_info())",
         True,
     ),
-    multiprocessing.Pool: (JuliaExternalModulePlugins.visit_Pool, True),
-    "starmap": (
-        JuliaExternalModulePlugins.visit_starmap,
+    "multiprocessing.Pool": (JuliaExternalModulePlugins.visit_Pool, True),
+    "multiprocessing.Pool.map": (JuliaExternalModulePlugins.visit_map, True),
+    "multiprocessing.Pool.imap": (JuliaExternalModulePlugins.visit_map, True),
+    "multiprocessing.Pool.imap_unordered": (
+        JuliaExternalModulePlugins.visit_map,
         True,
-    ),  # TODO: remove string-based fallback
+    ),
+    "multiprocessing.Pool.starmap": (JuliaExternalModulePlugins.visit_starmap, True),
+}
+
+FUNC_TYPE_MAP = {
+    "multiprocessing.Pool": lambda self, node, vargs, kwargs: "multiprocessing.Pool",
 }
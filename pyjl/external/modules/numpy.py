@@ -2,8 +2,6 @@ import ast
 import re
 from typing import Callable, Dict, Tuple, Union
 
-import numpy as np
-
 from py2many.ast_helpers import get_id
 from py2many.tracer import is_list
 
@@ -191,62 +189,66 @@ class JuliaExternalModulePlugins:
 FuncType = Union[Callable, str]
 
 FUNC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
-    np.sum: (JuliaExternalModulePlugins.visit_npsum, True),
-    np.where: (JuliaExternalModulePlugins.visit_npwhere, True),
-    np.array: (JuliaExternalModulePlugins.visit_nparray, True),
-    np.append: (JuliaExternalModulePlugins.visit_npappend, True),
-    np.zeros: (JuliaExternalModulePlugins.visit_npzeros, True),
-    np.multiply: (JuliaExternalModulePlugins.visit_npmultiply, True),
-    np.sqrt: (
+    "numpy.sum": (JuliaExternalModulePlugins.visit_npsum, True),
+    "numpy.where": (JuliaExternalModulePlugins.visit_npwhere, True),
+    "numpy.array": (JuliaExternalModulePlugins.visit_nparray, True),
+    "numpy.append": (JuliaExternalModulePlugins.visit_npappend, True),
+    "numpy.zeros": (JuliaExternalModulePlugins.visit_npzeros, True),
+    "numpy.multiply": (JuliaExternalModulePlugins.visit_npmultiply, True),
+    "numpy.sqrt": (
         lambda self, node, vargs, kwargs: f"sqrt({vargs[0]})" if vargs else "√",
         True,
     ),
-    np.arccos: (lambda self, node, vargs, kwargs: f"acos({vargs[0]})", True),
-    np.arcsin: (lambda self, node, vargs, kwargs: f"asin({vargs[0]})", True),
-    np.arctan: (lambda self, node, vargs, kwargs: f"atan({vargs[0]})", True),
-    np.sin: (lambda self, node, vargs, kwargs: f"sin({vargs[0]})", True),
-    np.cos: (lambda self, node, vargs, kwargs: f"cos({vargs[0]})", True),
-    np.tan: (lambda self, node, vargs, kwargs: f"tan({vargs[0]})", True),
-    np.newaxis: (JuliaExternalModulePlugins.visit_npnewaxis, True),  # See broadcasting
-    np.ones: (JuliaExternalModulePlugins.visit_ones, True),
-    np.flatnonzero: (
+    "numpy.arccos": (lambda self, node, vargs, kwargs: f"acos({vargs[0]})", True),
+    "numpy.arcsin": (lambda self, node, vargs, kwargs: f"asin({vargs[0]})", True),
+    "numpy.arctan": (lambda self, node, vargs, kwargs: f"atan({vargs[0]})", True),
+    "numpy.sin": (lambda self, node, vargs, kwargs: f"sin({vargs[0]})", True),
+    "numpy.cos": (lambda self, node, vargs, kwargs: f"cos({vargs[0]})", True),
+    "numpy.tan": (lambda self, node, vargs, kwargs: f"tan({vargs[0]})", True),
+    # See broadcasting
+    "numpy.newaxis": (JuliaExternalModulePlugins.visit_npnewaxis, True),
+    "numpy.ones": (JuliaExternalModulePlugins.visit_ones, True),
+    "numpy.flatnonzero": (
         lambda self, node, vargs, kwargs: f"[i-1 for (i,p) in enumerate({vargs[0]}) if p != 0]",
         True,
     ),
-    np.exp: (JuliaExternalModulePlugins.visit_exp, True),
-    np.argmax: (JuliaExternalModulePlugins.visit_argmax, True),
-    np.shape: (lambda self, node, vargs, kwargs: f"size({vargs[0]})", True),
-    np.random.randn: (
+    "numpy.exp": (JuliaExternalModulePlugins.visit_exp, True),
+    "numpy.argmax": (JuliaExternalModulePlugins.visit_argmax, True),
+    "numpy.shape": (lambda self, node, vargs, kwargs: f"size({vargs[0]})", True),
+    "numpy.random.randn": (
         lambda self, node, vargs, kwargs: f"randn({', '.join(vargs)})",
         True,
     ),
-    np.dot: (JuliaExternalModulePlugins.visit_dotproduct, True),
-    np.transpose: (JuliaExternalModulePlugins.visit_transpose, True),
-    np.ndarray.transpose: (JuliaExternalModulePlugins.visit_transpose, True),
-    np.ndarray.reshape: (JuliaExternalModulePlugins.visit_reshape, True),
-    np.reshape: (JuliaExternalModulePlugins.visit_reshape, True),
-    np.ndarray.shape: (lambda self, node, vargs, kwargs: f"size({vargs[0]})", True),
+    "numpy.dot": (JuliaExternalModulePlugins.visit_dotproduct, True),
+    "numpy.transpose": (JuliaExternalModulePlugins.visit_transpose, True),
+    "numpy.ndarray.transpose": (JuliaExternalModulePlugins.visit_transpose, True),
+    "numpy.ndarray.reshape": (JuliaExternalModulePlugins.visit_reshape, True),
+    "numpy.reshape": (JuliaExternalModulePlugins.visit_reshape, True),
+    "numpy.ndarray.shape": (
+        lambda self, node, vargs, kwargs: f"size({vargs[0]})",
+        True,
+    ),
     # Types can also be called as functions to convert
-    np.int8: (lambda self, node, vargs, kwargs: f"Int8({vargs[0]})", True),
-    np.int16: (lambda self, node, vargs, kwargs: f"Int16({vargs[0]})", True),
-    np.int32: (lambda self, node, vargs, kwargs: f"Int32({vargs[0]})", True),
-    np.int64: (lambda self, node, vargs, kwargs: f"Int64({vargs[0]})", True),
+    "numpy.int8": (lambda self, node, vargs, kwargs: f"Int8({vargs[0]})", True),
+    "numpy.int16": (lambda self, node, vargs, kwargs: f"Int16({vargs[0]})", True),
+    "numpy.int32": (lambda self, node, vargs, kwargs: f"Int32({vargs[0]})", True),
+    "numpy.int64": (lambda self, node, vargs, kwargs: f"Int64({vargs[0]})", True),
 }
 
 # Numpy Types
 EXTERNAL_TYPE_MAP = {
-    np.int8: lambda self: "Int8",
-    np.int16: lambda self: "Int16",
-    np.int32: lambda self: "Int32",
-    np.int64: lambda self: "Int64",
-    np.float16: lambda self: "Float16",
-    np.float32: lambda self: "Float32",
-    np.float64: lambda self: "Float64",
-    np.bool8: lambda self: "Bool",
-    np.byte: lambda self: "UInt8",
-    np.short: lambda self: "Int8",
-    np.ndarray: lambda self: "Matrix",
-    np.array: lambda self: "Vector",
+    "numpy.int8": lambda self: "Int8",
+    "numpy.int16": lambda self: "Int16",
+    "numpy.int32": lambda self: "Int32",
+    "numpy.int64": lambda self: "Int64",
+    "numpy.float16": lambda self: "Float16",
+    "numpy.float32": lambda self: "Float32",
+    "numpy.float64": lambda self: "Float64",
+    "numpy.bool8": lambda self: "Bool",
+    "numpy.byte": lambda self: "UInt8",
+    "numpy.short": lambda self: "Int8",
+    "numpy.ndarray": lambda self: "Matrix",
+    "numpy.array": lambda self: "Vector",
 }
 
 
@@ -292,13 +294,13 @@ class FuncTypeDispatch:
 
 
 FUNC_TYPE_MAP = {
-    np.random.randn: lambda self, node, vargs, kwargs: "np.ndarray",
-    np.sqrt: lambda self, node, vargs, kwargs: "float",
-    np.dot: FuncTypeDispatch.visit_npdot,
-    np.zeros: lambda self, node, vargs, kwargs: "np.ndarray",
-    np.exp: lambda self, node, vargs, kwargs: "np.ndarray",
-    np.transpose: lambda self, node, vargs, kwargs: "np.ndarray",
-    np.ndarray.transpose: lambda self, node, vargs, kwargs: "np.ndarray",
+    "numpy.random.randn": lambda self, node, vargs, kwargs: "np.ndarray",
+    "numpy.sqrt": lambda self, node, vargs, kwargs: "float",
+    "numpy.dot": FuncTypeDispatch.visit_npdot,
+    "numpy.zeros": lambda self, node, vargs, kwargs: "np.ndarray",
+    "numpy.exp": lambda self, node, vargs, kwargs: "np.ndarray",
+    "numpy.transpose": lambda self, node, vargs, kwargs: "np.ndarray",
+    "numpy.ndarray.transpose": lambda self, node, vargs, kwargs: "np.ndarray",
 }
 
 
@@ -1,5 +1,4 @@
 import ast
-import pytest
 from typing import Callable, Dict, Tuple, Union
 
 FuncType = Union[Callable, str]
@@ -18,7 +17,7 @@ class JuliaExternalModulePlugins:
 
 
 FUNC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
-    pytest.raises: (JuliaExternalModulePlugins.visit_raises, True),
+    "pytest.raises": (JuliaExternalModulePlugins.visit_raises, True),
 }
 
 IGNORED_MODULE_SET = {"pytest"}
@@ -1,6 +1,4 @@
 import ast
-import requests
-
 from typing import Callable, Dict, Tuple, Union
 
 FuncType = Union[Callable, str]
@@ -43,18 +41,18 @@ DISPATCH_MAP = {
 SMALL_DISPATCH_MAP = {"requests.codes.ok": lambda node, vargs, kwargs: "200"}
 
 FUNC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
-    requests.get: (JuliaExternalModulePlugins.visit_get, True),
-    requests.Response.text: (JuliaExternalModulePlugins.visit_response_get, True),
+    "requests.get": (JuliaExternalModulePlugins.visit_get, True),
+    "requests.Response.text": (JuliaExternalModulePlugins.visit_response_get, True),
 }
 
 IGNORED_MODULE_SET = set(["requests"])
 
 FUNC_TYPE_MAP = {
-    requests.get: lambda self, node, vargs, kwargs: "requests.Response",
+    "requests.get": lambda self, node, vargs, kwargs: "requests.Response",
 }
 
 EXTERNAL_TYPE_MAP = {
-    requests.HTTPError: lambda self: JuliaExternalModulePlugins.visit_http_error(
+    "requests.HTTPError": lambda self: JuliaExternalModulePlugins.visit_http_error(
         self, None, [], []
     )
 }
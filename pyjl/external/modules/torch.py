@@ -1,8 +1,6 @@
 import ast
 from typing import Callable, Dict, Tuple, Union
 
-import torch
-
 
 class JuliaExternalModulePlugins:
     def visit_torch_zeros(
@@ -22,12 +20,12 @@ class JuliaExternalModulePlugins:
 FuncType = Union[Callable, str]
 
 FUNC_DISPATCH_TABLE: Dict[FuncType, Tuple[Callable, bool]] = {
-    torch.zeros: (JuliaExternalModulePlugins.visit_torch_zeros, True),
-    torch.Tensor.numpy: (JuliaExternalModulePlugins.visit_torch_zeros_numpy, True),
+    "torch.zeros": (JuliaExternalModulePlugins.visit_torch_zeros, True),
+    "torch.Tensor.numpy": (JuliaExternalModulePlugins.visit_torch_zeros_numpy, True),
 }
 
-EXTERNAL_TYPE_MAP = {torch.Tensor: lambda self: ""}  # Temporary
+EXTERNAL_TYPE_MAP = {"torch.Tensor": lambda self: ""}  # Temporary
 
-FUNC_TYPE_MAP = {torch.zeros: lambda self, node, vargs, kwargs: "torch.Tensor"}
+FUNC_TYPE_MAP = {"torch.zeros": lambda self, node, vargs, kwargs: "torch.Tensor"}
 
 IGNORED_MODULE_SET = set(["torch"])
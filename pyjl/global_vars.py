@@ -18,6 +18,12 @@ USE_GLOBAL_CONSTANTS = "use_global_constants"
 ALLOW_ANNOTATIONS_ON_GLOBALS = "allow_annotations_on_globals"
 REMOVE_NESTED_RESUMABLES = "remove_nested_resumables"
 OPTIMIZE_LOOP_RANGES = "optimize_loop_ranges"
+ELIDE_BOUNDS_CHECKS = "elide_bounds_checks"
+SIMD_LOOPS = "simd_loops"
+FASTMATH = "fastmath"
+USE_VIEWS = "use_views"
+REPORT_ANY_TYPES = "report_any_types"
+USE_THREADS = "use_threads"
 
 # Decorators and Flags
 REMOVE_NESTED = "remove_nested"
@@ -35,6 +41,12 @@ GLOBAL_FLAGS = [
     USE_GLOBAL_CONSTANTS,
     REMOVE_NESTED_RESUMABLES,
     OPTIMIZE_LOOP_RANGES,
+    ELIDE_BOUNDS_CHECKS,
+    SIMD_LOOPS,
+    FASTMATH,
+    USE_VIEWS,
+    REPORT_ANY_TYPES,
+    USE_THREADS,
 ]
 
 FLAG_DEFAULTS = {
@@ -49,6 +61,12 @@ FLAG_DEFAULTS = {
     ALLOW_ANNOTATIONS_ON_GLOBALS: False,
     REMOVE_NESTED_RESUMABLES: False,
     OPTIMIZE_LOOP_RANGES: False,
+    ELIDE_BOUNDS_CHECKS: True,
+    SIMD_LOOPS: True,
+    FASTMATH: False,
+    USE_VIEWS: True,
+    REPORT_ANY_TYPES: False,
+    USE_THREADS: True,
 }
 
 ###################################
@@ -1,21 +1,83 @@
 import ast
-from typing import Any
+import logging
+from typing import Any, List, Optional, Tuple, cast
 from py2many.external_modules import ExternalBase
+from py2many.ast_helpers import create_ast_node
 from py2many.helpers import get_ann_repr
 
-from py2many.inference import InferMeta, InferTypesTransformer
+from py2many.inference import InferMeta, InferTypesTransformer, get_inferred_type
 from py2many.analysis import get_id
 from py2many.exceptions import AstIncompatibleAssign, AstUnrecognisedBinOp
-from pyjl.global_vars import DEFAULT_TYPE, SEP
+from pyjl.global_vars import (
+    DEFAULT_TYPE,
+    FLAG_DEFAULTS,
+    REPORT_ANY_TYPES,
+    SEP,
+)
 from py2many.helpers import is_dir, is_file
 
+logger = logging.Logger("pyjl")
+
+# Julia compiles separate code paths for unions of up to 4 types, larger
+# unions are handled like Any
+MAX_UNION_SIZE = 4
+# Numeric types from narrowest to widest. Julia converts the narrower ones
+# when they are stored in a container or field of a wider type, as in
+# Python arithmetic
+NUMERIC_TYPES = ["int", "float", "complex"]
+# Annotations of containers without element types, which Julia gives Any
+UNTYPED_CONTAINERS = {"list", "List", "dict", "Dict", "set", "Set"}
+
 
 def infer_julia_types(node, extension=False):
     visitor = InferJuliaTypesTransformer()
     visitor.visit(node)
+    if getattr(node, REPORT_ANY_TYPES, FLAG_DEFAULTS[REPORT_ANY_TYPES]):
+        visitor.report_any_types(node)
     return InferMeta(visitor.has_fixed_width_ints)
 
 
+def type_names(annotation: ast.AST) -> List[str]:
+    """The names of the types in annotation, with unions flattened"""
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        return [annotation.value]
+    if isinstance(annotation, ast.Subscript):
+        value_id = get_id(annotation.value)
+        elts = (
+            annotation.slice.elts
+            if isinstance(annotation.slice, ast.Tuple)
+            else [annotation.slice]
+        )
+        if value_id in {"Union", "typing.Union"}:
+            return [name for e in elts for name in type_names(e)]
+        if value_id in {"Optional", "typing.Optional"}:
+            return type_names(annotation.slice) + ["None"]
+    return [ast.unparse(annotation)]
+
+
+def widen_types(
+    annotations: List[Optional[ast.AST]],
+) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the narrowest type that holds values of all the given types,
+    or None and the reason why it can only be Any"""
+    names = []
+    for annotation in annotations:
+        if annotation is None:
+            return None, "the type of a value could not be inferred"
+        for name in type_names(annotation):
+            if name not in names:
+                names.append(name)
+    if untyped := [name for name in names if "Any" in name]:
+        return None, f"{', '.join(untyped)} is not concrete"
+    if set(names) <= set(NUMERIC_TYPES):
+        names = [max(names, key=NUMERIC_TYPES.index)]
+    if len(names) > MAX_UNION_SIZE:
+        return None, f"values of more than {MAX_UNION_SIZE} types: {', '.join(names)}"
+    if len(names) == 1:
+        return names[0], None
+    return f"Union[{', '.join(names)}]", None
+
+
 class InferJuliaTypesTransformer(InferTypesTransformer, ExternalBase):
     NAME = "julia"
     """
@@ -32,13 +94,67 @@ class InferJuliaTypesTransformer(InferTypesTransformer, ExternalBase):
         self._default_type = DEFAULT_TYPE
         self._func_type_map = self.FUNC_TYPE_MAP
         self._basedir = None
-        # Get external module features
+        self._any_types = []
+        # Get external module features, loaded on demand in visit_Module
         self.import_external_modules(self.NAME)
 
     def visit_Module(self, node: ast.Module) -> Any:
+        self.load_external_modules(node)
         self._basedir = getattr(node, "__basedir__", None)
+        self._any_types = []
         return super().visit_Module(node)
 
+    def report_any_types(self, node: ast.Module):
+        self._find_untyped_containers(node)
+        if self._any_types:
+            elems = []
+            for n, what, reason in sorted(
+                self._any_types, key=lambda any_type: any_type[0].lineno
+            ):
+                elems.append(f"- {what} on linenumber {n.lineno}: {reason}")
+            elems_str = "\n".join(elems)
+            logger.warning(
+                f"\033[93mWARNING {node.__file__.name}: Any is used for"
+                f" these types:\n"
+                f"{elems_str}\033[0m"
+            )
+
+    def _find_untyped_containers(self, node: ast.Module):
+        """Adds the declarations of containers without element types and
+        the containers that are created empty to the Any types"""
+        for n in ast.walk(node):
+            if isinstance(n, ast.arg):
+                ann, what = n.annotation, f"argument {n.arg}"
+            elif isinstance(n, ast.FunctionDef):
+                ann, what = n.returns, f"return type of {n.name}"
+            elif isinstance(n, ast.AnnAssign):
+                ann, what = n.annotation, f"variable {get_id(n.target)}"
+            elif isinstance(n, ast.Assign) and self._is_empty_container(n.value):
+                for t in n.targets:
+                    ann = getattr(t, "annotation", None)
+                    if isinstance(t, ast.Name) and not isinstance(ann, ast.Subscript):
+                        self._any_types.append(
+                            (n, f"variable {t.id}", "it is created empty")
+                        )
+                continue
+            else:
+                continue
+            if ann is not None and get_id(ann) in UNTYPED_CONTAINERS:
+                self._any_types.append((n, what, f"{get_id(ann)} has no element types"))
+
+    @staticmethod
+    def _is_empty_container(node) -> bool:
+        if isinstance(node, ast.List):
+            return not node.elts
+        if isinstance(node, ast.Dict):
+            return not node.keys
+        return (
+            isinstance(node, ast.Call)
+            and get_id(node.func) in {"list", "dict", "set"}
+            and not node.args
+            and not node.keywords
+        )
+
     def visit_Call(self, node: ast.Call):
         # Verify if the func is a module
         if isinstance(node.func, ast.Attribute):
@@ -51,29 +167,120 @@ class InferJuliaTypesTransformer(InferTypesTransformer, ExternalBase):
         super().visit_Call(node)
 
         # Confirm that append is to a list of the same type
-        # If not, then assign type any
+        # If not, then widen the element type
         if isinstance(node.func, ast.Attribute) and node.func.attr == "append":
             ann = getattr(node.func.value, "annotation", None)
             arg_ann = getattr(node.args[0], "annotation", None)
             if (
                 isinstance(ann, ast.Subscript)
-                and isinstance(ann.slice, ast.Name)
                 and get_id(ann.value) in {"List", "list"}
                 and arg_ann
                 and get_id(arg_ann) != "Any"
-                and get_id(arg_ann) != get_id(ann.slice)
+                and not set(type_names(arg_ann)) <= set(type_names(ann.slice))
             ):
                 list_node = node.scopes.find(get_id(node.func.value))
-                if list_node:
-                    list_node.annotation = ast.Subscript(
-                        value=ast.Name("List"),
-                        slice=ast.Name("Any"),
-                    )
+                elt_type, reason = widen_types([ann.slice, arg_ann])
+                if list_node and elt_type != ast.unparse(ann.slice):
+                    if elt_type is None:
+                        elt_type = "Any"
+                        self._any_types.append(
+                            (node, f"list {get_id(node.func.value)}", reason)
+                        )
+                    self._annotate_widened(list_node, f"List[{elt_type}]")
                     list_node.make_generic = True
-                # raise TypeNotSupported("Cannot append to a list of different Type in Julia")
-            pass
         return node
 
+    def visit_ClassDef(self, node: ast.ClassDef) -> Any:
+        super().visit_ClassDef(node)
+        self._widen_fields(node)
+        return node
+
+    def _widen_fields(self, node: ast.ClassDef):
+        """Computes the types of the fields that are not annotated from all
+        the values that the methods assign to them"""
+        annotated = set()
+        values = {}
+        for n in node.body:
+            if isinstance(n, ast.AnnAssign):
+                annotated.add(get_id(n.target))
+            if not isinstance(n, ast.FunctionDef):
+                continue
+            for stmt in ast.walk(n):
+                if isinstance(stmt, ast.AnnAssign) and self._is_field(stmt.target):
+                    annotated.add(stmt.target.attr)
+                elif isinstance(stmt, ast.Assign):
+                    for t in stmt.targets:
+                        if self._is_field(t):
+                            values.setdefault(t.attr, []).append(stmt.value)
+        node.field_types = {}
+        for field, field_values in values.items():
+            if field in annotated:
+                continue
+            field_type, reason = self._widen_values(field_values)
+            if field_type is None:
+                self._any_types.append(
+                    (field_values[0], f"field {node.name}.{field}", reason)
+                )
+            else:
+                node.field_types[field] = self._type_node(field_type, node)
+
+    def _visit_container_elem_types(self, node, typename="Any"):
+        super()._visit_container_elem_types(node, typename)
+        if typename != "list" or hasattr(node, "annotation"):
+            return
+        # Julia gives Vector{Any} for literals with elements of different types
+        elt_type, reason = self._widen_values(node.elts)
+        if elt_type is None:
+            self._any_types.append((node, "list literal", reason))
+        else:
+            self._annotate_widened(node, f"list[{elt_type}]")
+            node.widened = True
+
+    def visit_Dict(self, node: ast.Dict) -> Any:
+        super().visit_Dict(node)
+        ann = getattr(node, "annotation", None)
+        if not node.keys or None in node.keys or ann is None:
+            return node
+        # A bare Dict is the annotation of mixed keys and values
+        if get_id(ann) not in ("Dict", "dict") and "Any" not in ast.unparse(ann):
+            return node
+        key_type, key_reason = self._widen_values(node.keys)
+        value_type, value_reason = self._widen_values(node.values)
+        if key_type and value_type:
+            self._annotate_widened(node, f"Dict[{key_type}, {value_type}]")
+        else:
+            self._any_types.append((node, "dict literal", key_reason or value_reason))
+        return node
+
+    @classmethod
+    def _annotate_widened(cls, node, typename: str):
+        node.annotation = cls._type_node(typename, node)
+
+    @staticmethod
+    def _type_node(typename: str, node) -> ast.AST:
+        type_node = cast(ast.Expr, create_ast_node(typename, node)).value
+        # Unions are nested in other types, all of it is rendered as a type
+        for n in ast.walk(type_node):
+            n.is_annotation = True
+        return type_node
+
+    @staticmethod
+    def _is_field(node) -> bool:
+        return isinstance(node, ast.Attribute) and get_id(node.value) == "self"
+
+    def _widen_values(self, values) -> Tuple[Optional[str], Optional[str]]:
+        types = list(map(self._value_type, values))
+        for value, value_type in zip(values, types):
+            if value_type is None:
+                return None, f"the type of {ast.unparse(value)} could not be inferred"
+        return widen_types(types)
+
+    @staticmethod
+    def _value_type(node) -> Optional[ast.AST]:
+        if isinstance(node, ast.Constant) and node.value is None:
+            return ast.Name(id="None")
+        return get_inferred_type(node)
+
     def visit_Assign(self, node: ast.Assign) -> ast.AST:
         # Get annotation
         # Verify if the value is a module
@@ -2988,6 +2988,22 @@ class JuliaContextManagerRewriter(ast.NodeTransformer):
     def __init__(self) -> None:
         super().__init__()
 
+    def visit_With(self, node: ast.With) -> Any:
+        self.generic_visit(node)
+        if len(node.items) != 1:
+            return node
+        ctx = node.items[0].context_expr
+        opt = node.items[0].optional_vars
+        if isinstance(ctx, ast.Call) and hasattr(ctx, "threads"):
+            # Multiprocessing pools. Maps on threads don't use the pool.
+            # The body stays in the enclosing scope, as in Python
+            if ctx.threads or opt is None:
+                return node.body
+            assign = ast.Assign(targets=[opt], value=ctx, scopes=node.scopes)
+            ast.copy_location(assign, node)
+            return [assign] + node.body
+        return node
+
     def visit_Call(self, node: ast.Call) -> Any:
         self.generic_visit(node)
         func_node = node.scopes.find(get_id(node.func))
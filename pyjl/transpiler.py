@@ -24,7 +24,7 @@ from .plugins import (
 
 from py2many.analysis import get_id, is_void_function
 from py2many.declaration_extractor import DeclarationExtractor
-from py2many.clike import _AUTO_INVOKED
+from py2many.clike import _AUTO_INVOKED, ModuleState
 from py2many.tracer import (
     find_in_body,
     find_node_by_name_and_type,
@@ -90,9 +90,10 @@ class JuliaTranspiler(CLikeTranspiler):
         ast.Pow: "__pow__",
     }
 
+    _is_pycall_exception = ModuleState(bool)
+
     def __init__(self, jl_func_list):
         super().__init__()
-        self._headers = set([])
         self._dispatch_map = DISPATCH_MAP
 
         # Added
@@ -436,12 +437,63 @@ class JuliaTranspiler(CLikeTranspiler):
 
         # Replace square brackets for normal brackets in lhs
         target = target.replace("[", "(").replace("]", ")")
-        buf.append(f"for {target} in {it}")
+        macros = []
+        if getattr(node, "fastmath", False):
+            macros.append("@fastmath")
+        if self._is_inbounds_loop(node):
+            macros.append("@inbounds")
+        if getattr(node, "simd", False):
+            macros.append("@simd")
+        if index := getattr(node, "simd_index", None):
+            # simd loops index what they iterate over
+            target, it, elements = self._simd_index_loop(node, index)
+            buf.append(" ".join([*macros, f"for {target} in {it}"]))
+            buf.extend(elements)
+        else:
+            buf.append(" ".join([*macros, f"for {target} in {it}"]))
         buf.extend([self.visit(c) for c in node.body])
         buf.append("end")
 
         return "\n".join(buf)
 
+    def _simd_index_loop(self, node: ast.For, index: str):
+        """Returns the index, the range and the assignments of the elements of
+        a simd loop over zip or enumerate of lists"""
+        targets = [self.visit(e) for e in node.target.elts]
+        lists = [self.visit(a) for a in node.iter.args]
+        if get_id(node.iter.func) == "enumerate":
+            # Julia's enumerate counts from 1
+            targets = targets[1:]
+            it = f"1:length({lists[0]})"
+        elif len(lists) == 1:
+            it = f"1:length({lists[0]})"
+        else:
+            lengths = ", ".join(f"length({lst})" for lst in lists)
+            it = f"1:min({lengths})"
+        elements = [
+            f"@inbounds {target} = {lst}[{index}]"
+            for target, lst in zip(targets, lists)
+        ]
+        return index, it, elements
+
+    def _is_inbounds_loop(self, node: ast.For) -> bool:
+        """@inbounds applies to the whole loop, so all of its subscripts
+        have to be in range. See JuliaBoundsCheckAnalysis"""
+        if getattr(node, "in_inbounds_loop", False):
+            return False
+        nodes = [n for stmt in node.body for n in ast.walk(stmt)]
+        subscripts = [
+            n
+            for n in nodes
+            if isinstance(n, ast.Subscript) and not getattr(n, "is_annotation", False)
+        ]
+        in_bounds = all(getattr(n, "in_bounds", False) for n in subscripts)
+        if not subscripts or not in_bounds:
+            return False
+        for n in nodes:
+            n.in_inbounds_loop = True
+        return True
+
     def visit_Compare(self, node) -> str:
         left = self.visit(node.left)
         comparators = node.comparators
@@ -769,6 +821,17 @@ class JuliaTranspiler(CLikeTranspiler):
                 if name not in args_str:
                     dec_items.append((name, (typename, default)))
 
+        # Fields assigned values of different types get their union
+        field_types = getattr(node, "field_types", {})
+        dec_items = [
+            (
+                (name, (self._field_typename(field_types[name], node), default))
+                if name in field_types
+                else (name, (typename, default))
+            )
+            for name, (typename, default) in dec_items
+        ]
+
         check_reserved_names = (
             lambda item: (f"{item[0]}_", item[1])
             if (item[0] in self._julia_function_names)
@@ -806,6 +869,23 @@ class JuliaTranspiler(CLikeTranspiler):
         node.fields = fields
         node.fields_str = "\n".join(fields_str)
 
+    def _field_typename(self, field_type: ast.AST, node: ast.ClassDef) -> str:
+        elts = [field_type]
+        if (
+            isinstance(field_type, ast.Subscript)
+            and get_id(field_type.value) == "Union"
+        ):
+            elts = getattr(field_type.slice, "elts", [field_type.slice])
+        typenames = []
+        for elt in elts:
+            typename = self.visit(elt)
+            if is_class_or_module(typename, node.scopes):
+                typename = f"Abstract{typename}"
+            typenames.append(typename)
+        if len(typenames) == 1:
+            return typenames[0]
+        return f"Union{{{', '.join(typenames)}}}"
+
     def _build_constructor(self, node: ast.ClassDef, dec_items: dict[str, Any]):
         args = ast.arguments(args=[], defaults=[])
         assigns = []
@@ -1015,7 +1095,12 @@ class JuliaTranspiler(CLikeTranspiler):
         elts = self._parse_elts(node)
         if hasattr(node, "is_annotation"):
             return f"{{{elts}}}"
-        return f"({elts})" if hasattr(node, "lhs") and node.lhs else f"[{elts}]"
+        if hasattr(node, "lhs") and node.lhs:
+            return f"({elts})"
+        if getattr(node, "widened", False):
+            # Elements of different types, avoid getting a Vector{Any}
+            return f"{self.visit(node.annotation.slice)}[{elts}]"
+        return f"[{elts}]"
 
     def visit_Tuple(self, node: ast.Tuple) -> str:
         elts = self._parse_elts(node)
@@ -1069,6 +1154,14 @@ class JuliaTranspiler(CLikeTranspiler):
                 return f"Union{{{index_type}, Nothing}}"
             return f"{value_type}{{{index_type}}}"
 
+        if (
+            getattr(node, "in_bounds", False)
+            and not getattr(node, "in_inbounds_loop", False)
+            and isinstance(getattr(node, "ctx", None), ast.Load)
+        ):
+            return f"(@inbounds {value}[{index}])"
+        if getattr(node, "view", False) and isinstance(node.slice, ast.Slice):
+            return f"@view({value}[{index}])"
         return f"{value}[{index}]"
 
     def visit_Index(self, node) -> str:
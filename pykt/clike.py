@@ -3,7 +3,7 @@ import ast
 from .inference import KT_TYPE_MAP, KT_WIDTH_RANK
 
 from py2many.analysis import get_id
-from py2many.clike import CLikeTranspiler as CommonCLikeTranspiler
+from py2many.clike import CLikeTranspiler as CommonCLikeTranspiler, ModuleState
 
 
 # allowed as names in Python but treated as keywords in Kotlin
@@ -86,11 +86,13 @@ kotlin_keywords = frozenset(
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
+    # Temporaries are numbered per module
+    _temp = ModuleState(int)
+
     def __init__(self):
         super().__init__()
         self._type_map = KT_TYPE_MAP
         self._statement_separator = ""
-        self._temp = 0
 
     def _get_temp(self):
         self._temp += 1
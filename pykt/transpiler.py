@@ -30,6 +30,12 @@ class KotlinPrintRewriter(ast.NodeTransformer):
         self._temp += 1
         return f"__tmp{self._temp}"
 
+    def visit_Module(self, node):
+        # Temporaries are numbered per module
+        self._temp = 0
+        self.generic_visit(node)
+        return node
+
     def visit_Call(self, node):
         fname = self.visit(node.func)
 
@@ -10,6 +10,12 @@ class WithToBlockRewriter(ast.NodeTransformer):
         self._temp += 1
         return f"tmp{self._temp}"
 
+    def visit_Module(self, node):
+        # Temporaries are numbered per module
+        self._temp = 0
+        self.generic_visit(node)
+        return node
+
     def visit_With(self, node):
         self.generic_visit(node)
         stmts = []
@@ -49,7 +49,6 @@ class NimTranspiler(CLikeTranspiler):
 
     def __init__(self, indent=2):
         super().__init__()
-        self._headers = set([])
         self._indent = " " * indent
         self._default_type = "var"
         self._container_type_map = self.CONTAINER_TYPE_MAP
@@ -23,4 +23,5 @@ def settings(args, env=os.environ):
         [RustNoneCompareRewriter()],
         [partial(infer_rust_types, extension=args.extension)],
         [RustLoopIndexRewriter(), RustStringJoinRewriter()],
+        stdin_formatter=["rustfmt", "--edition=2018"],
     )
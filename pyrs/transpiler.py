@@ -22,7 +22,7 @@ from py2many.analysis import (
     is_mutable,
     is_void_function,
 )
-from py2many.clike import class_for_typename
+from py2many.clike import ModuleState, class_for_typename
 from py2many.declaration_extractor import DeclarationExtractor
 from py2many.exceptions import AstClassUsedBeforeDeclaration
 from py2many.inference import is_reference
@@ -86,6 +86,9 @@ class RustTranspiler(CLikeTranspiler):
         "Result": "Result",
     }
 
+    _allows = ModuleState(set)
+    _rust_mods = ModuleState(set)
+
     def __init__(self, extension: bool = False, no_prologue: bool = False):
         super().__init__()
         self._container_type_map = self.CONTAINER_TYPE_MAP
@@ -99,8 +102,6 @@ class RustTranspiler(CLikeTranspiler):
         self._func_dispatch_table = FUNC_DISPATCH_TABLE
         self._func_usings_map = FUNC_USINGS_MAP
         self._attr_dispatch_table = ATTR_DISPATCH_TABLE
-        self._allows = set()
-        self._rust_mods = set()
 
     def usings(self):
         if self._extension:
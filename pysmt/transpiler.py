@@ -31,7 +31,6 @@ class SmtTranspiler(CLikeTranspiler):
 
     def __init__(self, indent=2):
         super().__init__()
-        self._headers = set([])
         self._indent = " " * indent
         self._default_type = "var"
         if "math" in self._ignored_module_set:
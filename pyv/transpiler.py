@@ -149,7 +149,6 @@ class VTranspiler(CLikeTranspiler):
 
     def __init__(self, indent: int = 2):
         super().__init__()
-        self._headers = set([])
         self._indent = " " * indent
         self._default_type = "any"
         self._container_type_map = self.CONTAINER_TYPE_MAP
@@ -26,6 +26,7 @@ setup(
     packages=find_packages(
         exclude=["docs", "examples", "tests", "tests*", "pycpp.tests", "pyrs.tests"]
     ),
+    package_data={"pyjl": ["setup_files/*.txt"]},
     license="MIT",
     classifiers=[
         "License :: OSI Approved :: MIT License",
@@ -92,7 +92,7 @@ function for_cycle_vars()
     seq = [1, 2, 3, 4, 5]
     seq_copy = collect(seq)
     for i = 0:length(seq)-2
-        @assert(seq[i+1] == seq_copy[i+1])
+        @assert((@inbounds seq[i+1]) == seq_copy[i+1])
     end
     complex_list = [([1, 2], 3, 4)]
     for ((a1, a2), b, c) in complex_list
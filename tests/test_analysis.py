@@ -90,3 +90,23 @@ class TestImportTransformer:
 
         assert len(module.imports) == 1
         assert isinstance(bar_import.imported_from, ast.ImportFrom)
+
+    def test_qualified_imports(self):
+        source = ast.parse(
+            "\n".join(
+                [
+                    "import numpy as np",
+                    "import os.path",
+                    "from torch import Tensor as T",
+                    "from . import sibling",
+                ]
+            )
+        )
+        add_scope_context(source)
+        ImportTransformer().visit(source)
+
+        assert source.qualified_imports == {
+            "np": "numpy",
+            "os": "os",
+            "T": "torch.Tensor",
+        }
@@ -1,6 +1,8 @@
 import argparse
+import io
 import logging
 import os.path
+import tempfile
 import unittest
 import sys
 
@@ -11,13 +13,20 @@ from subprocess import run
 from unittest.mock import Mock
 from unittest_expander import foreach, expand
 
+from py2many.build_cache import CACHE_FILE, BuildCache
 from py2many.cli import (
     _create_cmd,
+    _format_data,
     _get_all_settings,
     _get_output_path,
+    _parse,
+    _read_frames,
     _relative_to_cwd,
+    _transpile,
+    _write_frame,
     main,
 )
+from py2many.exceptions import AstNotImplementedError
 from pycpp import _conan_include_dirs
 
 import py2many.cli
@@ -499,6 +508,129 @@ class CodeGeneratorTests(unittest.TestCase):
                 self._rmdir_recursive(output_dir)
 
 
+def make_args(**kwargs):
+    args = argparse.Namespace(
+        indent=4,
+        comment_unsupported=False,
+        extension=False,
+        no_prologue=False,
+        typpete=False,
+        pytype=False,
+        config=None,
+        import_basedir=None,
+        jobs=1,
+        profile_passes=None,
+    )
+    vars(args).update(kwargs)
+    return args
+
+
+def transpile_cases(lang, filenames, sources, basedir, **kwargs):
+    args = make_args(**kwargs)
+    settings = _get_all_settings(args)[lang]
+    return _transpile(filenames, sources, settings, args, basedir=basedir)
+
+
+@expand
+class TestParallel(unittest.TestCase):
+    @foreach(sorted(LANGS))
+    def test_jobs_output(self, lang):
+        base = TESTS_DIR / "cases"
+        filenames = sorted(p.relative_to(base) for p in base.glob("*.py"))
+        sources = [(base / f).read_text() for f in filenames]
+        serial = transpile_cases(lang, filenames, sources, base)
+        parallel = transpile_cases(lang, filenames, sources, base, jobs=2)
+        self.assertEqual(parallel, serial)
+
+    def test_jobs_error(self):
+        filenames = [Path("ok.py"), Path("fail.py")]
+        sources = ["x = 1\n", "async def f():\n    pass\n"]
+        errors = []
+        for jobs in [1, 2]:
+            args = make_args(jobs=jobs)
+            settings = _get_all_settings(args)["cpp"]
+            with self.assertRaises(AstNotImplementedError) as cm:
+                _transpile(
+                    filenames,
+                    sources,
+                    settings,
+                    args,
+                    _suppress_exceptions=False,
+                    basedir=Path("."),
+                )
+            errors.append((str(cm.exception), cm.exception.lineno))
+        self.assertEqual(errors[0], errors[1])
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.outdir = Path(self._tmpdir.name)
+        self.sources = {
+            Path("a.py"): "import b\n\nx = b.y\n",
+            Path("b.py"): "y = 1\n",
+            Path("c.py"): "z = 2\n",
+        }
+        self.settings = Mock(transpiler=Mock(NAME="julia"), ext=".jl", formatter=None)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def build(self, **kwargs):
+        """Runs a cached build and returns the filenames it transpiled"""
+        args = make_args(**kwargs)
+        cache = BuildCache(self.outdir, self.settings, args)
+        filenames = list(self.sources)
+        sources = list(self.sources.values())
+        trees = _parse(filenames, sources, args, self.outdir)
+        _, cached = cache.select(trees, self.sources)
+        built = set(filenames) - cached
+        for filename in built:
+            output_path = _get_output_path(filename, ".jl", self.outdir)
+            output_path.write_text(self.sources[filename])
+            cache.update(filename, output_path)
+        cache.save()
+        return built
+
+    def test_unchanged(self):
+        self.assertEqual(self.build(), set(self.sources))
+        self.assertEqual(self.build(), set())
+
+    def test_changed_source(self):
+        self.build()
+        self.sources[Path("c.py")] = "z = 3\n"
+        self.assertEqual(self.build(), {Path("c.py")})
+
+    def test_changed_flags(self):
+        self.build()
+        self.assertEqual(self.build(indent=2), set(self.sources))
+        self.assertEqual(self.build(indent=2), set())
+
+    def test_changed_output(self):
+        self.build()
+        (self.outdir / "c.jl").write_text("z = 4\n")
+        self.assertEqual(self.build(), {Path("c.py")})
+
+    def test_dependency(self):
+        self.build()
+        self.sources[Path("b.py")] = "y = 2\n"
+        self.assertEqual(self.build(), {Path("a.py"), Path("b.py")})
+
+    def test_corrupt_cache(self):
+        self.build()
+        (self.outdir / CACHE_FILE).write_text("{not json")
+        self.assertEqual(self.build(), set(self.sources))
+        (self.outdir / CACHE_FILE).unlink()
+        self.assertEqual(self.build(), set(self.sources))
+
+
+class TestPlugins(unittest.TestCase):
+    def test_builtin_exceptions(self):
+        source = 'raise RuntimeError("boom")\n'
+        outputs, _ = transpile_cases("julia", [Path("test.py")], [source], Path("."))
+        self.assertIn('throw(ErrorException("boom"))', outputs[0])
+
+
 class TestPaths(unittest.TestCase):
     def test_output_path(self):
         base = Path(".")
@@ -508,6 +640,26 @@ class TestPaths(unittest.TestCase):
         )
 
 
+class TestStream(unittest.TestCase):
+    def test_frames(self):
+        docs = [b"print(1)\n", b"", "print('\u00e9')\n".encode("utf-8")]
+        for framing in ["nul", "length"]:
+            out = io.BytesIO()
+            for doc in docs:
+                _write_frame(out, doc, framing)
+            out.seek(0)
+            self.assertEqual(list(_read_frames(out, framing)), docs)
+
+    def test_format_data(self):
+        upper = "import sys; sys.stdout.write(sys.stdin.read().upper())"
+        settings = Mock(stdin_formatter=[sys.executable, "-c", upper])
+        self.assertEqual(_format_data(settings, "fn main() {}"), ("FN MAIN() {}", True))
+        settings = Mock(stdin_formatter=[sys.executable, "-c", "exit(1)"])
+        self.assertEqual(
+            _format_data(settings, "fn main() {}"), ("fn main() {}", False)
+        )
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--lint", type=bool, default=False, help="Lint generated code")
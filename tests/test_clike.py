@@ -1,8 +1,56 @@
 import ast
-from py2many.clike import c_symbol
+import math
+import threading
+from py2many.clike import (
+    CLikeTranspiler,
+    c_symbol,
+    class_for_typename,
+    qualified_name,
+)
 
 
 def test_c_symbol():
     source = ast.parse("x == y")
     equals_symbol = source.body[0].value.ops[0]
     assert c_symbol(equals_symbol) == "=="
+
+
+def test_class_for_typename():
+    assert class_for_typename("int", None) is int
+    assert class_for_typename("math.sqrt", None) is math.sqrt
+    assert class_for_typename("List[int]", None) is not None
+    assert class_for_typename("unknown.name", "default") == "default"
+    assert class_for_typename("unknown.name", None) is None
+    imported_names = {"m": math}
+    assert class_for_typename("m.floor", None, imported_names) is math.floor
+    assert class_for_typename("m.floor", None) is None
+
+
+def test_qualified_name():
+    qualified_imports = {"np": "numpy", "T": "torch.Tensor"}
+    assert qualified_name("np.random.randn", qualified_imports) == "numpy.random.randn"
+    assert qualified_name("T.numpy", qualified_imports) == "torch.Tensor.numpy"
+    assert qualified_name("T", qualified_imports) == "torch.Tensor"
+    assert qualified_name("len", qualified_imports) is None
+    assert qualified_name("torch.zeros", qualified_imports) == "torch.zeros"
+    assert qualified_name("numpy", qualified_imports) is None
+
+
+def test_module_state():
+    transpiler = CLikeTranspiler()
+    transpiler._usings.add("a")
+    transpiler._module = "foo"
+    seen = []
+
+    def other_module():
+        seen.append((set(transpiler._usings), transpiler._module))
+        transpiler._usings.add("b")
+
+    thread = threading.Thread(target=other_module)
+    thread.start()
+    thread.join()
+    assert seen == [(set(), None)]
+    assert transpiler._usings == {"a"}
+    transpiler.reset()
+    assert transpiler._usings == set()
+    assert transpiler._module is None
@@ -1,5 +1,9 @@
 import ast
-from py2many.context import add_variable_context, add_list_calls
+from py2many.context import (
+    add_assignment_context,
+    add_list_calls,
+    add_variable_context,
+)
 from py2many.scope import add_scope_context
 
 
@@ -17,6 +21,18 @@ class TestListCallTransformer:
         assert len(source.scopes[-1].vars[0].calls) == 1
 
 
+class TestLHSAnnotationTransformer:
+    def test_lhs_marked(self):
+        source = parse("x[i] = y", "z: int = x")
+        add_assignment_context(source)
+        assign, ann_assign = source.body
+        assert assign.targets[0].lhs
+        assert assign.targets[0].slice.lhs
+        assert not hasattr(assign.value, "lhs")
+        assert ann_assign.target.lhs
+        assert not hasattr(ann_assign.annotation, "lhs")
+
+
 class TestVariableTranformer:
     def test_vars_of_if(self):
         source = parse("x = 5", "if True:", "   y = 10", "   x *= y")
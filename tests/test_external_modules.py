@@ -0,0 +1,39 @@
+import ast
+import os
+import sys
+
+from py2many.external_modules import MOD_DIR, ExternalModules, imported_libraries
+
+PYJL_MODULES = os.path.join(os.path.dirname(__file__), "..", "pyjl", MOD_DIR)
+
+
+def test_imported_libraries():
+    source = ast.parse(
+        "\n".join(
+            [
+                "import os.path, numpy as np",
+                "from ctypes import wintypes",
+                "from . import sibling",
+                "def f():",
+                "    import time",
+            ]
+        )
+    )
+    assert imported_libraries(source) == {"os", "numpy", "ctypes", "time"}
+
+
+def test_plugins_load_on_demand():
+    external_modules = ExternalModules(PYJL_MODULES)
+    external_modules.load({"warnings"})
+    assert "torch.py" not in sys.modules
+    assert external_modules.generation == 2
+    assert "warnings" in external_modules.tables["IGNORED_MODULE_SET"]
+    external_modules.load({"warnings"})
+    assert external_modules.generation == 2
+
+
+def test_builtin_plugins_always_load():
+    external_modules = ExternalModules(PYJL_MODULES)
+    external_modules.load(set())
+    assert external_modules.generation == 1
+    assert RuntimeError in external_modules.tables["FUNC_DISPATCH_TABLE"]
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from py2many.helpers import (
+    IMPORT_INDEX,
+    is_dir,
+    is_file,
+    parse_import_path,
+    parse_path,
+)
+
+IMPORT_NAMES = [
+    "pkg",
+    "pkg.mod",
+    "pkg.sub",
+    "pkg.sub.leaf",
+    "proj.pkg.mod",
+    ".mod",
+    ".sub.leaf",
+    "..pkg",
+    "..main",
+    "..lib.util",
+    "util",
+    "missing",
+]
+BASEDIRS = ["proj", "proj/main.py", "proj/pkg/mod.py", "lib"]
+
+
+def reference_import_path(import_name, basedir):
+    """parse_import_path as it was before the ImportIndex"""
+    cwd = os.getcwd().split(os.sep)
+    base_dir = basedir.as_posix().split("/")
+    if os.path.isfile(basedir.as_posix()):
+        base_dir = base_dir[:-1]
+    path = [p or ".." for p in import_name.split(".")]
+    indexes = [idx for idx, elem in enumerate(base_dir) if elem in path]
+    if indexes and (idx := indexes[0]) < len(base_dir):
+        full_path = cwd + base_dir[0:idx] + path
+    else:
+        full_path = cwd + base_dir + path
+    return parse_path(full_path, os.sep)
+
+
+@pytest.fixture
+def source_tree(tmp_path, monkeypatch):
+    for name in [
+        "proj/main.py",
+        "proj/pkg/__init__.py",
+        "proj/pkg/mod.py",
+        "proj/pkg/sub/leaf.py",
+        "lib/util.py",
+    ]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    monkeypatch.chdir(tmp_path)
+    IMPORT_INDEX.clear()
+    yield tmp_path
+    IMPORT_INDEX.clear()
+
+
+@pytest.mark.parametrize("basedir", BASEDIRS)
+def test_same_as_filesystem(source_tree, basedir):
+    # Relative imports and --import-basedir (lib) resolve as before
+    basedir = Path(basedir)
+    for import_name in IMPORT_NAMES:
+        path = reference_import_path(import_name, basedir)
+        assert parse_import_path(import_name, basedir) == path
+        assert is_file(import_name, basedir) == os.path.isfile(f"{path}.py")
+        assert is_dir(import_name, basedir) == os.path.isdir(path)
+
+
+def test_case_insensitive_filesystem(source_tree, monkeypatch):
+    names = {p.as_posix().casefold() for p in source_tree.rglob("*")}
+
+    def isfile(path):
+        return Path(path).as_posix().casefold() in names and "." in Path(path).name
+
+    monkeypatch.setattr(os.path, "isfile", isfile)
+    assert is_file("pkg.Mod", Path("proj"))
+    assert not is_file("pkg.Other", Path("proj"))
@@ -0,0 +1,28 @@
+import ast
+from argparse import Namespace
+
+from py2many.parse_cache import ParseCache
+
+
+def test_parse_cache():
+    source = "x = [1]\nprint(x[0] + 1)"
+    args = Namespace(pytype=False, import_basedir=None)
+    tree = ast.parse(source)
+    tree.__file__ = "test.py"
+    # Shared with every other tree that ast.parse returns
+    tree.body[0].targets[0].ctx.scopes = [object()]
+
+    cache = ParseCache()
+    key = cache.key(["test.py"], [source], None, args)
+    assert cache.get(key) is None
+    cache.put(key, (tree,))
+    (copy,) = cache.get(key)
+    assert copy is not tree
+    assert ast.dump(copy) == ast.dump(tree)
+    assert copy.__file__ == "test.py"
+    assert not hasattr(copy.body[0].targets[0].ctx, "scopes")
+    assert cache.get(key)[0] is not copy
+
+    assert cache.key(["test.py"], ["x = 2"], None, args) != key
+    args.pytype = True
+    assert cache.key(["test.py"], [source], None, args) != key
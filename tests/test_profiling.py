@@ -0,0 +1,84 @@
+import ast
+import csv
+import tracemalloc
+from argparse import Namespace
+from pathlib import Path
+
+from py2many.cli import _profile_report_path
+from py2many.profiling import PassProfiler, measure_pass
+from py2many.scope import add_scope_context
+
+
+def test_records(tmp_path):
+    tree = ast.parse("x = 1\nprint(x)")
+    tree.__file__ = "test.py"
+    tree_nodes = sum(1 for _ in ast.walk(tree))
+    profiler = PassProfiler()
+    assert tracemalloc.is_tracing()
+    with measure_pass(profiler, tree, add_scope_context):
+        add_scope_context(tree)
+    with measure_pass(profiler, tree, "visit"):
+        ast.NodeVisitor().visit(tree)
+    with measure_pass(profiler, tree, "walk"):
+        list(ast.walk(tree))
+    with measure_pass(profiler, tree, "transpile"):
+        pass
+    profiler.close()
+    assert not tracemalloc.is_tracing()
+    assert ast.NodeVisitor.visit.__name__ == "visit"
+
+    rows = [
+        (r["module"], r["index"], r["pass"], r["visited_nodes"])
+        for r in profiler.records
+    ]
+    assert rows[0][:3] == ("test.py", 0, "add_scope_context")
+    assert rows[0][3] >= tree_nodes
+    assert rows[1:] == [
+        ("test.py", 1, "visit", tree_nodes),
+        # The root is not a child
+        ("test.py", 2, "walk", tree_nodes - 1),
+        ("test.py", 3, "transpile", 0),
+    ]
+    assert all(r["seconds"] >= 0 for r in profiler.records)
+
+    report = tmp_path / "report.csv"
+    profiler.write_report(report)
+    with open(report, newline="") as f:
+        written = list(csv.DictReader(f))
+    assert [row["pass"] for row in written] == [
+        "add_scope_context",
+        "visit",
+        "walk",
+        "transpile",
+    ]
+    assert list(written[0]) == PassProfiler.FIELDS
+    assert "add_scope_context" in profiler.summary()
+
+
+def test_time_only():
+    tree = ast.parse("x = 1")
+    profiler = PassProfiler(time_only=True)
+    assert not tracemalloc.is_tracing()
+    with measure_pass(profiler, tree, "visit"):
+        ast.NodeVisitor().visit(tree)
+    profiler.close()
+    [record] = profiler.records
+    assert record["peak_memory_kb"] is None
+    assert record["visited_nodes"] is None
+    assert "visited" not in profiler.summary()
+
+
+def test_keeps_tracing():
+    tracemalloc.start()
+    try:
+        PassProfiler().close()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_report_path():
+    args = Namespace(profile_passes="out/report.json", langs=None)
+    assert _profile_report_path(args, "rust") == Path("out/report.json")
+    args.langs = "rust,go"
+    assert _profile_report_path(args, "rust") == Path("out/report-rust.json")
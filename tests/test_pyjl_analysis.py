@@ -0,0 +1,444 @@
+import ast
+from pathlib import Path
+
+from py2many.analysis import add_imports
+from py2many.context import add_variable_context
+from py2many.scope import add_scope_context
+from pyjl.analysis import (
+    bounds_check_analysis,
+    detect_parallel_maps,
+    detect_simd_loops,
+    detect_views,
+)
+from pyjl.rewriters import JuliaContextManagerRewriter
+from pyjl.transformers import parse_decorators
+
+
+def parse(*args, **flags):
+    source = ast.parse("\n".join(args))
+    source.__file__ = Path("test.py")
+    source.__basedir__ = Path()
+    for flag, value in flags.items():
+        setattr(source, flag, value)
+    add_scope_context(source)
+    add_variable_context(source, (source,))
+    add_imports(source)
+    bounds_check_analysis(source)
+    detect_simd_loops(source)
+    detect_views(source)
+    detect_parallel_maps(source)
+    return source
+
+
+def in_bounds(source):
+    body = source.body[0].body
+    return {
+        ast.unparse(n): getattr(n, "in_bounds", False)
+        for stmt in body
+        for n in ast.walk(stmt)
+        if isinstance(n, ast.Subscript)
+    }
+
+
+def loops(source):
+    return [
+        (getattr(n, "simd", False), getattr(n, "fastmath", False))
+        for n in ast.walk(source)
+        if isinstance(n, ast.For)
+    ]
+
+
+def views(source, node=None):
+    return [
+        getattr(n, "view", False)
+        for n in ast.walk(node or source.body[0])
+        if isinstance(n, ast.Subscript)
+        and isinstance(n.slice, ast.Slice)
+        and isinstance(n.ctx, ast.Load)
+    ]
+
+
+def threads(source):
+    return [
+        getattr(n, "threads", None)
+        for n in ast.walk(source)
+        if isinstance(n, ast.Call) and hasattr(n, "threads")
+    ]
+
+
+class TestBoundsCheckAnalysis:
+    def test_len_range(self):
+        source = parse(
+            "def f(xs: List[int], ys: List[int]):",
+            "   for i in range(len(xs) - 1):",
+            "       xs[i] = xs[i + 1] + ys[i]",
+        )
+        assert in_bounds(source) == {"xs[i]": True, "xs[i + 1]": True, "ys[i]": False}
+
+    def test_repeated_list(self):
+        source = parse(
+            "def f(n: int):",
+            "   xs = [0] * n",
+            "   for i in range(2, n):",
+            "       for j in range(i * i, n, i):",
+            "           xs[j] = i",
+        )
+        assert in_bounds(source) == {"xs[j]": True}
+
+    def test_shrinking_container(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   for i in range(len(xs)):",
+            "       xs[i] = 0",
+            "       xs.pop()",
+            "   for i in range(-1, len(xs)):",
+            "       xs[i] = 0",
+            "   for i in range(len(xs)):",
+            "       yield xs[i]",
+        )
+        assert not any(in_bounds(source).values())
+
+    def test_aliased_container(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   ys = xs",
+            "   for i in range(len(xs)):",
+            "       ys.pop()",
+            "       xs[i] = 0",
+        )
+        assert not any(in_bounds(source).values())
+
+    def test_container_passed_to_callee(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   for i in range(len(xs)):",
+            "       shrink(xs)",
+            "       xs[i] = 0",
+            "def shrink(xs: List[int]):",
+            "   xs.pop()",
+        )
+        assert not any(in_bounds(source).values())
+        source = parse(
+            "def f(xs: List[int]):",
+            "   ys = list(xs)",
+            "   for i in range(len(xs)):",
+            "       xs[i] = len(xs)",
+        )
+        assert in_bounds(source) == {"xs[i]": True}
+
+    def test_argument_aliased_by_caller(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   total = 0",
+            "   for i in range(len(xs)):",
+            "       shrink()",
+            "       total += xs[i]",
+            "   return total",
+            "def shrink():",
+            "   G.pop()",
+            "G: List[int] = [1, 2, 3]",
+            "f(G)",
+        )
+        assert in_bounds(source) == {"xs[i]": False}
+        source = parse(
+            "def f(xs: List[int]):",
+            "   total = 0",
+            "   for i in range(len(xs)):",
+            "       print(len(xs))",
+            "       total += xs[i]",
+            "   return total",
+        )
+        assert in_bounds(source) == {"xs[i]": True}
+
+    def test_rebound_target(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   for i in range(len(xs)):",
+            "       i += 1",
+            "       xs[i] = 0",
+        )
+        assert not any(in_bounds(source).values())
+
+    def test_flag(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   for i in range(len(xs)):",
+            "       xs[i] = 0",
+            elide_bounds_checks=False,
+        )
+        assert not any(in_bounds(source).values())
+
+
+class TestSimdLoopAnalysis:
+    def test_reductions(self):
+        source = parse(
+            "def f(xs: List[float], ys: List[float]):",
+            "   t: float = 0.0",
+            "   m: float = 0.0",
+            "   for i in range(len(xs)):",
+            "       v = xs[i] * ys[i]",
+            "       t += v",
+            "       m = max(m, v)",
+            "       ys[i] = math.sqrt(v)",
+            "   return t, m",
+        )
+        assert loops(source) == [(True, False)]
+
+    def test_fastmath(self):
+        source = parse(
+            "def f(xs: List[float]):",
+            "   t: float = 0.0",
+            "   for i in range(len(xs)):",
+            "       t += xs[i]",
+            fastmath=True,
+        )
+        assert loops(source) == [(True, True)]
+
+    def test_loop_carried_dependencies(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   t: int = 0",
+            "   p: int = 0",
+            "   for i in range(len(xs)):",
+            "       t += p",
+            "       p = xs[i]",
+            "   for i in range(1, len(xs)):",
+            "       xs[i] += xs[i - 1]",
+            "   for i in range(len(xs)):",
+            "       a = xs[i]",
+            "   for i in range(len(xs)):",
+            "       print(xs[i])",
+            "   for i in range(len(xs)):",
+            "       for j in range(i):",
+            "           t += j",
+            "   return a",
+        )
+        assert [simd for simd, _ in loops(source)] == [
+            False,
+            False,
+            False,
+            False,
+            False,
+            True,
+        ]
+
+    def test_iterables(self):
+        source = parse(
+            "def f(u: List[float], v: List[float], n: int):",
+            "   vBv = vv = 0",
+            "   for ue, ve in zip(u, v):",
+            "       vBv += ue * ve",
+            "       vv += ve * ve",
+            "   t = 0.0",
+            "   for i, x in enumerate(u):",
+            "       t += x",
+            "       v[i] = x",
+            "   for x in u:",
+            "       t += x",
+            "   for ue, ve in zip(u, v):",
+            "       v[0] = ue",
+            "   for k, x in zip(range(n), u):",
+            "       t += x",
+            "   return vBv / vv + t",
+        )
+        assert [simd for simd, _ in loops(source)] == [True, True, True, False, False]
+        zipped, enumerated = source.body[0].body[1], source.body[0].body[3]
+        # i is taken by enumerate
+        assert zipped.simd_index == "i1"
+        assert enumerated.simd_index == "i"
+
+    def test_literal_initialisers(self):
+        source = parse(
+            "def f(xs: List[float], s):",
+            "   t = 0",
+            "   for i in range(len(xs)):",
+            "       t += xs[i]",
+            "   for i in range(len(xs)):",
+            "       s += xs[i]",
+            "   return t + s",
+        )
+        assert [simd for simd, _ in loops(source)] == [True, False]
+
+
+class TestViewAnalysis:
+    def test_read_only_slices(self):
+        source = parse(
+            "def f(xs: List[int], ys: List[int]):",
+            "   if xs[:2] == ys[:2]:",
+            "       ys[:2] = xs[2:4]",
+            "   for x in xs[1:]:",
+            "       print(sum(ys[1:]) + x)",
+        )
+        assert views(source) == [True, True, True, True, True]
+
+    def test_stored_slices(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   ys = xs[1:]",
+            "   foo(xs[1:])",
+            "   return xs[1:]",
+        )
+        assert views(source) == [False, False, False]
+
+    def test_changed_lists(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   for x in xs[1:]:",
+            "       xs.append(x)",
+            "   xs[0], xs[1:3] = 5, xs[0:2]",
+            "   xs[:2], xs[2] = xs[1:3], xs[0]",
+        )
+        assert views(source) == [False, False, True]
+
+    def test_changed_by_callee(self):
+        source = parse(
+            "def f(data: List[int]):",
+            "   def mutate():",
+            "       data[2] = 100",
+            "   def total():",
+            "       s = 0",
+            "       for x in data[1:]:",
+            "           mutate()",
+            "           s += x",
+            "       for x in data[1:]:",
+            "           s += abs(x)",
+            "       return s",
+            "   return total()",
+        )
+        assert views(source) == [False, True]
+
+    def test_argument_changed_by_callee(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   total = 0",
+            "   for x in xs[1:]:",
+            "       bump()",
+            "       total += x",
+            "   for x in xs[1:]:",
+            "       total += abs(x)",
+            "   return total",
+            "def bump():",
+            "   G[2] = 100",
+            "G: List[int] = [1, 2, 3]",
+            "f(G)",
+        )
+        assert views(source) == [False, True]
+
+    def test_aliased_lists(self):
+        source = parse(
+            "def f(xs: List[int]):",
+            "   ys = xs",
+            "   for x in xs[1:]:",
+            "       ys[0] = x",
+        )
+        assert views(source) == [False]
+
+
+class TestParallelMapAnalysis:
+    FUNCTIONS = (
+        "from multiprocessing import Pool",
+        "import math",
+        "CACHE = []",
+        "def norm(x, y):",
+        "   return math.sqrt(x * x + y * y)",
+        "def rows(n: int):",
+        "   row = [0] * n",
+        "   for i in range(n):",
+        "       row[i] = norm(i, n)",
+        "   return row",
+        "def cached(x):",
+        "   CACHE.append(x)",
+        "   return x",
+        "def log(x):",
+        "   print(x)",
+        "   return x",
+        "def first(xs):",
+        "   xs[0] = 0",
+        "   return xs",
+    )
+
+    def test_pure_functions(self):
+        source = parse(
+            *self.FUNCTIONS,
+            "with Pool() as pool:",
+            "   a = pool.map(rows, range(10))",
+            "   b = pool.starmap(norm, zip(a, a))",
+        )
+        assert threads(source) == [True, True, True]
+
+    def test_impure_functions(self):
+        source = parse(
+            *self.FUNCTIONS,
+            "pool = Pool(4)",
+            "a = pool.map(rows, range(10))",
+            "b = pool.map(cached, a)",
+            "c = pool.map(log, a)",
+            "d = pool.map(first, a)",
+        )
+        assert threads(source) == [False, True, False, False, False]
+
+    def test_impure_methods(self):
+        source = parse(
+            *self.FUNCTIONS,
+            "class Counter:",
+            "   def __init__(self):",
+            "       self.n = 0",
+            "   def bump(self):",
+            "       self.n += 1",
+            "       return self.n",
+            "def work(c):",
+            "   return c.bump()",
+            "def take(it):",
+            "   return next(it)",
+            "def words(s: str):",
+            "   return s.split()",
+            "def keys(d):",
+            "   return d.keys()",
+            "pool = Pool(4)",
+            "a = pool.map(work, [Counter()] * 2)",
+            "b = pool.map(take, [iter(range(3))] * 2)",
+            "c = pool.map(words, ['a b', 'c'])",
+            "d = pool.map(keys, [{}])",
+        )
+        assert threads(source) == [False, False, False, True, False]
+
+    def test_processes(self):
+        source = parse(
+            *self.FUNCTIONS,
+            "with Pool(initializer=print) as pool:",
+            "   a = pool.map(rows, range(10))",
+        )
+        assert threads(source) == [False, False]
+        source = parse(
+            *self.FUNCTIONS,
+            "with Pool() as pool:",
+            "   a = pool.map(rows, range(10))",
+            "   pool.apply_async(rows, (10,))",
+        )
+        assert threads(source) == [False, True]
+        source = parse(
+            *self.FUNCTIONS,
+            "with Pool() as pool:",
+            "   a = pool.map(rows, range(10))",
+            use_threads=False,
+        )
+        assert threads(source) == [False, False]
+
+    def test_with_pool(self):
+        source = parse(
+            *self.FUNCTIONS,
+            "with Pool() as pool:",
+            "   a = pool.map(rows, range(10))",
+            "with Pool(initializer=print) as pool:",
+            "   b = pool.map(rows, range(10))",
+            "with Pool() as pool, open('f') as f:",
+            "   c = pool.map(rows, range(10))",
+        )
+        parse_decorators(source)
+        source = JuliaContextManagerRewriter().visit(source)
+        assert [ast.unparse(n) for n in source.body[-4:]] == [
+            "a = pool.map(rows, range(10))",
+            "pool = Pool(initializer=print)",
+            "b = pool.map(rows, range(10))",
+            "with Pool() as pool, open('f') as f:\n    c = pool.map(rows, range(10))",
+        ]
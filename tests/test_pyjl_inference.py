@@ -0,0 +1,129 @@
+import ast
+from pathlib import Path
+
+from py2many.analysis import add_imports
+from py2many.context import add_variable_context
+from py2many.scope import add_scope_context
+import pyjl.inference
+from pyjl.inference import infer_julia_types, widen_types
+
+
+def parse(*args, **flags):
+    source = ast.parse("\n".join(args))
+    source.__file__ = Path("test.py")
+    for flag, value in flags.items():
+        setattr(source, flag, value)
+    add_scope_context(source)
+    add_variable_context(source, (source,))
+    add_imports(source)
+    infer_julia_types(source)
+    return source
+
+
+def annotation(source, stmt=0):
+    return ast.unparse(source.body[0].body[stmt].value.annotation)
+
+
+def names(*typenames):
+    return [ast.Name(id=t) for t in typenames]
+
+
+class TestWidenTypes:
+    def test_unions(self):
+        assert widen_types(names("int", "str")) == ("Union[int, str]", None)
+        assert widen_types(names("int", "float")) == ("float", None)
+        assert widen_types(names("int", "float", "str")) == (
+            "Union[int, float, str]",
+            None,
+        )
+        union = ast.parse("Optional[int]").body[0].value
+        assert widen_types([union, ast.Name(id="str")]) == (
+            "Union[int, None, str]",
+            None,
+        )
+
+    def test_any(self):
+        assert widen_types([ast.Name(id="int"), None])[0] is None
+        assert widen_types(names("int", "Any"))[0] is None
+        assert widen_types(names("int", "str", "bool", "bytes", "float"))[0] is None
+
+
+class TestTypeWidening:
+    def test_literals(self):
+        source = parse(
+            "def f():",
+            "   xs = [1, 'a']",
+            "   ys = [1, 2.5]",
+            "   d = {'a': 1, 'b': 'x'}",
+        )
+        assert annotation(source, 0) == "list[Union[int, str]]"
+        assert annotation(source, 1) == "list[float]"
+        assert annotation(source, 2) == "Dict[str, Union[int, str]]"
+
+    def test_mixed_dict(self, monkeypatch):
+        warnings = []
+        monkeypatch.setattr(pyjl.inference.logger, "warning", warnings.append)
+        source = parse(
+            "def f():",
+            "   d = {1: 'a', 'b': 2}",
+            "   e = {1: 'a', 'b': 2, 2: 1.5, 3: b'x', 4: True}",
+            report_any_types=True,
+        )
+        assert annotation(source, 0) == "Dict[Union[int, str], Union[str, int]]"
+        assert annotation(source, 1) == "Dict"
+        assert len(warnings) == 1
+        assert "dict literal on linenumber 3" in warnings[0]
+
+    def test_untyped_containers(self, monkeypatch):
+        warnings = []
+        monkeypatch.setattr(pyjl.inference.logger, "warning", warnings.append)
+        parse(
+            "def f(xs: list, d: dict, n: int) -> list:",
+            "   ys = []",
+            "   zs = [1, 2]",
+            "   s = set()",
+            "   e: Dict = {}",
+            "   return xs",
+            report_any_types=True,
+        )
+        assert len(warnings) == 1
+        assert [line for line in warnings[0].splitlines() if line.startswith("-")] == [
+            "- return type of f on linenumber 1: list has no element types",
+            "- argument xs on linenumber 1: list has no element types",
+            "- argument d on linenumber 1: dict has no element types",
+            "- variable ys on linenumber 2: it is created empty",
+            "- variable s on linenumber 4: it is created empty",
+            "- variable e on linenumber 5: Dict has no element types\033[0m",
+        ]
+
+    def test_append(self):
+        source = parse(
+            "def f():",
+            "   xs = [1, 2]",
+            "   xs.append('a')",
+            "   xs.append(2)",
+        )
+        target = source.body[0].body[0].targets[0]
+        assert ast.unparse(target.annotation) == "List[Union[int, str]]"
+        assert target.make_generic
+
+    def test_fields(self):
+        source = parse(
+            "class Node:",
+            "   def __init__(self, value: int, tag):",
+            "       self.value = value",
+            "       self.tag = tag",
+            "       self.next = None",
+            "       self.weight = 0",
+            "   def link(self, other: 'Node', w: float):",
+            "       self.next = other",
+            "       self.weight = w",
+        )
+        field_types = {
+            field: ast.unparse(t) for field, t in source.body[0].field_types.items()
+        }
+        assert field_types == {
+            "value": "int",
+            "next": "Union[None, Node]",
+            "weight": "float",
+        }
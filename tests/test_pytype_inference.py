@@ -0,0 +1,16 @@
+from py2many.pytype_inference import PyiStore
+
+
+def test_pyi_store(tmp_path):
+    path = str(tmp_path / "pytype.sqlite3")
+    store = PyiStore(path)
+    assert store.get(["a", "b"]) == {}
+    store.put({"a": "def f() -> int: ..."})
+    store.close()
+
+    # Shared by other runs
+    other = PyiStore(path)
+    assert other.get(["a", "b"]) == {"a": "def f() -> int: ..."}
+    other.put({"a": "def f() -> str: ...", "b": "x: int"})
+    assert other.get(["a", "b"]) == {"a": "def f() -> int: ...", "b": "x: int"}
+    other.close()
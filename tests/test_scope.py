@@ -1,5 +1,5 @@
 import ast
-from py2many.scope import add_scope_context
+from py2many.scope import add_scope_context, invalidate_scope_indexes
 from py2many.context import add_variable_context
 
 
@@ -16,6 +16,18 @@ class TestScopeTransformer:
         assert isinstance(source.body[0].scopes[-1], ast.FunctionDef)
         assert isinstance(source.body[0].body[0].scopes[-1], ast.FunctionDef)
 
+    def test_scopes_are_shared(self):
+        source = parse("def foo():", "   x = 1", "   return x")
+        func = source.body[0]
+        assert func.body[0].scopes is func.body[1].scopes
+        assert func.body[0].scopes.parent_scopes is source.scopes
+
+    def test_if_header_scope(self):
+        source = parse("def foo(x):", "   if x:", "      return x")
+        if_node = source.body[0].body[0]
+        assert if_node.test.scopes is source.body[0].scopes
+        assert if_node.body[0].scopes[-1] is if_node
+
 
 class TestScopeList:
     def test_find_returns_most_upper_definition(self):
@@ -23,3 +35,23 @@ class TestScopeList:
         add_variable_context(source, (source,))
         definition = source.scopes.find("x")
         assert definition.lineno == 1
+
+    def test_find_sees_modified_body(self):
+        source = parse("x = 1")
+        add_variable_context(source, (source,))
+        assert source.scopes.find("foo") is None
+        func = ast.parse("def foo():\n    pass").body[0]
+        source.body.append(func)
+        assert source.scopes.find("foo") is func
+        func.name = "bar"
+        assert source.scopes.find("foo") is None
+
+    def test_find_after_invalidate(self):
+        source = parse("x = 1", "y = 2")
+        add_variable_context(source, (source,))
+        assert source.scopes.find("foo") is None
+        func = ast.parse("def foo():\n    pass").body[0]
+        # Replaced in place: the length is unchanged
+        source.body[1] = func
+        invalidate_scope_indexes(source)
+        assert source.scopes.find("foo") is func
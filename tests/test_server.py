@@ -0,0 +1,56 @@
+import argparse
+import json
+
+from py2many.server import (
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    TRANSPILE_ERROR,
+    TranspileServer,
+)
+
+
+def make_server():
+    args = argparse.Namespace(
+        indent=4,
+        comment_unsupported=False,
+        extension=False,
+        no_prologue=False,
+        typpete=False,
+        pytype=False,
+        config=None,
+        import_basedir=None,
+        jobs=1,
+        socket=None,
+    )
+    return TranspileServer(args)
+
+
+def request(server, method, id=1, **params):
+    line = json.dumps({"jsonrpc": "2.0", "id": id, "method": method, "params": params})
+    return server.handle(line)
+
+
+def test_transpile():
+    server = make_server()
+    source = "def inc(x: int) -> int:\n    return x + 1\n"
+    first = request(server, "transpile", lang="go", source=source)
+    assert "func Inc(x int) int" in first["result"]["output"]
+    second = request(server, "transpile", id=2, lang="go", source=source)
+    assert second == dict(first, id=2)
+
+
+def test_errors():
+    server = make_server()
+    assert server.handle("{")["error"]["code"] == PARSE_ERROR
+    assert request(server, "compile")["error"]["code"] == METHOD_NOT_FOUND
+    assert request(server, "transpile", source="")["error"]["code"] == INVALID_PARAMS
+    response = request(server, "transpile", lang="go", source="def f(:")
+    assert response["error"]["code"] == TRANSPILE_ERROR
+
+
+def test_notification_and_shutdown():
+    server = make_server()
+    notification = json.dumps({"jsonrpc": "2.0", "method": "shutdown"})
+    assert server.handle(notification) is None
+    assert not server.running
@@ -2,7 +2,13 @@ import ast
 
 from py2many.context import add_variable_context, add_list_calls
 from py2many.scope import add_scope_context
-from py2many.tracer import is_list, is_recursive, value_expr, value_type
+from py2many.tracer import (
+    get_class_scope,
+    is_list,
+    is_recursive,
+    value_expr,
+    value_type,
+)
 
 
 def parse(*args):
@@ -112,3 +118,12 @@ def test_is_recursive():
     source = parse("def rec(n):", "   return rec(n-1) + rec(n)")
     fun = source.body[0]
     assert is_recursive(fun)
+
+
+def test_get_class_scope():
+    source = parse("class Foo:", "   pass", "foo = Foo()")
+    assert get_class_scope("foo", source.scopes) is source.body[0]
+    assert get_class_scope("Bar", source.scopes) is None
+    bar = ast.parse("class Bar:\n   pass").body[0]
+    source.body.append(bar)
+    assert get_class_scope("Bar", source.scopes) is bar